@@ -1,3 +1,44 @@
+"""
+더식판 Accounts Admin
+"""
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-# Register your models here.
+from accounts.models import LoginHistory, PasswordResetHistory, User
+from core.admin import ActivationAdminMixin, CenterScopedAdmin, EstimatedCountPaginator
+
+
+@admin.register(User)
+class UserAdmin(ActivationAdminMixin, CenterScopedAdmin, BaseUserAdmin):
+    list_display = ['username', 'get_full_name', 'user_type', 'center', 'phone', 'is_active',
+                    'last_login']
+    list_filter = ['user_type', 'is_active', 'is_staff']
+    list_select_related = ['center']
+    search_fields = ['username', 'first_name', 'last_name', 'email', 'phone']
+    autocomplete_fields = ['center']
+    fieldsets = BaseUserAdmin.fieldsets + (
+        ('더식판', {'fields': ('user_type', 'center', 'phone', 'department', 'position',
+                             'email_notifications', 'sms_notifications')}),
+    )
+    add_fieldsets = BaseUserAdmin.add_fieldsets + (
+        ('더식판', {'fields': ('user_type', 'center')}),
+    )
+
+
+@admin.register(LoginHistory)
+class LoginHistoryAdmin(CenterScopedAdmin):
+    center_lookup = 'user__center'
+    paginator = EstimatedCountPaginator
+    list_display = ['user', 'login_at', 'logout_at', 'ip_address']
+    list_select_related = ['user']
+    search_fields = ['user__username', 'ip_address']
+    autocomplete_fields = ['user']
+
+
+@admin.register(PasswordResetHistory)
+class PasswordResetHistoryAdmin(CenterScopedAdmin):
+    center_lookup = 'user__center'
+    list_display = ['user', 'reset_at', 'reset_by', 'reason']
+    list_select_related = ['user', 'reset_by']
+    search_fields = ['user__username']
+    autocomplete_fields = ['user', 'reset_by']
@@ -1,6 +1,6 @@
-from django.apps import AppConfig
+from core import startup
 
 
-class AccountsConfig(AppConfig):
+class AccountsConfig(startup.TimedAppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
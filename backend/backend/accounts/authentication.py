@@ -0,0 +1,59 @@
+"""
+더식판 async 뷰 인증
+DRF 는 async 뷰를 지원하지 않으므로, async 뷰에서는 같은 JWT(simplejwt) 토큰을
+직접 검증하고 사용자를 async ORM(aget) 으로 조회한다.
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.models import User
+
+
+async def authenticate_jwt(request):
+    """Authorization 헤더의 JWT 로 사용자 조회 (토큰 없으면 None)"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    # 서명/만료 검증은 DB 접근이 없으므로 그대로 호출
+    token = authentication.get_validated_token(raw_token)
+    try:
+        user = await User.objects.select_related('center').aget(
+            **{api_settings.USER_ID_FIELD: token[api_settings.USER_ID_CLAIM]}
+        )
+    except (KeyError, User.DoesNotExist):
+        raise AuthenticationFailed('사용자를 찾을 수 없습니다.')
+    if not user.is_active:
+        raise AuthenticationFailed('비활성화된 사용자입니다.')
+    return user
+
+
+def async_jwt_required(view):
+    """async 뷰용 IsAuthenticated - 인증 실패 시 DRF 와 같은 401 응답"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await authenticate_jwt(request)
+        except (InvalidToken, TokenError, AuthenticationFailed):
+            user = None
+        if user is None:
+            return JsonResponse({'detail': '인증 정보가 없거나 유효하지 않습니다.'}, status=401)
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def accessible_center_ids(user):
+    """접근 가능한 센터 ID 목록 (Center.objects.accessible_to 조건으로 조회 1회)"""
+    return [center_id async for center_id in user.get_accessible_centers().values_list('id', flat=True)]
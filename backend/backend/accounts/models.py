@@ -62,24 +62,13 @@ class User(AbstractUser):
         
         # 하위 센터 확인
         if self.center.center_type == 'WASH':
-            return target_center in self.center.get_all_children()
+            return self.get_accessible_centers().filter(pk=target_center.pk).exists()
         
         return False
     
     def get_accessible_centers(self):
-        """접근 가능한 센터 목록 반환"""
-        if self.user_type in ['SUPER', 'HQ']:
-            return Center.objects.all()
-        
-        if not self.center:
-            return Center.objects.none()
-        
-        # 자신의 센터와 하위 센터
-        centers = [self.center]
-        if self.center.center_type == 'WASH':
-            centers.extend(self.center.get_all_children())
-        
-        return Center.objects.filter(id__in=[c.id for c in centers])
+        """접근 가능한 센터 목록 반환 (하위 센터 포함, 단일 SQL 조건)"""
+        return Center.objects.accessible_to(self)
 
 
 class LoginHistory(models.Model):
@@ -0,0 +1,9 @@
+from core import startup
+
+
+class AnalyticsConfig(startup.TimedAppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analytics'
+
+    def on_ready(self):
+        from analytics import signals  # noqa: F401
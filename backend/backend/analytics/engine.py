@@ -0,0 +1,328 @@
+"""
+더식판 분석 엔진
+5. 분석 대시보드 - 아동 증감/이탈, 코호트 유지율, 은행별 출금 실패율
+
+ORM 객체를 만들지 않고 values_list 로 필요한 컬럼만 뽑아 NumPy 배열로 한 번에 계산한다.
+날짜는 1970-01 기준 월 번호(정수)로 바꿔 비교/집계하고,
+결과는 (센터, 월) 단위로 캐시하고, 출금 확정 거래나 아동 등록/퇴원일이 바뀌면
+해당 센터와 상위 센터의 영향받는 달 캐시를 지운다 (analytics.signals).
+"""
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.models import Center, Child
+
+
+CACHE_PREFIX = 'analytics'
+# 지난 달 결과는 거의 바뀌지 않으므로 길게, 이번 달은 짧게 캐시
+CACHE_TIMEOUT_CLOSED = 60 * 60 * 24
+CACHE_TIMEOUT_CURRENT = 60 * 10
+
+CHURN_MONTHS = 12      # 증감/이탈 추이 기간
+COHORT_MONTHS = 12     # 코호트 수 (= 최대 경과 개월)
+# 리포트 1건이 보여주는 기간 (기준월 포함)
+REPORT_MONTHS = max(CHURN_MONTHS, COHORT_MONTHS)
+
+# 퇴원일이 없는 아동의 월 번호 (항상 이후 월보다 큼)
+NO_WITHDRAWAL = 2 ** 40
+
+CHILD_CENTER_PATH = 'classroom__institution__delivery_center_id'
+PAYMENT_CENTER_PATH = 'cms_member__child__classroom__institution__delivery_center_id'
+# 출금 결과가 확정된 상태만 실패율 분모에 포함
+SETTLED_STATUSES = ('SUCCESS', 'FAILED')
+
+
+def month_index(year, month):
+    """(연, 월) → 1970-01 기준 월 번호"""
+    return (year - 1970) * 12 + month - 1
+
+
+def month_label(index):
+    """월 번호 → 'YYYY-MM'"""
+    return f'{1970 + index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def date_month(value):
+    """날짜 → 월 번호 (None 은 None)"""
+    return None if value is None else month_index(value.year, value.month)
+
+
+def to_month_indexes(dates):
+    """날짜 목록 → 월 번호 배열 (None 은 NO_WITHDRAWAL)"""
+    import numpy as np
+
+    months = np.array(dates, dtype='datetime64[M]')
+    return np.where(np.isnat(months), NO_WITHDRAWAL, months.astype(np.int64))
+
+
+def delivery_center_ids(center):
+    """분석 대상 배송센터 ID 목록 (본사/세척센터는 하위 배송센터 전체)"""
+    centers = [center] + center.get_all_children()
+    return sorted(c.pk for c in centers if c.center_type == 'DELIVERY')
+
+
+# ==================== 추출 ====================
+
+def _child_rows(center_ids):
+    return (
+        Child.objects
+        .filter(**{f'{CHILD_CENTER_PATH}__in': center_ids})
+        .values_list('enrollment_date', 'withdrawal_date')
+    )
+
+
+def _child_arrays(rows):
+    import numpy as np
+
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    enrolled, withdrawn = zip(*rows)
+    return to_month_indexes(enrolled), to_month_indexes(withdrawn)
+
+
+def child_extract(center_ids):
+    """아동 등록/퇴원 월 번호 배열 (enrolled, withdrawn)"""
+    return _child_arrays(list(_child_rows(center_ids)))
+
+
+async def achild_extract(center_ids):
+    return _child_arrays([row async for row in _child_rows(center_ids)])
+
+
+def _payment_rows(center_ids, year, month):
+    from payments.models import PaymentTransaction
+
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    return (
+        PaymentTransaction.objects
+        .filter(**{f'{PAYMENT_CENTER_PATH}__in': center_ids},
+                transaction_date__gte=start, transaction_date__lt=end,
+                status__in=SETTLED_STATUSES)
+        .values_list('cms_member__bank_code', 'status')
+    )
+
+
+def _payment_arrays(rows):
+    import numpy as np
+
+    if not rows:
+        return np.empty(0, dtype=object), np.empty(0, dtype=bool)
+    banks, statuses = zip(*rows)
+    return np.array(banks, dtype=object), np.array(statuses, dtype=object) == 'FAILED'
+
+
+def payment_extract(center_ids, year, month):
+    """해당 월 출금 확정 거래의 (은행코드 배열, 실패 여부 배열)"""
+    return _payment_arrays(list(_payment_rows(center_ids, year, month)))
+
+
+async def apayment_extract(center_ids, year, month):
+    return _payment_arrays([row async for row in _payment_rows(center_ids, year, month)])
+
+
+# ==================== 계산 ====================
+
+def monthly_churn(enrolled, withdrawn, last_month, months=CHURN_MONTHS):
+    """
+    월별 아동 증감/이탈
+    - active_start: 월초 이용 아동 (이전 달까지 등록, 해당 월 이후 퇴원)
+    - new / churned: 해당 월 등록 / 퇴원 아동
+    - churn_rate: 퇴원 / (월초 이용 + 신규)
+    - growth_rate: (월말 - 월초) / 월초
+    정렬된 등록/퇴원 월 배열에 searchsorted 로 월별 누적 건수를 구한다.
+    """
+    import numpy as np
+
+    month_range = np.arange(last_month - months + 1, last_month + 1)
+    enrolled = np.sort(enrolled)
+    withdrawn = np.sort(withdrawn)
+
+    enrolled_before = np.searchsorted(enrolled, month_range, side='left')
+    enrolled_through = np.searchsorted(enrolled, month_range, side='right')
+    withdrawn_before = np.searchsorted(withdrawn, month_range, side='left')
+    withdrawn_through = np.searchsorted(withdrawn, month_range, side='right')
+
+    active_start = enrolled_before - withdrawn_before
+    active_end = enrolled_through - withdrawn_through
+    new = enrolled_through - enrolled_before
+    churned = withdrawn_through - withdrawn_before
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        churn_rate = np.where(active_start + new > 0, churned / (active_start + new), 0.0)
+        growth_rate = np.where(active_start > 0, (active_end - active_start) / active_start, 0.0)
+
+    return [
+        {
+            'month': month_label(int(m)),
+            'active_start': int(active_start[i]),
+            'new': int(new[i]),
+            'churned': int(churned[i]),
+            'active_end': int(active_end[i]),
+            'churn_rate': round(float(churn_rate[i]), 4),
+            'growth_rate': round(float(growth_rate[i]), 4),
+        }
+        for i, m in enumerate(month_range)
+    ]
+
+
+def cohort_retention(enrolled, withdrawn, last_month, cohorts=COHORT_MONTHS):
+    """
+    등록월 코호트별 유지율
+    retention[k]: 등록 후 k개월이 지난 월말까지 퇴원하지 않은 비율
+    아직 지나지 않은 경과 개월은 None
+    """
+    import numpy as np
+
+    first_month = last_month - cohorts + 1
+    in_range = (enrolled >= first_month) & (enrolled <= last_month)
+    cohort = enrolled[in_range] - first_month
+    lifetime = withdrawn[in_range] - enrolled[in_range]
+
+    offsets = np.arange(cohorts)
+    survived = (lifetime[:, None] > offsets[None, :]).astype(np.int64)
+    retained = np.zeros((cohorts, cohorts), dtype=np.int64)
+    np.add.at(retained, cohort, survived)
+    sizes = np.bincount(cohort, minlength=cohorts)
+
+    elapsed = offsets[:, None] + offsets[None, :]  # 코호트 i 의 k개월 후 = first_month + i + k
+    observable = elapsed <= cohorts - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = retained / sizes[:, None]
+
+    return [
+        {
+            'cohort': month_label(first_month + i),
+            'size': int(sizes[i]),
+            'retention': [
+                round(float(rates[i, k]), 4) if observable[i, k] and sizes[i] else None
+                for k in range(cohorts)
+            ],
+        }
+        for i in range(cohorts)
+    ]
+
+
+def failure_rate_by_bank(banks, failed):
+    """은행코드별 출금 건수/실패 건수/실패율 (실패율 내림차순)"""
+    import numpy as np
+
+    if not len(banks):
+        return []
+    codes, inverse = np.unique(banks.astype(str), return_inverse=True)
+    totals = np.bincount(inverse)
+    failures = np.bincount(inverse, weights=failed).astype(np.int64)
+    rates = failures / totals
+
+    order = np.lexsort((codes, -rates))
+    return [
+        {
+            'bank_code': str(codes[i]),
+            'total': int(totals[i]),
+            'failed': int(failures[i]),
+            'failure_rate': round(float(rates[i]), 4),
+        }
+        for i in order
+    ]
+
+
+# ==================== 리포트 ====================
+
+def cache_key(center_id, year, month):
+    return f'{CACHE_PREFIX}:report:{center_id}:{year:04d}-{month:02d}'
+
+
+def _report(center_ids, year, month, children, payments):
+    last_month = month_index(year, month)
+    enrolled, withdrawn = children
+    banks, failed = payments
+    return {
+        'month': month_label(last_month),
+        'center_ids': list(center_ids),
+        'churn': monthly_churn(enrolled, withdrawn, last_month),
+        'cohorts': cohort_retention(enrolled, withdrawn, last_month),
+        'bank_failures': failure_rate_by_bank(banks, failed),
+    }
+
+
+def build_report(center_ids, year, month):
+    """배송센터 목록의 월간 분석 리포트 (캐시 없이 계산)"""
+    return _report(center_ids, year, month, child_extract(center_ids),
+                   payment_extract(center_ids, year, month))
+
+
+def _cache_timeout(year, month):
+    today = timezone.localdate()
+    closed = (year, month) < (today.year, today.month)
+    return CACHE_TIMEOUT_CLOSED if closed else CACHE_TIMEOUT_CURRENT
+
+
+def center_report(center, year, month, refresh=False):
+    """
+    센터 월간 분석 리포트 (센터/월 단위 캐시)
+    refresh=True 면 다시 계산해 캐시를 덮어쓴다.
+    """
+    key = cache_key(center.pk, year, month)
+    if not refresh:
+        report = cache.get(key)
+        if report is not None:
+            return report
+
+    report = build_report(delivery_center_ids(center), year, month)
+    cache.set(key, report, _cache_timeout(year, month))
+    return report
+
+
+async def acenter_report(center, year, month):
+    """center_report 의 async 버전"""
+    key = cache_key(center.pk, year, month)
+    report = await cache.aget(key)
+    if report is not None:
+        return report
+
+    center_ids = await sync_to_async(delivery_center_ids)(center)
+    report = _report(center_ids, year, month, await achild_extract(center_ids),
+                     await apayment_extract(center_ids, year, month))
+    await cache.aset(key, report, _cache_timeout(year, month))
+    return report
+
+
+def affected_months(changes, until):
+    """
+    아동 등록/퇴원 월이 바뀌었을 때 결과가 달라지는 리포트 월 번호 집합
+    changes: [(이전 월 번호, 새 월 번호)] - None 은 날짜 없음(퇴원 전, 생성/삭제 전후)
+    a → b 변경은 a~b 사이 월의 집계만 바꾸므로 리포트 [min(a, b), max(a, b) + REPORT_MONTHS - 1] 가 영향을 받는다.
+    한쪽이 None 이면 그 이후 모든 달이 바뀐다. until(이번 달) 이후 리포트는 짧게 캐시되므로 제외한다.
+    """
+    months = set()
+    for before, after in changes:
+        if before == after:
+            continue
+        known = [m for m in (before, after) if m is not None]
+        start = min(known)
+        end = until if None in (before, after) else max(known) + REPORT_MONTHS - 1
+        months.update(range(start, min(end, until) + 1))
+    return months
+
+
+def invalidate(targets):
+    """
+    (센터ID, 연, 월) 목록의 리포트 캐시 삭제
+    본사/세척센터 리포트에도 하위 배송센터가 포함되므로 상위 센터의 같은 달 캐시도 함께 지운다.
+    """
+    targets = set(targets)
+    if not targets:
+        return
+    parents = dict(Center.objects.values_list('pk', 'parent_id'))
+    keys = set()
+    for center_id, year, month in targets:
+        seen = set()
+        while center_id is not None and center_id not in seen:
+            seen.add(center_id)
+            keys.add(cache_key(center_id, year, month))
+            center_id = parents.get(center_id)
+    cache.delete_many(keys)
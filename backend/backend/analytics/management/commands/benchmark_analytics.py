@@ -0,0 +1,202 @@
+"""
+분석 엔진 성능 비교 커맨드 (NumPy 벡터 연산 vs ORM 객체 반복)
+
+    python manage.py benchmark_analytics 2025-06 --center 3
+    python manage.py benchmark_analytics 2025-06 --seed 20000   # 임시 데이터 생성 후 비교 (롤백)
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from analytics import engine
+from core.models import Center, Child, Classroom, Institution
+
+
+BANK_CODES = ['004', '011', '020', '081', '088', '090']
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _parse_month(value):
+    try:
+        parsed = datetime.strptime(value, '%Y-%m')
+    except ValueError:
+        raise CommandError(f'YYYY-MM 형식이 아닙니다: {value}')
+    return parsed.year, parsed.month
+
+
+def naive_report(center_ids, year, month):
+    """비교 기준: 모델 인스턴스를 하나씩 순회하며 집계"""
+    from payments.models import PaymentTransaction
+
+    last_month = engine.month_index(year, month)
+    children = list(Child.objects.filter(
+        **{f'{engine.CHILD_CENTER_PATH}__in': center_ids}))
+
+    def index(day):
+        return engine.month_index(day.year, day.month) if day else engine.NO_WITHDRAWAL
+
+    churn = []
+    for m in range(last_month - engine.CHURN_MONTHS + 1, last_month + 1):
+        active_start = new = churned = active_end = 0
+        for child in children:
+            enrolled, withdrawn = index(child.enrollment_date), index(child.withdrawal_date)
+            active_start += enrolled < m <= withdrawn
+            active_end += enrolled <= m < withdrawn
+            new += enrolled == m
+            churned += withdrawn == m
+        churn.append((active_start, new, churned, active_end))
+
+    first_month = last_month - engine.COHORT_MONTHS + 1
+    cohorts = {}
+    for child in children:
+        enrolled, withdrawn = index(child.enrollment_date), index(child.withdrawal_date)
+        if not first_month <= enrolled <= last_month:
+            continue
+        counts = cohorts.setdefault(enrolled, [0] * (engine.COHORT_MONTHS + 1))
+        counts[0] += 1
+        for k in range(engine.COHORT_MONTHS):
+            counts[k + 1] += withdrawn - enrolled > k
+
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    banks = {}
+    transactions = PaymentTransaction.objects.filter(
+        **{f'{engine.PAYMENT_CENTER_PATH}__in': center_ids},
+        transaction_date__gte=start, transaction_date__lt=end,
+        status__in=engine.SETTLED_STATUSES,
+    )
+    for txn in transactions:
+        counts = banks.setdefault(txn.cms_member.bank_code, [0, 0])
+        counts[0] += 1
+        counts[1] += txn.status == 'FAILED'
+    return churn, cohorts, banks
+
+
+def mismatches(naive, report):
+    """naive_report 와 engine 리포트가 다른 항목 이름 목록"""
+    churn, cohorts, banks = naive
+    first_month = engine.month_index(*map(int, report['month'].split('-'))) - engine.COHORT_MONTHS + 1
+
+    expected_cohorts = []
+    for i in range(engine.COHORT_MONTHS):
+        counts = cohorts.get(first_month + i, [0] * (engine.COHORT_MONTHS + 1))
+        size = counts[0]
+        expected_cohorts.append((size, [
+            round(counts[k + 1] / size, 4) if size and i + k <= engine.COHORT_MONTHS - 1 else None
+            for k in range(engine.COHORT_MONTHS)
+        ]))
+
+    checks = {
+        'churn': (churn, [(row['active_start'], row['new'], row['churned'], row['active_end'])
+                          for row in report['churn']]),
+        'cohorts': (expected_cohorts, [(row['size'], row['retention']) for row in report['cohorts']]),
+        'bank_failures': (
+            {code: tuple(counts) for code, counts in banks.items()},
+            {row['bank_code']: (row['total'], row['failed']) for row in report['bank_failures']},
+        ),
+    }
+    return [name for name, (expected, actual) in checks.items() if expected != actual]
+
+
+def seed(children, year, month, rng):
+    """임시 배송센터/기관/반/아동/CMS 회원/출금 거래 생성"""
+    from payments.models import CMSMember, PaymentTransaction
+
+    center = Center.objects.create(
+        name='벤치마크 배송센터', center_type='DELIVERY', address='-', phone='-',
+        business_number=f'BENCH-{rng.randrange(10 ** 9)}',
+    )
+    institution = Institution.objects.create(
+        name='벤치마크 기관', institution_type='OTHER', delivery_center=center,
+        address='-', phone='-', contact_person='-', contact_phone='-',
+        service_start_date=date(year - 2, 1, 1),
+    )
+    classrooms = Classroom.objects.bulk_create([
+        Classroom(institution=institution, name=f'반{i}') for i in range(20)
+    ])
+
+    last = date(year, month, 28)
+    rows = []
+    for i in range(children):
+        enrolled = last - timedelta(days=rng.randrange(730))
+        withdrawn = None
+        if rng.random() < 0.3:
+            withdrawn = enrolled + timedelta(days=rng.randrange(30, 400))
+            withdrawn = withdrawn if withdrawn <= last else None
+        rows.append(Child(
+            name=f'아동{i}', classroom=classrooms[i % len(classrooms)], parent_name='-',
+            parent_phone='010-0000-0000', enrollment_date=enrolled, withdrawal_date=withdrawn,
+            is_active=withdrawn is None,
+        ))
+    created = Child.objects.bulk_create(rows, batch_size=1000)
+
+    members = CMSMember.objects.bulk_create([
+        CMSMember(child=child, nicepay_member_id=f'BENCH{child.pk}',
+                  bank_code=rng.choice(BANK_CODES), bank_name='-', account_number='-',
+                  account_holder='-', monthly_amount=30000, status='ACTIVE')
+        for child in created
+    ], batch_size=1000)
+    PaymentTransaction.objects.bulk_create([
+        PaymentTransaction(cms_member=member, transaction_date=date(year, month, 25),
+                           scheduled_amount=30000,
+                           status='FAILED' if rng.random() < 0.05 else 'SUCCESS')
+        for member in members
+    ], batch_size=1000)
+    return center
+
+
+class Command(BaseCommand):
+    help = '분석 리포트 계산 시간을 NumPy 벡터 연산과 ORM 객체 반복 방식으로 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', help='기준 월 (YYYY-MM)')
+        parser.add_argument('--center', type=int, help='센터 ID (기본: 전체 배송센터)')
+        parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최소값 출력)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='임시 아동 N명을 생성해 측정 후 롤백')
+
+    def handle(self, *args, **options):
+        year, month = _parse_month(options['month'])
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    center = seed(options['seed'], year, month, random.Random(0))
+                    center_ids = [center.pk]
+                elif options['center']:
+                    center = Center.objects.filter(pk=options['center']).first()
+                    if center is None:
+                        raise CommandError(f'센터가 없습니다: {options["center"]}')
+                    center_ids = engine.delivery_center_ids(center)
+                else:
+                    center_ids = list(Center.objects.filter(center_type='DELIVERY')
+                                      .values_list('pk', flat=True))
+                self._run(center_ids, year, month, options['repeat'])
+                if options['seed']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, center_ids, year, month, repeat):
+        children = Child.objects.filter(
+            **{f'{engine.CHILD_CENTER_PATH}__in': center_ids}).count()
+        self.stdout.write(f'배송센터 {len(center_ids)}곳, 아동 {children}명')
+
+        # 결과가 같을 때만 속도를 비교한다
+        different = mismatches(naive_report(center_ids, year, month),
+                               engine.build_report(center_ids, year, month))
+        if different:
+            raise CommandError(f'ORM 반복과 NumPy 결과가 다릅니다: {", ".join(different)}')
+
+        for label, func in (('ORM 반복', naive_report), ('NumPy', engine.build_report)):
+            timings = []
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                func(center_ids, year, month)
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f'{label:>8}: {min(timings) * 1000:.1f} ms')
@@ -0,0 +1,73 @@
+"""
+더식판 Analytics Signals
+- 아동 등록일/퇴원일/반(배송센터) 변경 시 영향받는 달의 분석 리포트 캐시 삭제 (커밋 후)
+  출금 확정 거래 변경은 payments.settlement_calendar.apply_deltas 에서 지운다.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from analytics import engine
+from core.models import Child, Classroom
+
+
+REPORT_FIELDS = ('enrollment_date', 'withdrawal_date')
+
+
+def _child_state(**lookup):
+    """(배송센터 ID, 등록월, 퇴원월)"""
+    row = (
+        Child.objects
+        .filter(**lookup)
+        .values_list('classroom__institution__delivery_center_id', *REPORT_FIELDS)
+        .first()
+    )
+    return row and (row[0], engine.date_month(row[1]), engine.date_month(row[2]))
+
+
+def _invalidate(before, after):
+    """before/after: (센터, 등록월, 퇴원월) 또는 None(없는 아동)"""
+    today = timezone.localdate()
+    until = engine.month_index(today.year, today.month)
+    empty = (None, None, None)
+    before, after = before or empty, after or empty
+    if before[0] == after[0]:
+        changes = {before[0]: zip(before[1:], after[1:])}
+    else:
+        # 센터 이동은 이전 센터에서 삭제 + 새 센터에 생성
+        changes = {before[0]: zip(before[1:], empty[1:]), after[0]: zip(empty[1:], after[1:])}
+
+    targets = {
+        (center_id, 1970 + month // 12, month % 12 + 1)
+        for center_id, pairs in changes.items() if center_id is not None
+        for month in engine.affected_months(pairs, until)
+    }
+    if targets:
+        transaction.on_commit(lambda: engine.invalidate(targets))
+
+
+@receiver(pre_save, sender=Child)
+def remember_report_state(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    instance._report_state = _child_state(pk=instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Child)
+def invalidate_reports_on_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    _invalidate(getattr(instance, '_report_state', None), _child_state(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Child)
+def invalidate_reports_on_delete(sender, instance, **kwargs):
+    center_id = (
+        Classroom.objects
+        .filter(pk=instance.classroom_id)
+        .values_list('institution__delivery_center_id', flat=True)
+        .first()
+    )
+    _invalidate((center_id, engine.date_month(instance.enrollment_date),
+                 engine.date_month(instance.withdrawal_date)), None)
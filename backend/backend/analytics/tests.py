@@ -0,0 +1,167 @@
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from analytics import engine
+from analytics.management.commands import benchmark_analytics
+from core.models import Center, Child, Classroom, Institution
+from payments.models import CMSMember, PaymentTransaction
+
+
+class ChurnAndCohortTests(SimpleTestCase):
+    """
+    기준월 L = 2025-06
+    아동0: L-5 등록, L-1 퇴원 / 아동1: L-2 등록, L 퇴원 / 아동2: L-2 등록 / 아동3: L-1 등록 / 아동4: L 등록
+    """
+    last = engine.month_index(2025, 6)
+    enrolled = np.array([last - 5, last - 2, last - 2, last - 1, last])
+    withdrawn = np.array([last - 1, last, engine.NO_WITHDRAWAL, engine.NO_WITHDRAWAL, engine.NO_WITHDRAWAL])
+
+    def test_monthly_churn(self):
+        self.assertEqual(engine.monthly_churn(self.enrolled, self.withdrawn, self.last, months=3), [
+            {'month': '2025-04', 'active_start': 1, 'new': 2, 'churned': 0, 'active_end': 3,
+             'churn_rate': 0.0, 'growth_rate': 2.0},
+            {'month': '2025-05', 'active_start': 3, 'new': 1, 'churned': 1, 'active_end': 3,
+             'churn_rate': 0.25, 'growth_rate': 0.0},
+            {'month': '2025-06', 'active_start': 3, 'new': 1, 'churned': 1, 'active_end': 3,
+             'churn_rate': 0.25, 'growth_rate': 0.0},
+        ])
+
+    def test_cohort_retention(self):
+        self.assertEqual(engine.cohort_retention(self.enrolled, self.withdrawn, self.last, cohorts=3), [
+            {'cohort': '2025-04', 'size': 2, 'retention': [1.0, 1.0, 0.5]},
+            {'cohort': '2025-05', 'size': 1, 'retention': [1.0, 1.0, None]},
+            {'cohort': '2025-06', 'size': 1, 'retention': [1.0, None, None]},
+        ])
+
+    def test_affected_months(self):
+        last = self.last
+        # 퇴원월 L-3 → L-1: 그 사이 월부터 리포트 기간만큼
+        self.assertEqual(engine.affected_months([(last - 3, last - 1)], until=last + 20),
+                         set(range(last - 3, last - 1 + engine.REPORT_MONTHS)))
+        # 퇴원일 삭제/신규 등록: 이번 달까지 전부
+        self.assertEqual(engine.affected_months([(last - 3, None)], until=last), set(range(last - 3, last + 1)))
+        self.assertEqual(engine.affected_months([(None, None), (last, last)], until=last), set())
+
+
+class FailureRateByBankTests(SimpleTestCase):
+
+    def test_counts_and_rates_sorted_by_rate(self):
+        banks = np.array(['004', '088', '004', '020', '088', '004', '088'], dtype=object)
+        failed = np.array([True, False, False, False, False, False, True])
+
+        self.assertEqual(engine.failure_rate_by_bank(banks, failed), [
+            {'bank_code': '004', 'total': 3, 'failed': 1, 'failure_rate': 0.3333},
+            {'bank_code': '088', 'total': 3, 'failed': 1, 'failure_rate': 0.3333},
+            {'bank_code': '020', 'total': 1, 'failed': 0, 'failure_rate': 0.0},
+        ])
+
+    def test_empty_month(self):
+        self.assertEqual(engine.failure_rate_by_bank(*engine._payment_arrays([])), [])
+
+
+class BankFailureReportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hq = Center.objects.create(name='본사', center_type='HQ', address='-', phone='-',
+                                       business_number='본사-사업자')
+        cls.center = Center.objects.create(name='배송센터', center_type='DELIVERY', parent=cls.hq,
+                                           address='-', phone='-', business_number='배송-사업자')
+        institution = Institution.objects.create(
+            name='해바라기 어린이집', institution_type='OTHER', delivery_center=cls.center, address='-',
+            phone='-', contact_person='-', contact_phone='-', service_start_date=date(2024, 1, 1),
+        )
+        classroom = Classroom.objects.create(institution=institution, name='새싹반')
+        cls.transactions = []
+        for i, (bank_code, status) in enumerate([
+            ('004', 'SUCCESS'), ('004', 'FAILED'), ('004', 'SUCCESS'), ('004', 'SUCCESS'),
+            ('088', 'FAILED'), ('088', 'SCHEDULED'),
+        ]):
+            child = Child.objects.create(classroom=classroom, name=f'아동{i}', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=date(2025, 3, 2))
+            member = CMSMember.objects.create(
+                child=child, nicepay_member_id=f'M{i}', bank_code=bank_code, bank_name='-',
+                account_number='-', account_holder='-', monthly_amount=30000, status='ACTIVE',
+            )
+            cls.transactions.append(PaymentTransaction.objects.create(
+                cms_member=member, transaction_date=date(2025, 6, 25), scheduled_amount=30000,
+                status=status,
+            ))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_only_settled_transactions_are_counted(self):
+        report = engine.build_report([self.center.pk], 2025, 6)
+        self.assertEqual(report['bank_failures'], [
+            {'bank_code': '088', 'total': 1, 'failed': 1, 'failure_rate': 1.0},
+            {'bank_code': '004', 'total': 4, 'failed': 1, 'failure_rate': 0.25},
+        ])
+
+    def test_status_change_clears_center_and_parent_reports(self):
+        engine.center_report(self.center, 2025, 6)
+        engine.center_report(self.hq, 2025, 6)
+
+        scheduled = self.transactions[-1]
+        scheduled.status = 'SUCCESS'
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduled.save()
+
+        self.assertIsNone(cache.get(engine.cache_key(self.center.pk, 2025, 6)))
+        self.assertIsNone(cache.get(engine.cache_key(self.hq.pk, 2025, 6)))
+        failures = engine.center_report(self.hq, 2025, 6)['bank_failures']
+        self.assertEqual(failures[0], {'bank_code': '088', 'total': 2, 'failed': 1, 'failure_rate': 0.5})
+
+    def test_child_date_change_clears_affected_months(self):
+        Child.objects.filter(name='아동0').update(enrollment_date=date(2023, 1, 2))
+        engine.center_report(self.center, 2025, 6)
+        engine.center_report(self.hq, 2025, 6)
+        child = Child.objects.get(name='아동0')
+        june = engine.cache_key(self.center.pk, 2025, 6)
+
+        # 리포트 기간(12개월)보다 이전 월끼리의 이동은 2025-06 리포트와 무관
+        child.enrollment_date = date(2023, 2, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            child.save()
+        self.assertIsNotNone(cache.get(june))
+
+        child.withdrawal_date = date(2025, 5, 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            child.save()
+            self.assertIsNotNone(cache.get(june))
+        self.assertIsNone(cache.get(june))
+        self.assertIsNone(cache.get(engine.cache_key(self.hq.pk, 2025, 6)))
+        churn = engine.center_report(self.center, 2025, 6)['churn']
+        self.assertEqual([row['churned'] for row in churn if row['month'] == '2025-05'], [1])
+
+    def test_benchmark_reference_matches_engine(self):
+        Child.objects.filter(name='아동1').update(withdrawal_date=date(2025, 4, 3))
+        naive = benchmark_analytics.naive_report([self.center.pk], 2025, 6)
+        report = engine.build_report([self.center.pk], 2025, 6)
+        self.assertEqual(benchmark_analytics.mismatches(naive, report), [])
+
+        report['churn'][-1]['churned'] += 1
+        self.assertEqual(benchmark_analytics.mismatches(naive, report), ['churn'])
+
+    async def test_report_view_requires_token_and_accessible_center(self):
+        url = f'/api/v1/analytics/centers/{self.center.pk}/2025/6/'
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+
+        other = await Center.objects.acreate(name='다른 배송센터', center_type='DELIVERY', parent=self.hq,
+                                             address='-', phone='-', business_number='다른-사업자')
+        user = await User.objects.acreate(username='other-center', user_type='CENTER', center=other)
+        auth = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        response = await self.async_client.get(url, headers=auth)
+        self.assertEqual(response.status_code, 403)
+
+        user.center = self.center
+        await user.asave(update_fields=['center'])
+        response = await self.async_client.get(url, headers=auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['bank_failures'][0]['bank_code'], '088')
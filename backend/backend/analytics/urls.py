@@ -0,0 +1,10 @@
+from django.urls import path
+
+from analytics import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('centers/<int:center_id>/<int:year>/<int:month>/', views.center_monthly_report,
+         name='center-monthly-report'),
+]
@@ -0,0 +1,28 @@
+"""
+더식판 Analytics Views
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from accounts.authentication import accessible_center_ids, async_jwt_required
+from analytics import engine
+from core.models import Center
+
+
+@require_GET
+@async_jwt_required
+async def center_monthly_report(request, center_id, year, month):
+    """
+    5. 분석 대시보드 - 센터 월간 리포트 (증감/이탈, 코호트 유지율, 은행별 출금 실패율)
+    본사/세척센터는 하위 배송센터 전체를 합산한다.
+    """
+    if not 1 <= month <= 12:
+        return JsonResponse({'detail': '잘못된 월입니다.'}, status=400)
+
+    if center_id not in await accessible_center_ids(request.user):
+        return JsonResponse({'detail': '권한이 없습니다.'}, status=403)
+    center = await Center.objects.aget(pk=center_id)
+
+    response = JsonResponse(await engine.acenter_report(center, year, month))
+    response['Cache-Control'] = 'private, max-age=60'
+    return response
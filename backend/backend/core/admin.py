@@ -1,3 +1,229 @@
-from django.contrib import admin
+"""
+더식판 Core Admin
 
-# Register your models here.
+- list_select_related: __str__/list_display 가 따라가는 FK 를 한 번에 조회 (N+1 방지)
+- EstimatedCountPaginator: 필터 없는 대용량 테이블은 COUNT(*) 대신 통계 추정치 사용
+- CenterScopedAdmin: 접근 가능한 센터 범위의 데이터만 노출 (for_user() 가 있는 모델은 그대로 사용)
+- BatchActionAdmin: 일괄 작업은 pk 배치 단위 UPDATE 로 처리 (추적 필드 변경은 같은 트랜잭션에서 이벤트 기록)
+"""
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core import outbox, roster
+from core.models import Center, CenterScopedQuerySet, Child, Classroom, Institution
+from core.utils import FAQ, ChatSupport, LabelPrint, QnA, SMSHistory, SMSTemplate
+
+
+ADMIN_BATCH_SIZE = 1000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    필터가 없는 대용량 테이블은 PostgreSQL 통계(pg_class.reltuples)로 건수를 추정
+    추정치가 기준 이하이거나 조건이 있는 조회는 정확한 COUNT(*) 를 사용한다.
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.estimate_threshold:
+                return row[0]
+        return super().count
+
+
+def batched_update(queryset, batch_size=ADMIN_BATCH_SIZE, **changes):
+    """
+    선택 항목을 pk 배치 단위로 UPDATE (긴 잠금/거대한 IN 절 방지)
+    update() 는 auto_now 를 갱신하지 않으므로 updated_at 이 있으면 직접 지정한다.
+    update() 는 시그널이 없으므로 변경 이벤트(core.outbox)는 배치마다 같은 트랜잭션에서 기록한다.
+    """
+    model = queryset.model
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        changes.setdefault('updated_at', timezone.now())
+
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(pks), batch_size):
+        batch = model._default_manager.filter(pk__in=pks[start:start + batch_size])
+        with transaction.atomic():
+            events = outbox.update_events(batch, changes)
+            updated += batch.update(**changes)
+            outbox.record(events)
+    return updated
+
+
+def is_unscoped(user):
+    """전체 데이터 조회 가능 여부 (슈퍼유저/슈퍼관리자/본사)"""
+    return user.is_superuser or user.user_type in ['SUPER', 'HQ']
+
+
+class BatchActionAdmin(admin.ModelAdmin):
+    """일괄 작업을 배치 UPDATE 로 처리하는 기본 Admin"""
+
+    def update_selected(self, request, queryset, message, **changes):
+        updated = batched_update(queryset, **changes)
+        self.message_user(request, f'{updated}건을 {message}했습니다.', messages.SUCCESS)
+
+
+class CenterScopedAdmin(BatchActionAdmin):
+    """
+    접근 가능한 센터의 데이터만 조회
+    CenterScopedQuerySet 모델은 for_user() 로, 그 외 모델은 center_lookup 경로로 범위를 건다.
+    예) LabelPrint: 'center'
+    """
+    center_lookup = 'center'
+    show_full_result_count = False
+    # 일괄 작업 후 배송센터 명단(roster) 버전을 올릴지 여부
+    invalidates_roster = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if isinstance(queryset, CenterScopedQuerySet):
+            return queryset.for_user(request.user)
+        if is_unscoped(request.user):
+            return queryset
+        return queryset.filter(**{f'{self.center_lookup}__in': request.user.get_accessible_centers()})
+
+    def update_selected(self, request, queryset, message, **changes):
+        center_ids = set()
+        if self.invalidates_roster:
+            center_ids = set(queryset.values_list(f'{self.center_lookup}_id', flat=True))
+        super().update_selected(request, queryset, message, **changes)
+        roster.invalidate(center_ids)
+
+
+class ActivationAdminMixin:
+    """is_active 일괄 활성화/비활성화"""
+    actions = ['activate_selected', 'deactivate_selected']
+
+    @admin.action(description='선택 항목 활성화')
+    def activate_selected(self, request, queryset):
+        self.update_selected(request, queryset, '활성화', is_active=True)
+
+    @admin.action(description='선택 항목 비활성화')
+    def deactivate_selected(self, request, queryset):
+        self.update_selected(request, queryset, '비활성화', is_active=False)
+
+
+# ==================== 기본정보 ====================
+
+@admin.register(Center)
+class CenterAdmin(ActivationAdminMixin, CenterScopedAdmin):
+    center_lookup = 'pk'
+    list_display = ['name', 'center_type', 'parent', 'phone', 'is_active']
+    list_filter = ['center_type', 'is_active']
+    list_select_related = ['parent']
+    search_fields = ['name', 'business_number']
+    autocomplete_fields = ['parent']
+
+
+@admin.register(Institution)
+class InstitutionAdmin(ActivationAdminMixin, CenterScopedAdmin):
+    center_lookup = 'delivery_center'
+    invalidates_roster = True
+    list_display = ['name', 'institution_type', 'delivery_center', 'contact_person',
+                    'service_start_date', 'is_active']
+    list_filter = ['institution_type', 'is_active']
+    list_select_related = ['delivery_center']
+    search_fields = ['name', 'contact_person']
+    autocomplete_fields = ['delivery_center']
+
+
+@admin.register(Classroom)
+class ClassroomAdmin(ActivationAdminMixin, CenterScopedAdmin):
+    center_lookup = 'institution__delivery_center'
+    invalidates_roster = True
+    list_display = ['name', 'institution', 'capacity', 'is_active']
+    list_filter = ['is_active']
+    list_select_related = ['institution']
+    search_fields = ['name', 'institution__name']
+    autocomplete_fields = ['institution']
+
+
+@admin.register(Child)
+class ChildAdmin(ActivationAdminMixin, CenterScopedAdmin):
+    center_lookup = 'classroom__institution__delivery_center'
+    invalidates_roster = True
+    paginator = EstimatedCountPaginator
+    list_display = ['name', 'classroom', 'parent_name', 'parent_phone', 'service_count',
+                    'monthly_fee', 'enrollment_date', 'is_active']
+    list_filter = ['is_active', 'is_payment_active']
+    list_select_related = ['classroom__institution']
+    search_fields = ['name', 'parent_name', 'parent_phone']
+    autocomplete_fields = ['classroom']
+
+
+# ==================== 부가기능 ====================
+
+@admin.register(LabelPrint)
+class LabelPrintAdmin(CenterScopedAdmin):
+    list_display = ['institution', 'print_date', 'total_count', 'printed_by', 'printed_at']
+    list_select_related = ['institution', 'printed_by']
+    autocomplete_fields = ['center', 'institution', 'printed_by']
+    exclude = ['label_data_payload']
+    readonly_fields = ['label_data']
+
+
+@admin.register(SMSTemplate)
+class SMSTemplateAdmin(ActivationAdminMixin, BatchActionAdmin):
+    list_display = ['name', 'template_type', 'is_active', 'updated_at']
+    list_filter = ['template_type', 'is_active']
+    search_fields = ['name']
+
+
+@admin.register(SMSHistory)
+class SMSHistoryAdmin(CenterScopedAdmin):
+    paginator = EstimatedCountPaginator
+    list_display = ['center', 'template', 'recipient_count', 'status', 'success_count',
+                    'failed_count', 'sent_at']
+    list_filter = ['status']
+    list_select_related = ['center', 'template']
+    autocomplete_fields = ['center', 'template', 'sent_by']
+    exclude = ['recipients_payload']
+    readonly_fields = ['recipients']
+
+
+# ==================== 고객지원 ====================
+
+@admin.register(FAQ)
+class FAQAdmin(ActivationAdminMixin, BatchActionAdmin):
+    list_display = ['question', 'category', 'order', 'is_active', 'view_count']
+    list_filter = ['category', 'is_active']
+    search_fields = ['question']
+
+
+@admin.register(QnA)
+class QnAAdmin(CenterScopedAdmin):
+    list_display = ['title', 'center', 'author', 'status', 'is_private', 'created_at']
+    list_filter = ['status', 'is_private']
+    list_select_related = ['center', 'author']
+    search_fields = ['title']
+    autocomplete_fields = ['author', 'center', 'answered_by']
+    actions = ['close_selected']
+
+    @admin.action(description='선택 질문 종료')
+    def close_selected(self, request, queryset):
+        self.update_selected(request, queryset, '종료', status='CLOSED')
+
+
+@admin.register(ChatSupport)
+class ChatSupportAdmin(CenterScopedAdmin):
+    list_display = ['subject', 'user', 'center', 'agent', 'status', 'rating', 'started_at']
+    list_filter = ['status']
+    list_select_related = ['user', 'center', 'agent']
+    search_fields = ['subject']
+    autocomplete_fields = ['user', 'center', 'agent']
+    exclude = ['chat_log_payload']
+    readonly_fields = ['chat_log']
@@ -1,6 +1,11 @@
-from django.apps import AppConfig
+from core import startup
 
 
-class CoreConfig(AppConfig):
+class CoreConfig(startup.TimedAppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def on_ready(self):
+        from core import checks, signals  # noqa: F401
+
+        startup.watch_first_request()
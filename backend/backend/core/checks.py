@@ -0,0 +1,30 @@
+"""
+더식판 시스템 체크
+
+명단 버전/학부모 페이지 요약/분석 리포트 캐시는 모든 프로세스가 공유해야 하므로
+프로세스별 캐시 백엔드로 띄우면 오류로 막는다 (settings.TESTING 일 때만 허용).
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if getattr(settings, 'TESTING', False):
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [Error(
+        f'기본 캐시가 프로세스별 캐시({backend})입니다.',
+        hint='명단 버전/학부모 페이지 요약/요청 병합 락이 다른 워커에 반영되지 않습니다. '
+             'REDIS_URL 을 지정하고 RedisCache 를 사용하세요.',
+        id='core.E001',
+    )]
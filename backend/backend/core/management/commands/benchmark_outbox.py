@@ -0,0 +1,114 @@
+"""
+변경 이벤트 릴레이/소비 처리량 측정 커맨드 (core.outbox)
+
+임시 이벤트 N건을 만들어 배치 크기별 발행(relay)과 소비(consume) 처리량을 측정한다.
+- DB: 테스트 러너와 같은 방식으로 만든 임시 DB 에서 측정하고 지운다.
+  운영 이벤트/오프셋을 지우거나 릴레이 커서를 오래 잠가 실제 릴레이를 막지 않는다.
+- redis: 전용 스트림 접두어(--stream-prefix)에만 XADD 하고 끝나면 그 스트림을 지운다.
+  운영 접두어(OUTBOX_STREAM_PREFIX)는 거부한다.
+
+    python manage.py benchmark_outbox --events 20000
+    python manage.py benchmark_outbox --transport redis --batch-size 100 500 2000
+"""
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import outbox
+from core.models import ConsumerOffset, OutboxEvent
+
+
+# 실제 이벤트와 비슷한 크기의 변경 내용 (토픽, 변경 내용)
+SAMPLES = [
+    ('payment_transaction', {'status': ['SCHEDULED', 'SUCCESS']}),
+    ('payment_transaction', {'status': ['SCHEDULED', 'FAILED']}),
+    ('cms_member', {'status': ['PENDING', 'ACTIVE']}),
+    ('unpaid', {'status': ['UNPAID', 'PAID'], 'paid_amount': ['0', '30000']}),
+    ('child', {'is_active': [True, False]}),
+]
+
+
+def seed(count, rng):
+    events = []
+    for i in range(count):
+        topic, changes = rng.choice(SAMPLES)
+        events.append(OutboxEvent(topic=topic, event_type='updated', object_id=i + 1,
+                                  child_id=rng.randrange(1, 100000), changes=changes))
+    started = time.perf_counter()
+    outbox.record(events)
+    return time.perf_counter() - started
+
+
+@contextmanager
+def scratch_database():
+    """측정용 임시 DB (SQLite 는 메모리 DB, 그 외는 <DB 이름>_outbox_benchmark) - 끝나면 삭제"""
+    old_name = connection.settings_dict['NAME']
+    old_test = connection.settings_dict['TEST']
+    if connection.vendor != 'sqlite':
+        connection.settings_dict['TEST'] = {**old_test, 'NAME': f'{old_name}_outbox_benchmark'}
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        connection.settings_dict['TEST'] = old_test
+
+
+def make_transport(name, stream_prefix):
+    if name != 'redis':
+        return outbox.get_transport(name)
+    if stream_prefix == settings.OUTBOX_STREAM_PREFIX:
+        raise CommandError(f'운영 스트림 접두어({stream_prefix})에는 측정 이벤트를 쓸 수 없습니다.')
+    return outbox.RedisStreamTransport(prefix=stream_prefix)
+
+
+class Command(BaseCommand):
+    help = '변경 이벤트 릴레이와 소비자의 배치 크기별 처리량을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20000)
+        parser.add_argument('--batch-size', type=int, nargs='+', default=[100, 500, 2000])
+        parser.add_argument('--transport', choices=sorted(outbox.TRANSPORTS),
+                            default=settings.OUTBOX_TRANSPORT)
+        parser.add_argument('--stream-prefix', default='outbox-benchmark',
+                            help='redis 측정용 스트림 접두어 (운영 접두어 사용 불가)')
+
+    def handle(self, *args, **options):
+        transport = make_transport(options['transport'], options['stream_prefix'])
+        try:
+            with scratch_database():
+                self._run(transport, options)
+        finally:
+            if isinstance(transport, outbox.RedisStreamTransport):
+                transport.client.delete(*{transport.stream(topic) for topic, _ in SAMPLES})
+
+    def _run(self, transport, options):
+        count = options['events']
+        elapsed = seed(count, random.Random(0))
+        self.stdout.write(f'이벤트 {count:,}건 기록: {count / elapsed:,.0f}건/초')
+
+        for batch_size in options['batch_size']:
+            OutboxEvent.objects.update(position=None)
+            ConsumerOffset.objects.all().delete()
+
+            started = time.perf_counter()
+            published = outbox.relay(transport, batch_size)
+            relay_time = time.perf_counter() - started
+
+            consumer = f'benchmark.{batch_size}'
+            consumed = 0
+            started = time.perf_counter()
+            while outbox.consume(consumer, lambda events: None, batch_size=batch_size):
+                consumed += 1
+            consume_time = time.perf_counter() - started
+
+            self.stdout.write(
+                f'배치 {batch_size:>5}: 발행({options["transport"]}) {published / relay_time:>9,.0f}건/초, '
+                f'소비 {count / consume_time:>9,.0f}건/초 ({consumed}배치)'
+            )
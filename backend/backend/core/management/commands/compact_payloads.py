@@ -0,0 +1,85 @@
+"""
+JSON 본문 보관/압축 커맨드 (core.payloads)
+
+1. 보관기간(PAYLOAD_RETENTION_DAYS)이 지난 본문 삭제 (본 행은 유지)
+2. 어느 행도 가리키지 않는 본문 삭제
+3. PAYLOAD_COMPRESS_AFTER_DAYS 동안 바뀌지 않은 본문 zlib 압축
+
+    python manage.py compact_payloads --measure     # 실행 전후 테이블 크기/스캔 시간
+    python manage.py compact_payloads --dry-run
+"""
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import payloads
+from core.models import Payload
+
+
+def table_size(table):
+    """테이블 크기 (bytes) - PostgreSQL / SQLite(dbstat) 외에는 None"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [table])
+            except Exception:
+                return None
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+def scan_time(model, field):
+    """본문을 읽지 않는 전체 스캔(field IS NOT NULL 건수) 소요시간 (초)"""
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    table = connection.ops.quote_name(model._meta.db_table)
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL')
+        cursor.fetchone()
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = '보관기간이 지난 JSON 본문을 삭제하고 오래된 본문을 압축합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='대상 건수만 출력')
+        parser.add_argument('--measure', action='store_true',
+                            help='실행 전후 테이블 크기와 스캔 시간 출력')
+        parser.add_argument('--compress-after', type=int, default=settings.PAYLOAD_COMPRESS_AFTER_DAYS,
+                            help='이 기간(일) 동안 바뀌지 않은 본문 압축')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if options['measure']:
+            self._measure('실행 전')
+
+        for key, count in payloads.prune(dry_run=dry_run).items():
+            self.stdout.write(f'보관기간 경과 {key}: {count}건')
+        self.stdout.write(f'참조 없는 본문: {payloads.delete_orphans(dry_run=dry_run)}건')
+
+        count, before, after = payloads.compress(options['compress_after'], dry_run=dry_run)
+        self.stdout.write(f'압축 {count}건: {before:,} → {after:,} bytes')
+
+        if options['measure'] and not dry_run:
+            # 줄어든 공간은 VACUUM(PostgreSQL 은 autovacuum) 후 테이블 크기에 반영된다
+            self._measure('실행 후')
+
+    def _measure(self, title):
+        self.stdout.write(f'[{title}]')
+        rows = [(Payload, 'codec')] + [
+            (apps.get_model(label), date_field) for label, _, date_field in payloads.PAYLOAD_FIELDS
+        ]
+        for model, field in rows:
+            size = table_size(model._meta.db_table)
+            size = f'{size / 1024:,.0f}KB' if size is not None else '-'
+            self.stdout.write(
+                f'  {model._meta.db_table:<32} {model._default_manager.count():>8,}행 '
+                f'{size:>10}  스캔 {scan_time(model, field) * 1000:,.0f}ms'
+            )
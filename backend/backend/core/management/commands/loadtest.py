@@ -0,0 +1,224 @@
+"""
+WSGI / ASGI 처리량 비교 커맨드 (로컬 부하 테스트)
+
+같은 워커 수로 아래 방식을 차례로 띄우고
+읽기 엔드포인트에 동시 요청을 보내 초당 처리 건수와 지연시간을 출력한다.
+- BASELINE: --baseline-ref 커밋(async 전환 전)의 코드 + gunicorn sync 워커
+- WSGI: async 뷰 + gunicorn sync 워커
+- ASGI: async 뷰 + uvicorn 워커
+BASELINE 은 해당 커밋을 임시 git worktree 로 꺼내 같은 설정/DB 로 띄우고, 측정 후 지운다.
+NICEPAY 는 지연시간을 지정할 수 있는 로컬 가짜 서버로 대체한다.
+
+    python manage.py loadtest --user admin --workers 2 --concurrency 32 --duration 10 \
+        --baseline-ref <async 전환 직전 커밋>
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+
+
+SERVERS = {
+    'BASELINE': ['thesikpan.wsgi:application', '--worker-class', 'sync'],
+    'WSGI': ['thesikpan.wsgi:application', '--worker-class', 'sync'],
+    'ASGI': ['thesikpan.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+}
+
+
+@contextmanager
+def checkout(ref):
+    """ref 커밋을 임시 git worktree 로 꺼내고, 그 안의 BASE_DIR 경로를 돌려준다"""
+    def git(*args, cwd):
+        try:
+            return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError) as exc:
+            raise CommandError(f"git {' '.join(args)} 실패: {getattr(exc, 'stderr', '') or exc}")
+
+    root = git('rev-parse', '--show-toplevel', cwd=settings.BASE_DIR)
+    path = tempfile.mkdtemp(prefix='loadtest-baseline-')
+    try:
+        git('worktree', 'add', '--detach', path, ref, cwd=root)
+    except CommandError:
+        os.rmdir(path)
+        raise
+    try:
+        yield os.path.join(path, os.path.relpath(settings.BASE_DIR, root))
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', path], cwd=root, check=False)
+
+
+def start_fake_gateway(port, latency):
+    """회원 조회에 latency 초 후 정상등록으로 응답하는 가짜 NICEPAY 서버"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps({
+                'resultCd': '0000', 'resultMsg': '정상',
+                'memberInfo': {'status': 1, 'bankResultMsg': '정상'},
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            HTTPConnection('127.0.0.1', port, timeout=1).connect()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'서버가 {timeout}초 안에 뜨지 않았습니다 (port {port})')
+
+
+def run_load(port, paths, token, concurrency, duration):
+    """duration 초 동안 concurrency 개 연결로 paths 를 번갈아 요청"""
+    deadline = time.monotonic() + duration
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def client(index):
+        latencies, errors = [], 0
+        connection = HTTPConnection('127.0.0.1', port, timeout=30)
+        i = index
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+                    continue
+            except OSError:
+                errors += 1
+                connection.close()
+                connection = HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            latencies.append(time.perf_counter() - started)
+        connection.close()
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, range(concurrency)))
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(error for _, error in results)
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = '같은 워커 수에서 동기 뷰 기준선, WSGI, ASGI 의 초당 처리 건수를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='요청에 사용할 사용자 username')
+        parser.add_argument('--path', action='append', help='요청 경로 (반복 지정 가능)')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--gateway-port', type=int, default=8766)
+        parser.add_argument('--gateway-latency', type=float, default=0.05,
+                            help='가짜 NICEPAY 응답 지연 (초)')
+        parser.add_argument('--mode', choices=list(SERVERS), action='append',
+                            help='측정할 방식 (기본: 전부, --baseline-ref 가 없으면 BASELINE 제외)')
+        parser.add_argument('--baseline-ref',
+                            help='BASELINE 으로 띄울 git 커밋/브랜치 (async 전환 직전 커밋)')
+
+    def handle(self, *args, **options):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"사용자가 없습니다: {options['user']}")
+        token = str(AccessToken.for_user(user))
+
+        today = timezone.localdate()
+        paths = options['path'] or [
+            f'/api/v1/payments/settlements/calendar/{today.year}/{today.month}/',
+            '/api/v1/payments/nicepay/members/status/',
+        ]
+
+        modes = options['mode'] or [mode for mode in SERVERS if mode != 'BASELINE' or options['baseline_ref']]
+        if 'BASELINE' in modes and not options['baseline_ref']:
+            raise CommandError('BASELINE 측정에는 --baseline-ref 가 필요합니다.')
+
+        gateway = start_fake_gateway(options['gateway_port'], options['gateway_latency'])
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+            NICEPAY_BASE_URL=f"http://127.0.0.1:{options['gateway_port']}",
+            PYTHONPATH=os.pathsep.join(sys.path),
+        )
+        try:
+            for mode in modes:
+                if mode == 'BASELINE':
+                    self._measure_ref(options['baseline_ref'], paths, token, env, options)
+                else:
+                    self._measure(mode, paths, token, env, options)
+        finally:
+            gateway.shutdown()
+
+    def _measure_ref(self, ref, paths, token, env, options):
+        """ref 시점 코드로 BASELINE 측정 - import 경로의 BASE_DIR 을 worktree 로 바꾼다"""
+        base_dir = os.fspath(settings.BASE_DIR)
+        with checkout(ref) as cwd:
+            python_path = [cwd, *(p for p in sys.path if p and os.path.abspath(p) != base_dir)]
+            self._measure('BASELINE', paths, token,
+                          dict(env, PYTHONPATH=os.pathsep.join(python_path)), options, cwd=cwd)
+
+    def _measure(self, mode, paths, token, env, options, cwd=None):
+        command = [
+            sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+            '--workers', str(options['workers']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--log-level', 'warning',
+        ]
+        process = subprocess.Popen(command, cwd=cwd or settings.BASE_DIR, env=env)
+        try:
+            wait_for_port(options['port'])
+            latencies, errors = run_load(options['port'], paths, token,
+                                         options['concurrency'], options['duration'])
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        if not latencies:
+            self.stdout.write(f'{mode}: 성공한 요청 없음 (오류 {errors}건)')
+            return
+        rps = len(latencies) / options['duration']
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        self.stdout.write(
+            f"{mode}: {rps:.1f} req/s (워커 {options['workers']}, 동시 {options['concurrency']}) "
+            f'p50 {p50:.0f}ms p95 {p95:.0f}ms 오류 {errors}건'
+        )
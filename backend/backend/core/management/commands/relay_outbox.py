@@ -0,0 +1,46 @@
+"""
+변경 이벤트 릴레이 커맨드 (core.outbox)
+
+미발행 이벤트를 배치로 발행한다. 기본은 계속 실행하며 이벤트가 없으면 --interval 초 쉰다.
+
+    python manage.py relay_outbox                      # supervisor 로 상시 실행
+    python manage.py relay_outbox --once --transport local
+    python manage.py relay_outbox --prune              # 보관기간이 지난 이벤트 삭제 후 종료
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = '변경 이벤트(outbox)를 Redis 스트림 또는 로컬 큐로 발행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transport', choices=sorted(outbox.TRANSPORTS),
+                            default=settings.OUTBOX_TRANSPORT)
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=1.0, help='이벤트가 없을 때 대기(초)')
+        parser.add_argument('--once', action='store_true', help='미발행 이벤트를 모두 발행하고 종료')
+        parser.add_argument('--prune', action='store_true',
+                            help=f'발행 후 {settings.OUTBOX_RETENTION_DAYS}일이 지났고 모든 소비자가 처리한 이벤트 삭제')
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            self.stdout.write(f'이벤트 {outbox.prune()}건 삭제')
+            return
+
+        try:
+            transport = outbox.get_transport(options['transport'])
+        except ImportError as exc:
+            raise CommandError(f'{options["transport"]} 전송에 필요한 패키지가 없습니다: {exc}')
+
+        if options['once']:
+            self.stdout.write(f'이벤트 {outbox.relay(transport, options["batch_size"])}건 발행')
+            return
+
+        while True:
+            if not outbox.relay_batch(transport, options['batch_size']):
+                time.sleep(options['interval'])
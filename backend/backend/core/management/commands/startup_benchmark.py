@@ -0,0 +1,109 @@
+"""
+프로세스 기동 → 첫 응답 시간 측정 (회귀 벤치마크)
+
+새 파이썬 프로세스에서 django.setup() 과 첫 요청 1건을 처리하기까지의 시간을 반복 측정한다.
+--budget-ms 를 넘으면 실패하므로 CI 에서 기동 시간 회귀를 잡는 데 쓴다.
+
+    python manage.py startup_benchmark --repeat 5 --budget-ms 1500
+    python manage.py startup_benchmark --imports 15    # import 시간 상위 패키지
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import startup
+
+
+# 측정 대상 프로세스에서 실행할 코드 (manage.py / 워커와 같은 순서로 기동)
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+from django.conf import settings
+django.setup()
+setup_done = time.perf_counter()
+
+from django.test import Client
+from core import startup
+host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+response = Client(HTTP_HOST=host).get(sys.argv[1])
+done = time.perf_counter()
+
+print(json.dumps({
+    'setup': setup_done - started,
+    'first_request': done - setup_done,
+    'status': response.status_code,
+    'ready': startup.READY_TIMINGS,
+    'heavy': [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+# 첫 요청까지 불러오지 않아야 하는 모듈 (필요한 기능에서만 지연 로딩)
+HEAVY_MODULES = ('numpy', 'pandas', 'openpyxl', 'hypothesis')
+
+
+class Command(BaseCommand):
+    help = '새 프로세스의 기동부터 첫 응답까지 걸리는 시간을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/centers/1/roster/',
+                            help='첫 요청 경로 (기본: 인증이 필요한 DRF 엔드포인트)')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float,
+                            help='첫 응답까지 중앙값이 이 시간을 넘으면 실패')
+        parser.add_argument('--imports', type=int, metavar='N',
+                            help='python -X importtime 기준 import 시간 상위 N개 패키지 출력')
+
+    def _run_probe(self, path, importtime=False):
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', PROBE, path, *HEAVY_MODULES]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+                   PYTHONPATH=os.pathsep.join(sys.path))
+
+        started = time.perf_counter()
+        process = subprocess.run(command, cwd=settings.BASE_DIR, env=env,
+                                 capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if process.returncode != 0:
+            raise CommandError(f'측정 프로세스 실패:\n{process.stderr[-2000:]}')
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        result['total'] = elapsed
+        return result, process.stderr
+
+    def handle(self, *args, **options):
+        if options['imports']:
+            _, stderr = self._run_probe(options['path'], importtime=True)
+            self.stdout.write('import 시간 상위 패키지 (자체 시간 합계)')
+            for package, seconds in startup.import_report(stderr, top=options['imports']):
+                self.stdout.write(f'  {package:<24} {seconds * 1000:8.1f}ms')
+
+        runs = [self._run_probe(options['path'])[0] for _ in range(max(options['repeat'], 1))]
+
+        def median_ms(key):
+            return statistics.median(run[key] for run in runs) * 1000
+
+        last = runs[-1]
+        self.stdout.write(
+            f"첫 응답까지 {median_ms('total'):.0f}ms (중앙값, {len(runs)}회) - "
+            f"setup {median_ms('setup'):.0f}ms, 첫 요청 {median_ms('first_request'):.0f}ms, "
+            f"응답 {last['status']}"
+        )
+        self.stdout.write('ready: ' + ', '.join(
+            f'{label} {seconds * 1000:.1f}ms' for label, seconds in last['ready'].items()
+        ))
+        if last['heavy']:
+            self.stdout.write(self.style.WARNING(
+                f"첫 요청까지 불러온 무거운 모듈: {', '.join(last['heavy'])}"
+            ))
+
+        budget = options['budget_ms']
+        if budget is not None and median_ms('total') > budget:
+            raise CommandError(f"첫 응답까지 {median_ms('total'):.0f}ms 로 기준 {budget:.0f}ms 를 넘었습니다.")
@@ -2,10 +2,131 @@
 더식판 Core Models
 계층 구조: 본사 → 세척센터 → 배송센터 → 교육기관
 """
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import RegexValidator
 
+
+UNSCOPED_USER_TYPES = ('SUPER', 'HQ')
+
+
+class CenterQuerySet(models.QuerySet):
+
+    def accessible_to(self, user):
+        """
+        사용자가 접근 가능한 센터 (SQL 조건 하나로 표현 - 하위 센터를 파이썬으로 따라가지 않음)
+        - 슈퍼관리자/본사: 전체
+        - 세척센터 소속: 자신 + 하위 센터 (본사 → 세척센터 → 배송센터 계층이므로 2단계까지)
+        - 그 외: 자신의 센터
+        """
+        if user.is_superuser or user.user_type in UNSCOPED_USER_TYPES:
+            return self.all()
+        if not user.center_id:
+            return self.none()
+        return self.filter(
+            models.Q(pk=user.center_id)
+            | models.Q(parent_id=user.center_id, parent__center_type='WASH')
+            | models.Q(parent__parent_id=user.center_id, parent__parent__center_type='WASH')
+        )
+
+
+class CenterScopedQuerySet(models.QuerySet):
+    """
+    모델의 CENTER_PATH 경로로 센터 범위를 거는 QuerySet
+    for_user() 는 접근 가능한 센터를 서브쿼리로 넣으므로 목록 조회가 쿼리 1회로 끝난다.
+    """
+
+    def for_user(self, user):
+        if user.is_superuser or user.user_type in UNSCOPED_USER_TYPES:
+            return self.all()
+        if not user.center_id:
+            return self.none()
+        centers = Center.objects.accessible_to(user).values('pk')
+        return self.filter(**{f'{self.model.CENTER_PATH}__in': centers})
+
+
+class OutboxModel(models.Model):
+    """
+    추적 필드(OUTBOX_FIELDS)가 바뀌면 같은 트랜잭션에서 변경 이벤트(OutboxEvent) 기록
+    - save(): 불러온 시점 값과 비교해 바뀐 필드만 기록 (update_fields 지정 시 그 안에서만)
+    - 삭제: core.signals 에서 post_delete 로 기록
+    - bulk_create/bulk_update/update() 는 시그널이 없으므로 core.outbox 의 record_bulk/update_events 로 직접 기록
+    발행/소비는 core.outbox 참고
+    """
+    OUTBOX_TOPIC = None
+    OUTBOX_FIELDS = ()
+    # 이벤트에 함께 싣는 아동 ID 경로 (소비자가 아동 단위로 반영할 수 있게)
+    OUTBOX_CHILD_PATH = 'child_id'
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_outbox_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self.remember_outbox_state(fields)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+            changes = self.outbox_changes(update_fields, adding=adding)
+            if changes:
+                self.outbox_event('created' if adding else 'updated', changes).save(using=self._state.db)
+        self.remember_outbox_state(update_fields)
+
+    def remember_outbox_state(self, fields=None):
+        """비교 기준값 보관 (불러오지 않은 지연 필드는 제외)"""
+        loaded = self.__dict__.setdefault('_outbox_loaded', {})
+        for name in self.OUTBOX_FIELDS:
+            if name in self.__dict__ and (fields is None or name in fields):
+                loaded[name] = self.__dict__[name]
+
+    def outbox_changes(self, fields=None, adding=False):
+        """{필드: [이전 값, 새 값]} - 새 행은 이전 값 None, 불러온 값을 모르면 그대로 기록"""
+        loaded = self.__dict__.get('_outbox_loaded', {})
+        changes = {}
+        for name in self.OUTBOX_FIELDS:
+            if name not in self.__dict__ or (fields is not None and name not in fields):
+                continue
+            new = self.__dict__[name]
+            if adding or name not in loaded:
+                changes[name] = [None, new]
+            elif loaded[name] != new:
+                changes[name] = [loaded[name], new]
+        return changes
+
+    def outbox_child_id(self):
+        path = self.OUTBOX_CHILD_PATH
+        if path == 'pk':
+            return self.pk
+        name, _, rest = path.partition('__')
+        if not rest:
+            return getattr(self, name)
+        field = self._meta.get_field(name)
+        if field.is_cached(self):
+            return getattr(getattr(self, name), rest)
+        return (
+            field.related_model._default_manager
+            .filter(pk=getattr(self, field.attname))
+            .values_list(rest, flat=True)
+            .first()
+        )
+
+    def outbox_event(self, event_type, changes):
+        return OutboxEvent(
+            topic=self.OUTBOX_TOPIC, event_type=event_type, object_id=self.pk,
+            child_id=self.outbox_child_id(), changes=changes,
+        )
+
+
 # 3.1 기본정보 관리 - 대리점 정보
 class Center(models.Model):
     """센터 모델 (본사, 세척센터, 배송센터)"""
@@ -31,6 +152,8 @@ class Center(models.Model):
     is_active = models.BooleanField('활성화', default=True)
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
+
+    objects = CenterQuerySet.as_manager()
     
     class Meta:
         verbose_name = '센터'
@@ -110,7 +233,7 @@ class Classroom(models.Model):
         return f"{self.institution.name} - {self.name}"
 
 
-class Child(models.Model):
+class Child(OutboxModel):
     """아동 모델 (서비스 이용자)"""
     
     # 기본 정보
@@ -142,6 +265,12 @@ class Child(models.Model):
     notes = models.TextField('비고', blank=True)
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
+
+    CENTER_PATH = 'classroom__institution__delivery_center'
+    OUTBOX_TOPIC = 'child'
+    OUTBOX_FIELDS = ('is_active',)
+    OUTBOX_CHILD_PATH = 'pk'
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = '아동'
@@ -159,4 +288,83 @@ class Child(models.Model):
     @property
     def delivery_center(self):
         """담당 배송센터"""
-        return self.classroom.institution.delivery_center
\ No newline at end of file
+        return self.classroom.institution.delivery_center
+
+
+class Payload(models.Model):
+    """
+    큰 JSON 본문 별도 저장 (NICEPAY 응답, SMS 수신자 목록, 라벨 데이터, 채팅 로그)
+    본 테이블에는 이 행을 가리키는 ID 만 두어 목록 조회/스캔이 본문을 읽지 않게 한다.
+    저장/조회는 core.payloads 참고
+    """
+    
+    CODEC_CHOICES = [
+        ('json', 'JSON'),
+        ('zlib', 'zlib 압축 JSON'),
+    ]
+    
+    codec = models.CharField('인코딩', max_length=10, choices=CODEC_CHOICES, default='json')
+    data = models.BinaryField('본문')
+    size = models.PositiveIntegerField('원본 크기(bytes)')
+    created_at = models.DateTimeField('생성일', auto_now_add=True)
+    updated_at = models.DateTimeField('수정일', auto_now=True)
+    
+    class Meta:
+        verbose_name = '본문 저장소'
+        verbose_name_plural = '본문 저장소 목록'
+        indexes = [
+            models.Index(fields=['codec', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.pk} ({self.codec}, {self.size:,} bytes)"
+
+
+class OutboxEvent(models.Model):
+    """
+    변경 이벤트 (transactional outbox)
+    변경과 같은 트랜잭션에서 기록하고, relay_outbox 커맨드가 발행하면서 발행 순번(position)을 매긴다.
+    id 는 커밋 순서와 다를 수 있으므로 소비자 오프셋은 position 기준
+    """
+    
+    EVENT_TYPE_CHOICES = [
+        ('created', '생성'),
+        ('updated', '변경'),
+        ('deleted', '삭제'),
+    ]
+    
+    topic = models.CharField('토픽', max_length=30)
+    event_type = models.CharField('이벤트 종류', max_length=10, choices=EVENT_TYPE_CHOICES)
+    object_id = models.BigIntegerField('대상 ID')
+    # 대상이 삭제돼도 남도록 FK 가 아닌 정수로 보관
+    child_id = models.BigIntegerField('아동 ID', null=True, blank=True)
+    changes = models.JSONField('변경 내용', encoder=DjangoJSONEncoder,
+                               help_text='{필드: [이전 값, 새 값]}')
+    position = models.BigIntegerField('발행 순번', null=True, blank=True, unique=True)
+    created_at = models.DateTimeField('생성일', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = '변경 이벤트'
+        verbose_name_plural = '변경 이벤트 목록'
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(position__isnull=True),
+                         name='core_outbox_unpublished'),
+        ]
+    
+    def __str__(self):
+        return f"{self.topic}#{self.object_id} {self.event_type} {self.changes}"
+
+
+class ConsumerOffset(models.Model):
+    """변경 이벤트 소비자별 처리 위치 (마지막으로 처리한 position)"""
+    
+    consumer = models.CharField('소비자', max_length=50, unique=True)
+    position = models.BigIntegerField('처리 위치', default=0)
+    updated_at = models.DateTimeField('수정일', auto_now=True)
+    
+    class Meta:
+        verbose_name = '이벤트 소비 위치'
+        verbose_name_plural = '이벤트 소비 위치 목록'
+    
+    def __str__(self):
+        return f"{self.consumer} @ {self.position}"
@@ -0,0 +1,237 @@
+"""
+더식판 JSON 본문 저장소
+
+NICEPAY 응답/SMS 수신자 목록/라벨 데이터/채팅 로그처럼 큰 JSON 을 본 테이블에 두면
+그 열을 읽지 않는 조회도 큰 행을 스캔하게 된다. 본문은 Payload 테이블에 두고 본 테이블은 ID 만 가진다.
+
+- payload_property: 모델 속성처럼 읽고 쓰는 지연 로딩 프로퍼티 (처음 읽을 때 조회 1회)
+  여러 건을 읽을 때는 select_related('<이름>_payload') 로 함께 조회한다.
+- PayloadModel: save() 시 바뀐 본문만 Payload 에 저장 (bulk_create/bulk_update 는 반영되지 않음)
+- 새 본문은 JSON 그대로 저장하고, compact_payloads 커맨드가 오래된 본문을 zlib 으로 압축하거나
+  보관기간이 지난 본문을 삭제한다.
+"""
+import json
+import zlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.models import Payload
+
+
+COMPRESS_LEVEL = 9
+BATCH_SIZE = 500
+
+# (모델, 본문 이름, 보관기간 기준 시각 필드)
+PAYLOAD_FIELDS = [
+    ('payments.PaymentTransaction', 'nicepay_response', 'created_at'),
+    ('core.SMSHistory', 'recipients', 'created_at'),
+    ('core.LabelPrint', 'label_data', 'printed_at'),
+    ('core.ChatSupport', 'chat_log', 'started_at'),
+]
+
+
+def encode(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def raw_json(payload):
+    """Payload → 압축을 푼 JSON bytes"""
+    data = bytes(payload.data)
+    return zlib.decompress(data) if payload.codec == 'zlib' else data
+
+
+def payload_field(verbose_name):
+    """본문을 가리키는 FK (<이름>_payload)"""
+    return models.OneToOneField(Payload, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='+', verbose_name=verbose_name)
+
+
+class PayloadProperty(property):
+    """payload_property 가 만든 프로퍼티 (PayloadModel.save 가 update_fields 에서 구분)"""
+
+
+def payload_property(name, default=None):
+    """
+    <이름>_payload 를 통해 읽고 쓰는 JSON 프로퍼티
+    읽은 값을 그대로 수정해도(예: chat_log.append) save() 시 원본과 비교해 저장한다.
+    """
+
+    def _default():
+        return default() if callable(default) else default
+
+    def fget(self):
+        values = self.__dict__.setdefault('_payload_values', {})
+        if name not in values:
+            payload = getattr(self, f'{name}_payload')
+            if payload is None:
+                values[name] = _default()
+                original = None if values[name] is None else encode(values[name])
+            else:
+                original = raw_json(payload)
+                values[name] = json.loads(original)
+            self.__dict__.setdefault('_payload_originals', {})[name] = original
+        return values[name]
+
+    def fset(self, value):
+        self.__dict__.setdefault('_payload_values', {})[name] = value
+
+    return PayloadProperty(fget, fset)
+
+
+class PayloadModel(models.Model):
+    """payload_property 로 선언한 본문을 save() 시 Payload 에 반영"""
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        values = self.__dict__.get('_payload_values', {})
+        if update_fields is not None:
+            names = set(update_fields) & set(values)
+            # 읽지 않은 본문 이름은 바뀐 것이 없으므로 빼고, 읽은 본문은 <이름>_payload 로 바꾼다
+            kwargs['update_fields'] = [
+                f'{field}_payload' if field in names else field
+                for field in update_fields
+                if field in names or not isinstance(getattr(type(self), field, None), PayloadProperty)
+            ]
+        else:
+            names = set(values)
+
+        with transaction.atomic(using=kwargs.get('using')):
+            removed = [self._save_payload(name, values[name]) for name in sorted(names)]
+            super().save(*args, **kwargs)
+            Payload.objects.filter(pk__in=[pk for pk in removed if pk]).delete()
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_payload_values', None)
+        self.__dict__.pop('_payload_originals', None)
+        super().refresh_from_db(*args, **kwargs)
+
+    def _save_payload(self, name, value):
+        """바뀐 본문 저장 - 값이 None 이 되어 떼어낸 Payload ID 를 반환 (본 행 저장 후 삭제)"""
+        originals = self.__dict__.setdefault('_payload_originals', {})
+        data = None if value is None else encode(value)
+        if name in originals and originals[name] == data:
+            return None
+
+        payload_id = getattr(self, f'{name}_payload_id')
+
+        if data is None:
+            setattr(self, f'{name}_payload', None)
+            originals[name] = None
+            return payload_id
+
+        if payload_id is None:
+            setattr(self, f'{name}_payload', Payload.objects.create(codec='json', data=data, size=len(data)))
+        else:
+            Payload.objects.filter(pk=payload_id).update(
+                codec='json', data=data, size=len(data), updated_at=timezone.now(),
+            )
+            # 캐시된 Payload 인스턴스가 이전 본문을 돌려주지 않도록 다시 조회하게 한다
+            field = self._meta.get_field(f'{name}_payload')
+            if field.is_cached(self):
+                field.delete_cached_value(self)
+        originals[name] = data
+        return None
+
+
+# ==================== 보관/압축 ====================
+
+def _owners():
+    for label, name, date_field in PAYLOAD_FIELDS:
+        yield apps.get_model(label), name, date_field
+
+
+def retention_days(label, name):
+    return settings.PAYLOAD_RETENTION_DAYS.get(f'{label}.{name}')
+
+
+def prune(now=None, dry_run=False):
+    """
+    보관기간이 지난 본문 삭제 → {모델.본문: 건수}
+    본 행은 남기고 본문 참조만 비운다.
+    """
+    now = now or timezone.now()
+    summary = {}
+    for label, name, date_field in PAYLOAD_FIELDS:
+        days = retention_days(label, name)
+        if days is None:
+            continue
+        model = apps.get_model(label)
+        fk = f'{name}_payload'
+        expired = (
+            model._default_manager
+            .filter(**{f'{date_field}__lt': now - timedelta(days=days), f'{fk}__isnull': False})
+            .order_by()
+            .values_list('pk', f'{fk}_id')
+        )
+        if dry_run:
+            summary[f'{label}.{name}'] = expired.count()
+            continue
+        count = 0
+        while True:
+            batch = list(expired[:BATCH_SIZE])
+            if not batch:
+                break
+            with transaction.atomic():
+                model._default_manager.filter(pk__in=[pk for pk, _ in batch]).update(**{fk: None})
+                Payload.objects.filter(pk__in=[payload_id for _, payload_id in batch]).delete()
+            count += len(batch)
+        summary[f'{label}.{name}'] = count
+    return summary
+
+
+def delete_orphans(dry_run=False):
+    """어느 행도 가리키지 않는 본문 삭제 (본 행 삭제 시 남은 것)"""
+    orphans = Payload.objects.all()
+    for model, name, _ in _owners():
+        orphans = orphans.exclude(pk__in=model._default_manager.filter(
+            **{f'{name}_payload__isnull': False}
+        ).values(f'{name}_payload_id'))
+    if dry_run:
+        return orphans.count()
+    deleted = 0
+    while True:
+        ids = list(orphans.order_by().values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            return deleted
+        deleted += Payload.objects.filter(pk__in=ids).delete()[0]
+
+
+def compress(older_than_days, dry_run=False):
+    """
+    older_than_days 일 동안 바뀌지 않은 JSON 본문을 zlib 으로 압축 → (건수, 원본 bytes, 압축 후 bytes)
+    압축해도 작아지지 않는 본문은 그대로 둔다.
+    읽은 뒤 본문이 새로 저장되었으면(updated_at 이 달라짐) 새 본문을 덮어쓰지 않도록
+    읽은 시점의 updated_at 과 같을 때만 반영한다.
+    """
+    candidates = Payload.objects.filter(
+        codec='json', updated_at__lt=timezone.now() - timedelta(days=older_than_days),
+    ).order_by('pk')
+    count = before = after = 0
+    last_pk = 0
+    while True:
+        batch = list(candidates.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return count, before, after
+        last_pk = batch[-1].pk
+        with transaction.atomic():
+            for payload in batch:
+                data = bytes(payload.data)
+                compressed = zlib.compress(data, COMPRESS_LEVEL)
+                if len(compressed) >= len(data):
+                    continue
+                # 압축은 내용이 바뀌지 않으므로 updated_at 을 건드리지 않는다
+                if not dry_run and not Payload.objects.filter(
+                    pk=payload.pk, codec='json', updated_at=payload.updated_at,
+                ).update(codec='zlib', data=compressed):
+                    continue
+                count += 1
+                before += len(data)
+                after += len(compressed)
@@ -0,0 +1,128 @@
+"""
+더식판 배송센터 명단(로스터)
+배송/라벨 출력용 교육기관 → 반 → 이용 중인 아동(서비스 개수) 스냅샷
+
+- 배송센터별 활성 아동을 조인 1회로 조회해 JSON 본문을 미리 만들어 캐시한다.
+- 캐시 키에 센터별 버전 번호를 넣고, 아동/반/기관이 바뀌면 버전만 올려 무효화한다.
+  (이전 버전 스냅샷은 만료 시간에 맡긴다)
+- 버전은 웹 워커와 관리 명령/가져오기 작업이 함께 올리므로 공유 캐시(Redis, settings.CACHES)가 전제다.
+"""
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Child
+
+
+ROSTER_TIMEOUT = 60 * 60 * 24
+CENTER_PATH = 'classroom__institution__delivery_center_id'
+
+
+def version_key(center_id):
+    return f'roster:version:{center_id}'
+
+
+def snapshot_key(center_id, version):
+    return f'roster:{center_id}:v{version}'
+
+
+def get_version(center_id):
+    """
+    센터 명단 버전
+    버전 키가 없으면(최초/캐시 유실) 현재 시각으로 시작해 이전 스냅샷과 겹치지 않게 한다.
+    """
+    key = version_key(center_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns() // 1000, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(center_ids):
+    """센터 명단 버전 올리기 (커밋 후 반영)"""
+    center_ids = {center_id for center_id in center_ids if center_id is not None}
+
+    def bump():
+        for center_id in center_ids:
+            try:
+                cache.incr(version_key(center_id))
+            except ValueError:
+                get_version(center_id)
+
+    if center_ids:
+        transaction.on_commit(bump)
+
+
+def build_roster(center_id):
+    """
+    배송센터 명단 (조회 1회)
+    활성 기관/반/아동만 포함하고, 반/기관/센터 단위 아동 수와 서비스 개수 합계를 붙인다.
+    """
+    rows = (
+        Child.objects
+        .filter(**{CENTER_PATH: center_id},
+                is_active=True,
+                classroom__is_active=True,
+                classroom__institution__is_active=True)
+        .order_by('classroom__institution__name', 'classroom__institution_id',
+                  'classroom__name', 'name', 'pk')
+        .values_list('classroom__institution_id', 'classroom__institution__name',
+                     'classroom__institution__institution_type',
+                     'classroom_id', 'classroom__name',
+                     'pk', 'name', 'service_count')
+    )
+
+    institutions = []
+    institution = classroom = None
+    for (institution_id, institution_name, institution_type,
+         classroom_id, classroom_name, child_id, child_name, service_count) in rows:
+        if institution is None or institution['id'] != institution_id:
+            institution = {
+                'id': institution_id, 'name': institution_name,
+                'institution_type': institution_type,
+                'child_count': 0, 'service_total': 0, 'classrooms': [],
+            }
+            institutions.append(institution)
+            classroom = None
+        if classroom is None or classroom['id'] != classroom_id:
+            classroom = {
+                'id': classroom_id, 'name': classroom_name,
+                'child_count': 0, 'service_total': 0, 'children': [],
+            }
+            institution['classrooms'].append(classroom)
+
+        classroom['children'].append({'id': child_id, 'name': child_name,
+                                      'service_count': service_count})
+        for group in (classroom, institution):
+            group['child_count'] += 1
+            group['service_total'] += service_count
+
+    return {
+        'center_id': center_id,
+        'institution_count': len(institutions),
+        'classroom_count': sum(len(i['classrooms']) for i in institutions),
+        'child_count': sum(i['child_count'] for i in institutions),
+        'service_total': sum(i['service_total'] for i in institutions),
+        'institutions': institutions,
+    }
+
+
+def get_roster_payload(center_id):
+    """
+    캐시된 명단 JSON 본문 (version, bytes)
+    같은 버전이면 직렬화까지 끝난 본문을 그대로 돌려준다.
+    """
+    version = get_version(center_id)
+    key = snapshot_key(center_id, version)
+    payload = cache.get(key)
+    if payload is None:
+        roster = build_roster(center_id)
+        roster['version'] = version
+        roster['generated_at'] = timezone.now().isoformat()
+        payload = json.dumps(roster, ensure_ascii=False, separators=(',', ':')).encode()
+        cache.set(key, payload, ROSTER_TIMEOUT)
+    return version, payload
@@ -0,0 +1,104 @@
+"""
+더식판 Core Signals
+- 아동/반/교육기관 저장·삭제 시 배송센터 명단(roster) 버전 갱신
+- 변경 이벤트 추적 모델(OutboxModel) 삭제 시 삭제 이벤트 기록
+"""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import outbox, roster
+from core.models import Child, Classroom, Institution, OutboxModel
+
+
+def _classroom_center(classroom_id):
+    return (
+        Classroom.objects
+        .filter(pk=classroom_id)
+        .values_list('institution__delivery_center_id', flat=True)
+        .first()
+    )
+
+
+def _institution_center(institution_id):
+    return (
+        Institution.objects
+        .filter(pk=institution_id)
+        .values_list('delivery_center_id', flat=True)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Child)
+def remember_child_center(sender, instance, raw, **kwargs):
+    """반 이동으로 배송센터가 바뀌는 경우 이전 센터도 무효화하기 위해 보관"""
+    if raw or not instance.pk:
+        return
+    old_classroom_id = Child.objects.filter(pk=instance.pk).values_list('classroom_id', flat=True).first()
+    if old_classroom_id and old_classroom_id != instance.classroom_id:
+        instance._roster_old_center_id = _classroom_center(old_classroom_id)
+
+
+@receiver(post_save, sender=Child)
+@receiver(post_delete, sender=Child)
+def invalidate_child_roster(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    roster.invalidate([
+        _classroom_center(instance.classroom_id),
+        getattr(instance, '_roster_old_center_id', None),
+    ])
+
+
+@receiver(pre_save, sender=Classroom)
+def remember_classroom_center(sender, instance, raw, **kwargs):
+    if raw or not instance.pk:
+        return
+    old_institution_id = (
+        Classroom.objects.filter(pk=instance.pk).values_list('institution_id', flat=True).first()
+    )
+    if old_institution_id and old_institution_id != instance.institution_id:
+        instance._roster_old_center_id = _institution_center(old_institution_id)
+
+
+@receiver(post_save, sender=Classroom)
+@receiver(post_delete, sender=Classroom)
+def invalidate_classroom_roster(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    roster.invalidate([
+        _institution_center(instance.institution_id),
+        getattr(instance, '_roster_old_center_id', None),
+    ])
+
+
+@receiver(pre_save, sender=Institution)
+def remember_institution_center(sender, instance, raw, **kwargs):
+    if raw or not instance.pk:
+        return
+    instance._roster_old_center_id = _institution_center(instance.pk)
+
+
+@receiver(post_save, sender=Institution)
+@receiver(post_delete, sender=Institution)
+def invalidate_institution_roster(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    roster.invalidate([
+        instance.delivery_center_id,
+        getattr(instance, '_roster_old_center_id', None),
+    ])
+
+
+# ==================== 변경 이벤트 ====================
+
+def record_outbox_delete(sender, instance, using, **kwargs):
+    """삭제 이벤트 기록 (삭제와 같은 트랜잭션 - Collector.delete 는 atomic)"""
+    outbox.deleted_event(instance).save(using=using)
+
+
+# 모든 모델에 연결하면 Django 가 빠른 삭제(fast delete)를 쓰지 못하므로 추적 모델에만 연결
+for model in apps.get_models():
+    if issubclass(model, OutboxModel):
+        post_delete.connect(record_outbox_delete, sender=model,
+                            dispatch_uid=f'core.outbox.delete.{model._meta.label}')
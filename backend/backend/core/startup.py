@@ -0,0 +1,98 @@
+"""
+더식판 프로세스 기동 계측
+
+워커가 자주 재시작되고(ECS 오토스케일링) 기동 시간이 곧 첫 응답 지연이므로
+- TimedAppConfig: 각 앱의 AppConfig.ready 소요시간 기록 (ready 대신 on_ready 구현)
+- 첫 요청(request_started) 시점에 프로세스 시작 후 경과시간과 앱별 ready 시간을 1회 로그
+- import_report: python -X importtime 출력을 최상위 패키지별로 집계
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.apps import AppConfig
+from django.core.signals import request_started
+
+
+logger = logging.getLogger(__name__)
+
+_MODULE_LOADED = time.time()
+
+READY_TIMINGS = {}
+FIRST_REQUEST = {}
+
+
+def process_started_at():
+    """프로세스 시작 시각 (epoch 초) - /proc 을 읽을 수 없으면 이 모듈 로드 시각"""
+    try:
+        with open('/proc/self/stat') as stat:
+            # comm 에 공백이 있을 수 있으므로 마지막 ')' 뒤부터 필드를 나눈다
+            fields = stat.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as uptime:
+            booted_at = time.time() - float(uptime.read().split()[0])
+        return booted_at + int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return _MODULE_LOADED
+
+
+@contextmanager
+def app_ready(app_config):
+    """AppConfig.ready 소요시간 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        READY_TIMINGS[app_config.label] = time.perf_counter() - started
+
+
+class TimedAppConfig(AppConfig):
+    """ready() 소요시간을 READY_TIMINGS 에 기록하는 AppConfig - 초기화 코드는 on_ready() 에 둔다"""
+
+    def ready(self):
+        with app_ready(self):
+            self.on_ready()
+
+    def on_ready(self):
+        pass
+
+
+def _on_first_request(sender, **kwargs):
+    request_started.disconnect(dispatch_uid='core.startup.first_request')
+    FIRST_REQUEST['elapsed'] = time.time() - process_started_at()
+    logger.info(
+        '첫 요청까지 %.0fms (ready: %s)',
+        FIRST_REQUEST['elapsed'] * 1000,
+        ', '.join(f'{label} {seconds * 1000:.1f}ms' for label, seconds in READY_TIMINGS.items()),
+    )
+
+
+def watch_first_request():
+    request_started.connect(_on_first_request, dispatch_uid='core.startup.first_request')
+
+
+def import_report(stderr, top=20):
+    """
+    python -X importtime 출력 집계
+    반환: [(최상위 패키지, 자체 import 시간 합계 초), ...] 큰 순서
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(package, micros / 1e6) for package, micros in ranked[:top]]
+
+
+def warm_up():
+    """
+    URLconf(전체 뷰 모듈)를 미리 불러온다.
+    wsgi/asgi 모듈에서 호출하므로 gunicorn --preload 로 띄우면 마스터에서 한 번만 불러오고,
+    재시작된 워커는 이미 불러온 상태로 fork 되어 첫 요청에서 import 비용을 치르지 않는다.
+    """
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
@@ -1,3 +1,452 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import zlib
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import User
+from core.management.commands import benchmark_outbox
+from core.management.commands.startup_benchmark import HEAVY_MODULES
+from core import checks, outbox, payloads, roster
+from core.models import (
+    Center, Child, Classroom, ConsumerOffset, Institution, OutboxEvent, Payload,
+)
+from core.utils import ChatSupport, QnA, SMSHistory
+from payments.models import CMSMember, PaymentTransaction, Settlement, UnpaidManagement
+
+
+SCOPED_MODELS = (Child, CMSMember, PaymentTransaction, UnpaidManagement, Settlement, SMSHistory, QnA)
+
+
+class StartupImportTests(SimpleTestCase):
+
+    def test_heavy_modules_load_lazily(self):
+        """django.setup() 과 URLconf 로딩만으로는 분석/엑셀/테스트 라이브러리를 불러오지 않는다"""
+        code = (
+            'import json, sys, django\n'
+            'django.setup()\n'
+            'from core.startup import warm_up\n'
+            'warm_up()\n'
+            f'print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+                   PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(json.loads(output), [])
+
+
+class ScopedQueryTests(TestCase):
+    """
+    본사 → 세척센터 → (배송센터 A, 세척 지점 → 배송센터 B), 본사 → 배송센터 C
+    for_user() 는 범위를 서브쿼리로 넣으므로 역할과 관계없이 목록 조회가 쿼리 1회다.
+    """
+
+    # 역할별로 보여야 하는 배송센터
+    VISIBLE = {
+        'SUPER': {'A', 'B', 'C'},
+        'HQ': {'A', 'B', 'C'},
+        'WASH': {'A', 'B'},
+        'DELIVERY': {'A'},
+        'INSTITUTION': {'B'},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        def center(name, center_type, parent=None):
+            return Center.objects.create(name=name, center_type=center_type, parent=parent,
+                                         address='-', phone='-', business_number=f'{name}-사업자')
+
+        cls.hq = center('본사', 'HQ')
+        cls.wash = center('세척센터', 'WASH', cls.hq)
+        cls.branch = center('세척 지점', 'WASH', cls.wash)
+        cls.delivery = {
+            'A': center('배송센터 A', 'DELIVERY', cls.wash),
+            'B': center('배송센터 B', 'DELIVERY', cls.branch),
+            'C': center('배송센터 C', 'DELIVERY', cls.hq),
+        }
+        for name, delivery in cls.delivery.items():
+            institution = Institution.objects.create(
+                name=f'{name} 어린이집', institution_type='OTHER', delivery_center=delivery, address='-',
+                phone='-', contact_person='-', contact_phone='-', service_start_date=timezone.localdate(),
+            )
+            classroom = Classroom.objects.create(institution=institution, name='새싹반')
+            child = Child.objects.create(classroom=classroom, name=f'아동 {name}', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=timezone.localdate())
+            member = CMSMember.objects.create(
+                child=child, nicepay_member_id=f'M-{name}', bank_code='004', bank_name='-',
+                account_number='-', account_holder='-', monthly_amount=30000,
+            )
+            PaymentTransaction.objects.create(cms_member=member, transaction_date=timezone.localdate(),
+                                              scheduled_amount=30000)
+
+        cls.users = {
+            'SUPER': User.objects.create(username='super', user_type='SUPER'),
+            'HQ': User.objects.create(username='hq', user_type='HQ', center=cls.hq),
+            'WASH': User.objects.create(username='wash', user_type='CENTER', center=cls.wash),
+            'DELIVERY': User.objects.create(username='delivery', user_type='CENTER',
+                                            center=cls.delivery['A'], is_staff=True),
+            'INSTITUTION': User.objects.create(username='institution', user_type='INSTITUTION',
+                                               center=cls.delivery['B']),
+        }
+        cls.users['DELIVERY'].user_permissions.set(Permission.objects.filter(
+            codename__in=['view_child', 'view_paymenttransaction'],
+        ))
+
+    def test_wash_center_sees_child_and_grandchild_centers(self):
+        self.assertEqual(
+            set(Center.objects.accessible_to(self.users['WASH'])),
+            {self.wash, self.branch, self.delivery['A'], self.delivery['B']},
+        )
+
+    def test_each_role_lists_its_rows_in_one_query(self):
+        for role, user in self.users.items():
+            with self.subTest(role=role):
+                with self.assertNumQueries(1):
+                    children = {child.name for child in Child.objects.for_user(user)}
+                self.assertEqual(children, {f'아동 {name}' for name in self.VISIBLE[role]})
+                with self.assertNumQueries(1):
+                    members = set(
+                        PaymentTransaction.objects.for_user(user)
+                        .values_list('cms_member__nicepay_member_id', flat=True)
+                    )
+                self.assertEqual(members, {f'M-{name}' for name in self.VISIBLE[role]})
+                for model in SCOPED_MODELS:
+                    with self.assertNumQueries(1):
+                        list(model.objects.for_user(user))
+
+    def test_user_without_center_sees_nothing(self):
+        user = User(user_type='CENTER')
+        for model in SCOPED_MODELS:
+            with self.subTest(model=model.__name__), self.assertNumQueries(0):
+                self.assertEqual(list(model.objects.for_user(user)), [])
+
+    def test_admin_changelist_is_scoped(self):
+        self.client.force_login(self.users['DELIVERY'])
+        for model in (Child, PaymentTransaction):
+            url = f'/admin/{model._meta.app_label}/{model._meta.model_name}/'
+            with self.subTest(model=model.__name__):
+                # 세션 + 사용자 + 권한 2회 + 건수 1회 + 목록 1회 (범위 때문에 늘어나는 쿼리 없음)
+                with self.assertNumQueries(6):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context['cl'].result_count, 1)
+                self.assertContains(response, '아동 A')
+                for other in ('아동 B', '아동 C'):
+                    self.assertNotContains(response, other)
+
+
+class PayloadPropertyTests(SimpleTestCase):
+
+    def test_default_and_assignment_without_queries(self):
+        self.assertEqual(ChatSupport().chat_log, [])
+        self.assertIsNone(PaymentTransaction().nicepay_response)
+        txn = PaymentTransaction(nicepay_response={'resultCd': '0000'})
+        self.assertEqual(txn.nicepay_response, {'resultCd': '0000'})
+
+    def test_compressed_payload_reads_back(self):
+        data = payloads.encode([{'from': 'parent', 'text': '출금일 문의'}] * 100)
+        support = ChatSupport(chat_log_payload=Payload(codec='zlib', data=zlib.compress(data), size=len(data)))
+        self.assertEqual(support.chat_log, [{'from': 'parent', 'text': '출금일 문의'}] * 100)
+
+
+class PayloadStoreTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        center = Center.objects.create(name='배송센터', center_type='DELIVERY', address='-', phone='-',
+                                       business_number='배송-사업자')
+        institution = Institution.objects.create(
+            name='해바라기 어린이집', institution_type='OTHER', delivery_center=center, address='-',
+            phone='-', contact_person='-', contact_phone='-', service_start_date=timezone.localdate(),
+        )
+        child = Child.objects.create(classroom=Classroom.objects.create(institution=institution, name='새싹반'),
+                                     name='아동', parent_name='-', parent_phone='010-1234-5678',
+                                     enrollment_date=timezone.localdate())
+        cls.member = CMSMember.objects.create(
+            child=child, nicepay_member_id='M0', bank_code='004', bank_name='-',
+            account_number='-', account_holder='-', monthly_amount=30000,
+        )
+
+    def _transaction(self, response):
+        txn = PaymentTransaction(cms_member=self.member, transaction_date=timezone.localdate(),
+                                 scheduled_amount=30000, nicepay_response=response)
+        txn.save()
+        return txn
+
+    def test_update_fields_with_payload_name(self):
+        txn = self._transaction({'resultCd': '0000'})
+        payload_id = txn.nicepay_response_payload_id
+
+        # 본문을 읽지 않은 행: 본문 이름은 빼고 나머지만 저장
+        txn = PaymentTransaction.objects.get(pk=txn.pk)
+        txn.status = 'SUCCESS'
+        txn.save(update_fields=['status', 'nicepay_response'])
+        txn = PaymentTransaction.objects.get(pk=txn.pk)
+        self.assertEqual((txn.status, txn.nicepay_response_payload_id), ('SUCCESS', payload_id))
+
+        # 읽지 않고 바로 대입한 본문도 저장
+        txn.nicepay_response = {'resultCd': '1001'}
+        txn.save(update_fields=['nicepay_response'])
+        self.assertEqual(PaymentTransaction.objects.get(pk=txn.pk).nicepay_response, {'resultCd': '1001'})
+
+    def test_compress_skips_payload_rewritten_after_read(self):
+        first = self._transaction({'items': ['출금 결과'] * 50})
+        second = self._transaction({'items': ['출금 결과'] * 60})
+        old = timezone.now() - timedelta(days=60)
+        Payload.objects.update(updated_at=old)
+        compress, calls = zlib.compress, []
+
+        def save_during_compress(data, level):
+            # 첫 본문을 읽은 뒤 압축하는 사이에 새 응답이 저장된 경우
+            if not calls:
+                first.nicepay_response = {'resultCd': '0000'}
+                first.save(update_fields=['nicepay_response'])
+            calls.append(data)
+            return compress(data, level)
+
+        with mock.patch.object(payloads.zlib, 'compress', side_effect=save_during_compress):
+            count, before, after = payloads.compress(older_than_days=30)
+
+        self.assertEqual(count, 1)
+        self.assertGreater(before, after)
+        rewritten = Payload.objects.get(pk=first.nicepay_response_payload_id)
+        self.assertEqual((rewritten.codec, payloads.raw_json(rewritten)), ('json', b'{"resultCd":"0000"}'))
+        compressed = Payload.objects.get(pk=second.nicepay_response_payload_id)
+        self.assertEqual((compressed.codec, compressed.updated_at), ('zlib', old))
+        self.assertEqual(PaymentTransaction.objects.get(pk=second.pk).nicepay_response,
+                         {'items': ['출금 결과'] * 60})
+
+    @override_settings(PAYLOAD_RETENTION_DAYS={'payments.PaymentTransaction.nicepay_response': 30})
+    def test_prune_clears_expired_payloads_and_keeps_rows(self):
+        expired = self._transaction({'resultCd': '0000'})
+        kept = self._transaction({'resultCd': '0000'})
+        now = timezone.now()
+        PaymentTransaction.objects.filter(pk=expired.pk).update(created_at=now - timedelta(days=31))
+        label = 'payments.PaymentTransaction.nicepay_response'
+
+        self.assertEqual(payloads.prune(now=now, dry_run=True), {label: 1})
+        self.assertEqual(Payload.objects.count(), 2)
+        self.assertEqual(payloads.prune(now=now), {label: 1})
+
+        expired = PaymentTransaction.objects.get(pk=expired.pk)
+        self.assertIsNone(expired.nicepay_response)
+        self.assertEqual(PaymentTransaction.objects.get(pk=kept.pk).nicepay_response, {'resultCd': '0000'})
+        self.assertEqual(list(Payload.objects.values_list('pk', flat=True)), [kept.nicepay_response_payload_id])
+
+    def test_delete_orphans_keeps_referenced_payloads(self):
+        txn = self._transaction({'resultCd': '0000'})
+        deleted = self._transaction({'resultCd': '0000'})
+        # 본 행만 삭제되어 본문이 남은 경우
+        PaymentTransaction.objects.filter(pk=deleted.pk).delete()
+
+        self.assertEqual(payloads.delete_orphans(dry_run=True), 1)
+        self.assertEqual(payloads.delete_orphans(), 1)
+        self.assertEqual(list(Payload.objects.values_list('pk', flat=True)), [txn.nicepay_response_payload_id])
+
+
+class OutboxChangeTests(SimpleTestCase):
+
+    def _member(self, status):
+        return CMSMember.from_db('default', ['id', 'child_id', 'status'], [7, 3, status])
+
+    def test_only_changed_tracked_fields_are_recorded(self):
+        member = self._member('PENDING')
+        member.bank_name = '국민은행'
+        self.assertEqual(member.outbox_changes(), {})
+
+        member.status = 'ACTIVE'
+        self.assertEqual(member.outbox_changes(), {'status': ['PENDING', 'ACTIVE']})
+        self.assertEqual(member.outbox_changes(fields=['bank_name']), {})
+
+        event = member.outbox_event('updated', member.outbox_changes())
+        self.assertEqual((event.topic, event.object_id, event.child_id), ('cms_member', 7, 3))
+
+    def test_deferred_field_is_not_recorded(self):
+        member = CMSMember.from_db('default', ['id', 'child_id'], [7, 3])
+        self.assertEqual(member.outbox_changes(), {})
+        self.assertEqual(outbox.deleted_event(member).changes, {})
+
+    def test_new_row_records_initial_values(self):
+        child = Child(pk=5, is_active=True)
+        self.assertEqual(child.outbox_changes(adding=True), {'is_active': [None, True]})
+        self.assertEqual(child.outbox_event('created', {}).child_id, 5)
+
+    def test_stream_message_fields_are_strings(self):
+        event = OutboxEvent(pk=1, position=10, topic='unpaid', event_type='updated', object_id=2,
+                            child_id=None, changes={'paid_amount': [0, Decimal('30000')]},
+                            created_at=timezone.now())
+        fields = outbox.message(event)
+        self.assertTrue(all(isinstance(value, str) for value in fields.values()))
+        self.assertEqual(json.loads(fields['changes']), {'paid_amount': [0, '30000']})
+
+
+class OutboxStreamTests(TestCase):
+
+    def _events(self, count):
+        outbox.record([
+            OutboxEvent(topic='cms_member', event_type='updated', object_id=i, changes={})
+            for i in range(count)
+        ])
+        return list(OutboxEvent.objects.order_by('pk'))
+
+    def _positions(self):
+        return list(OutboxEvent.objects.order_by('pk').values_list('position', flat=True))
+
+    def test_save_positions_with_non_consecutive_ids(self):
+        events = self._events(8)
+        # 롤백된 트랜잭션 등으로 id 에 빈틈이 생긴 경우
+        OutboxEvent.objects.filter(pk__in=[events[2].pk, events[5].pk, events[6].pk]).delete()
+        events = [event for i, event in enumerate(events) if i not in (2, 5, 6)]
+        for position, event in enumerate(events, start=101):
+            event.position = position
+
+        with CaptureQueriesContext(connection) as queries:
+            outbox._save_positions(events)
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(self._positions(), [101, 102, 103, 104, 105])
+
+    def test_relay_batches_assign_gap_free_positions(self):
+        events = self._events(9)
+        OutboxEvent.objects.filter(pk=events[4].pk).delete()
+        transport = outbox.LocalTransport()
+
+        self.assertEqual([outbox.relay_batch(transport, batch_size=3) for _ in range(4)], [3, 3, 2, 0])
+        self.assertEqual(self._positions(), list(range(1, 9)))
+        self.assertEqual(ConsumerOffset.objects.get(consumer=outbox.RELAY_CURSOR).position, 8)
+
+        self._events(2)
+        self.assertEqual(outbox.relay(transport, batch_size=3), 2)
+        self.assertEqual(self._positions(), list(range(1, 11)))
+
+    def test_consume_rolls_back_offset_when_handler_fails(self):
+        self._events(3)
+        outbox.relay(outbox.LocalTransport())
+        ConsumerOffset.objects.create(consumer='analytics')
+
+        def fail(events):
+            raise RuntimeError('handler failed')
+
+        with self.assertRaises(RuntimeError):
+            outbox.consume('analytics', fail)
+        self.assertEqual(ConsumerOffset.objects.get(consumer='analytics').position, 0)
+
+        received = []
+        self.assertEqual(outbox.consume('analytics', received.extend, batch_size=2), 2)
+        self.assertEqual([event.position for event in received], [1, 2])
+        self.assertEqual(outbox.consume('analytics', received.extend), 1)
+        self.assertEqual(ConsumerOffset.objects.get(consumer='analytics').position, 3)
+
+    def test_prune_keeps_events_the_slowest_consumer_has_not_read(self):
+        self._events(6)
+        outbox.relay(outbox.LocalTransport())
+        self._events(1)  # 미발행
+        now = timezone.now()
+        OutboxEvent.objects.update(created_at=now - timedelta(days=30))
+        ConsumerOffset.objects.create(consumer='analytics', position=6)
+        ConsumerOffset.objects.create(consumer='notifications', position=4)
+
+        self.assertEqual(outbox.prune(days=7, now=now), 4)
+        self.assertEqual(self._positions(), [5, 6, None])
+
+        ConsumerOffset.objects.filter(consumer='notifications').update(position=6)
+        self.assertEqual(outbox.prune(days=40, now=now), 0)
+        self.assertEqual(outbox.prune(days=7, now=now), 2)
+
+
+class RosterCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.center = Center.objects.create(name='배송센터', center_type='DELIVERY', address='-', phone='-',
+                                           business_number='배송-사업자')
+        institution = Institution.objects.create(
+            name='해바라기 어린이집', institution_type='OTHER', delivery_center=cls.center, address='-',
+            phone='-', contact_person='-', contact_phone='-', service_start_date=timezone.localdate(),
+        )
+        cls.classroom = Classroom.objects.create(institution=institution, name='새싹반')
+        cls.child = Child.objects.create(classroom=cls.classroom, name='아동', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=timezone.localdate())
+
+    def setUp(self):
+        cache.clear()
+
+    def _roster(self):
+        version, payload = roster.get_roster_payload(self.center.pk)
+        return version, json.loads(payload)
+
+    def test_second_call_is_served_from_cache(self):
+        first = roster.get_roster_payload(self.center.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(roster.get_roster_payload(self.center.pk), first)
+
+    def test_child_and_classroom_changes_bump_version_after_commit(self):
+        version, data = self._roster()
+        self.assertEqual(data['service_total'], 1)
+
+        self.child.service_count = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.save()
+            self.assertEqual(roster.get_version(self.center.pk), version)
+        old_version, (version, data) = version, self._roster()
+        self.assertGreater(version, old_version)
+        self.assertEqual(data['service_total'], 3)
+
+        self.classroom.name = '햇살반'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.save()
+        self.assertGreater(roster.get_version(self.center.pk), version)
+        _, data = self._roster()
+        self.assertEqual(data['institutions'][0]['classrooms'][0]['name'], '햇살반')
+
+    def test_rolled_back_change_keeps_version(self):
+        version, _ = self._roster()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.child.service_count = 3
+                    self.child.save()
+                    raise RuntimeError('rollback')
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(roster.get_version(self.center.pk), version)
+        with self.assertNumQueries(0):
+            _, data = self._roster()
+        self.assertEqual(data['service_total'], 1)
+
+
+class OutboxBenchmarkTests(SimpleTestCase):
+
+    def test_redis_benchmark_refuses_live_stream_prefix(self):
+        with self.assertRaises(CommandError):
+            benchmark_outbox.make_transport('redis', settings.OUTBOX_STREAM_PREFIX)
+        self.assertIsInstance(benchmark_outbox.make_transport('local', 'outbox-benchmark'), outbox.LocalTransport)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+
+    @override_settings(TESTING=False)
+    def test_process_local_cache_is_an_error(self):
+        for backend in checks.PROCESS_LOCAL_CACHE_BACKENDS:
+            with self.subTest(backend=backend), self.settings(CACHES={'default': {'BACKEND': backend}}):
+                self.assertEqual([e.id for e in checks.check_shared_cache(None)], ['core.E001'])
+
+    @override_settings(TESTING=False, CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/0',
+    }})
+    def test_redis_cache_passes(self):
+        self.assertEqual(checks.check_shared_cache(None), [])
@@ -5,11 +5,12 @@
 """
 from django.db import models
 from accounts.models import User
-from core.models import Center, Institution, Classroom, Child
+from core.models import Center, CenterScopedQuerySet, Institution, Classroom, Child
+from core.payloads import PayloadModel, payload_field, payload_property
 
 
 # 3.5.1 라벨지 관리
-class LabelPrint(models.Model):
+class LabelPrint(PayloadModel):
     """라벨 출력 이력"""
     
     center = models.ForeignKey(Center, on_delete=models.CASCADE, 
@@ -21,8 +22,9 @@ class LabelPrint(models.Model):
     print_date = models.DateField('출력일')
     total_count = models.IntegerField('총 출력 수량')
     
-    # 라벨 데이터 (JSON으로 저장)
-    label_data = models.JSONField('라벨 데이터', help_text='아동별 서비스 개수 포함')
+    # 라벨 데이터 (JSON, 본문 저장소에 보관)
+    label_data_payload = payload_field('라벨 데이터')
+    label_data = payload_property('label_data')  # 아동별 서비스 개수 포함
     
     # 출력자 정보
     printed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True,
@@ -68,7 +70,7 @@ class SMSTemplate(models.Model):
         return f"[{self.get_template_type_display()}] {self.name}"
 
 
-class SMSHistory(models.Model):
+class SMSHistory(PayloadModel):
     """SMS 발송 이력"""
     
     STATUS_CHOICES = [
@@ -86,7 +88,8 @@ class SMSHistory(models.Model):
     
     # 수신자 정보
     recipient_count = models.IntegerField('수신자 수')
-    recipients = models.JSONField('수신자 목록')
+    recipients_payload = payload_field('수신자 목록')
+    recipients = payload_property('recipients', default=list)
     
     # 메시지 내용
     message = models.TextField('메시지')
@@ -101,6 +104,9 @@ class SMSHistory(models.Model):
                                related_name='sms_sent', verbose_name='발송자')
     sent_at = models.DateTimeField('발송일시', null=True, blank=True)
     created_at = models.DateTimeField('생성일', auto_now_add=True)
+
+    CENTER_PATH = 'center'
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'SMS 발송'
@@ -173,6 +179,9 @@ class QnA(models.Model):
     # 관리 정보
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
+
+    CENTER_PATH = 'center'
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Q&A'
@@ -183,7 +192,7 @@ class QnA(models.Model):
         return f"[{self.get_status_display()}] {self.title}"
 
 
-class ChatSupport(models.Model):
+class ChatSupport(PayloadModel):
     """실시간 채팅 상담"""
     
     STATUS_CHOICES = [
@@ -201,7 +210,8 @@ class ChatSupport(models.Model):
     
     # 상담 내용
     subject = models.CharField('상담 주제', max_length=200)
-    chat_log = models.JSONField('채팅 로그', default=list)
+    chat_log_payload = payload_field('채팅 로그')
+    chat_log = payload_property('chat_log', default=list)
     
     # 상담원 정보
     agent = models.ForeignKey(User, on_delete=models.SET_NULL, null=True,
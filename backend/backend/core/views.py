@@ -1,3 +1,31 @@
-from django.shortcuts import render
+"""
+더식판 Core Views
+"""
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
 
-# Create your views here.
+from core import roster
+
+
+@api_view(['GET'])
+def delivery_roster(request, center_id):
+    """
+    배송센터 명단 - 교육기관 → 반 → 이용 중인 아동(서비스 개수)
+    캐시된 JSON 본문을 그대로 내려주고, 버전이 같으면 304 응답
+    """
+    if not request.user.get_accessible_centers().filter(pk=center_id, center_type='DELIVERY').exists():
+        return Response(status=status.HTTP_403_FORBIDDEN)
+
+    version = roster.get_version(center_id)
+    etag = f'"roster-{center_id}-{version}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        version, payload = roster.get_roster_payload(center_id)
+        etag = f'"roster-{center_id}-{version}"'
+        response = HttpResponse(payload, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
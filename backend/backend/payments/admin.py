@@ -1,3 +1,125 @@
+"""
+더식판 Payments Admin
+출금 거래 상태는 정산 달력 집계(시그널)와 연결되어 있어 일괄 상태 변경 작업을 두지 않는다.
+"""
 from django.contrib import admin
+from django.db.models import F
 
-# Register your models here.
+from core.admin import CenterScopedAdmin, EstimatedCountPaginator
+from payments import money, parent_portal
+from payments.models import (
+    CMSEvidenceFile, CMSMember, PaymentDeadLetter, PaymentTransaction, Settlement,
+    SettlementCalendarDay, UnpaidManagement,
+)
+
+
+CHILD_CENTER = 'child__classroom__institution__delivery_center'
+
+
+@admin.register(CMSMember)
+class CMSMemberAdmin(CenterScopedAdmin):
+    center_lookup = CHILD_CENTER
+    paginator = EstimatedCountPaginator
+    list_display = ['nicepay_member_id', 'child', 'bank_name', 'account_holder', 'monthly_amount',
+                    'payment_day', 'status', 'registration_result_code']
+    list_filter = ['status']
+    list_select_related = ['child__classroom__institution']
+    search_fields = ['nicepay_member_id', 'child__name', 'account_holder']
+    autocomplete_fields = ['child']
+
+
+@admin.register(CMSEvidenceFile)
+class CMSEvidenceFileAdmin(CenterScopedAdmin):
+    center_lookup = f'cms_member__{CHILD_CENTER}'
+    list_display = ['cms_member', 'agree_type', 'file_ext', 'file_size', 'status', 'result_code',
+                    'sent_at']
+    list_filter = ['status', 'agree_type']
+    list_select_related = ['cms_member__child']
+    search_fields = ['cms_member__nicepay_member_id']
+    autocomplete_fields = ['cms_member']
+
+
+@admin.register(PaymentTransaction)
+class PaymentTransactionAdmin(CenterScopedAdmin):
+    center_lookup = f'cms_member__{CHILD_CENTER}'
+    paginator = EstimatedCountPaginator
+    list_display = ['__str__', 'scheduled_amount', 'actual_amount', 'status', 'failure_code',
+                    'retry_count', 'next_retry_date']
+    list_filter = ['status']
+    list_select_related = ['cms_member__child']
+    search_fields = ['cms_member__nicepay_member_id', 'nicepay_transaction_id']
+    autocomplete_fields = ['cms_member']
+    exclude = ['nicepay_response_payload']
+    readonly_fields = ['nicepay_response']
+
+
+@admin.register(PaymentDeadLetter)
+class PaymentDeadLetterAdmin(CenterScopedAdmin):
+    center_lookup = f'transaction__cms_member__{CHILD_CENTER}'
+    list_display = ['transaction', 'reason', 'failure_code', 'retry_count', 'is_resolved',
+                    'created_at']
+    list_filter = ['reason', 'is_resolved']
+    list_select_related = ['transaction__cms_member__child']
+    autocomplete_fields = ['transaction', 'unpaid']
+    actions = ['resolve_selected']
+
+    @admin.action(description='선택 항목 처리완료')
+    def resolve_selected(self, request, queryset):
+        self.update_selected(request, queryset, '처리완료', is_resolved=True)
+
+
+@admin.register(SettlementCalendarDay)
+class SettlementCalendarDayAdmin(CenterScopedAdmin):
+    paginator = EstimatedCountPaginator
+    list_display = ['date', 'center', 'status', 'transaction_count', 'scheduled_amount',
+                    'actual_amount', 'updated_at']
+    list_filter = ['status']
+    list_select_related = ['center']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(UnpaidManagement)
+class UnpaidManagementAdmin(CenterScopedAdmin):
+    center_lookup = CHILD_CENTER
+    paginator = EstimatedCountPaginator
+    list_display = ['child', 'unpaid_month', 'unpaid_amount', 'paid_amount', 'status', 'paid_date']
+    list_filter = ['status']
+    list_select_related = ['child__classroom__institution']
+    search_fields = ['child__name', 'child__parent_name']
+    autocomplete_fields = ['child']
+    actions = ['exempt_selected']
+
+    @admin.action(description='선택 항목 면제 처리')
+    def exempt_selected(self, request, queryset):
+        child_ids = set(queryset.values_list('child_id', flat=True))
+        self.update_selected(request, queryset, '면제 처리', status='EXEMPTED')
+        parent_portal.refresh(child_ids)
+
+
+@admin.register(Settlement)
+class SettlementAdmin(CenterScopedAdmin):
+    list_display = ['center', 'settlement_month', 'settlement_date', 'total_children',
+                    'collected_amount', 'commission_amount', 'net_amount', 'status']
+    list_filter = ['status']
+    list_select_related = ['center']
+    search_fields = ['center__name']
+    autocomplete_fields = ['center']
+    readonly_fields = ['version', 'completed_at']
+    actions = ['recalculate_commission_selected']
+
+    @admin.action(description='선택 정산 수수료 재계산')
+    def recalculate_commission_selected(self, request, queryset):
+        # 수수료율만 바꾼 행은 save() 에서 다시 계산하지 않으므로 DB 에서 일괄 계산
+        self.update_selected(request, queryset, '수수료 재계산',
+                             version=F('version') + 1, **money.commission_changes())
+
+    def save_model(self, request, obj, form, change):
+        # 조정 API(adjust_settlement)의 버전 비교가 관리자 수정도 감지하도록 버전을 올린다
+        if change:
+            obj.version += 1
+        super().save_model(request, obj, form, change)
@@ -1,6 +1,9 @@
-from django.apps import AppConfig
+from core import startup
 
 
-class PaymentsConfig(AppConfig):
+class PaymentsConfig(startup.TimedAppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payments'
+
+    def on_ready(self):
+        from payments import signals  # noqa: F401
@@ -0,0 +1,96 @@
+"""
+더식판 영업일 계산
+src/mock-server/settlement-calendar.ts 와 같은 규칙 (주말/공휴일 제외)
+"""
+from datetime import date, datetime, time, timedelta
+
+
+# 공휴일 (매년 갱신 필요)
+HOLIDAYS = frozenset(date.fromisoformat(d) for d in [
+    # 2024
+    '2024-01-01',                                            # 신정
+    '2024-02-09', '2024-02-10', '2024-02-11', '2024-02-12',  # 설날 연휴
+    '2024-03-01',                                            # 삼일절
+    '2024-04-10',                                            # 국회의원 선거일
+    '2024-05-05', '2024-05-06',                              # 어린이날, 대체휴일
+    '2024-05-15',                                            # 부처님오신날
+    '2024-06-06',                                            # 현충일
+    '2024-08-15',                                            # 광복절
+    '2024-09-16', '2024-09-17', '2024-09-18',                # 추석 연휴
+    '2024-10-03',                                            # 개천절
+    '2024-10-09',                                            # 한글날
+    '2024-12-25',                                            # 성탄절
+
+    # 2025
+    '2025-01-01',                                            # 신정
+    '2025-01-28', '2025-01-29', '2025-01-30',                # 설날 연휴
+    '2025-03-01',                                            # 삼일절
+    '2025-05-05',                                            # 어린이날
+    '2025-05-06',                                            # 부처님오신날
+    '2025-06-06',                                            # 현충일
+    '2025-08-15',                                            # 광복절
+    '2025-10-03',                                            # 개천절
+    '2025-10-05', '2025-10-06', '2025-10-07', '2025-10-08',  # 추석 연휴
+    '2025-10-09',                                            # 한글날
+    '2025-12-25',                                            # 성탄절
+
+    # 2026
+    '2026-01-01',                                            # 신정
+    '2026-02-16', '2026-02-17', '2026-02-18',                # 설날 연휴
+    '2026-03-02',                                            # 삼일절 대체휴일
+    '2026-05-05',                                            # 어린이날
+    '2026-05-25',                                            # 부처님오신날 대체휴일
+    '2026-06-03',                                            # 지방선거일
+    '2026-08-17',                                            # 광복절 대체휴일
+    '2026-09-24', '2026-09-25', '2026-09-26',                # 추석 연휴
+    '2026-10-05',                                            # 개천절 대체휴일
+    '2026-10-09',                                            # 한글날
+    '2026-12-25',                                            # 성탄절
+])
+
+# 출금신청 마감: 출금요청일 D-1 영업일 17시
+WITHDRAWAL_CUTOFF = time(17, 0)
+
+
+def is_business_day(day):
+    """영업일 여부 (주말/공휴일 제외)"""
+    return day.weekday() < 5 and day not in HOLIDAYS
+
+
+def next_business_day(day):
+    """다음 영업일"""
+    day += timedelta(days=1)
+    while not is_business_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def previous_business_day(day):
+    """이전 영업일"""
+    day -= timedelta(days=1)
+    while not is_business_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def add_business_days(day, days):
+    """영업일 기준 N일 후"""
+    for _ in range(days):
+        day = next_business_day(day)
+    return day
+
+
+def earliest_withdrawal_date(now):
+    """
+    지금 출금신청 시 가장 빠른 출금요청일
+    - 영업일 17시 전: 다음 영업일
+    - 그 외 (17시 이후, 비영업일): 다음 영업일의 다음 영업일
+    """
+    if isinstance(now, datetime):
+        today, current = now.date(), now.time()
+    else:
+        today, current = now, time(0, 0)
+
+    if is_business_day(today) and current < WITHDRAWAL_CUTOFF:
+        return next_business_day(today)
+    return add_business_days(today, 2)
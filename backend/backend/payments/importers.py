@@ -0,0 +1,355 @@
+"""
+더식판 회원 일괄 등록
+3.3 / 5.2 센터 일괄 입력 - 엑셀/CSV 파일로 아동 및 CMS 회원 등록
+
+파일을 한 줄씩 읽으면서 BATCH_SIZE 단위로 검증/저장한다.
+- 반(Classroom)은 배송센터 기준으로 한 번에 조회해 둔 맵에서 찾는다
+- NICEPAY 회원ID 중복은 배치당 한 번의 IN 조회로 확인한다
+- 배치마다 savepoint 안에서 bulk_create 하고, 실패한 배치만 롤백한다
+  (롤백된 배치의 회원ID 는 파일 내 중복 판정에 남기지 않는다)
+"""
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+
+from core import outbox, roster
+from core.models import Child, Classroom
+from payments.models import CMSMember
+
+
+BATCH_SIZE = 1000
+
+PHONE_REGEX = re.compile(r'^01[016789]-?\d{3,4}-?\d{4}$')
+EMAIL_REGEX = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# 금융결제원 은행코드 (3자리 숫자)
+BANK_CODE_REGEX = re.compile(r'^\d{3}$')
+
+# 엑셀 헤더(한글) → 필드 키
+HEADER_ALIASES = {
+    '기관명': 'institution',
+    '반 이름': 'classroom',
+    '반': 'classroom',
+    '아동 이름': 'name',
+    '보호자 이름': 'parent_name',
+    '보호자 연락처': 'parent_phone',
+    '보호자 이메일': 'parent_email',
+    '서비스 개수': 'service_count',
+    '등록일': 'enrollment_date',
+    '출금일': 'payment_day',
+    '월 이용료': 'monthly_fee',
+    'NICEPAY 회원ID': 'nicepay_member_id',
+    '은행코드': 'bank_code',
+    '은행명': 'bank_name',
+    '계좌번호': 'account_number',
+    '예금주명': 'account_holder',
+    '예금주 생년월일': 'id_no',
+}
+
+REQUIRED_FIELDS = ['institution', 'classroom', 'name', 'parent_name', 'parent_phone',
+                   'enrollment_date']
+CMS_REQUIRED_FIELDS = ['bank_code', 'bank_name', 'account_number', 'account_holder']
+
+
+@dataclass
+class RowError:
+    """행 단위 오류"""
+    row: int
+    field: str
+    message: str
+
+
+@dataclass
+class ImportResult:
+    """일괄 등록 결과"""
+    total_rows: int = 0
+    created_children: int = 0
+    created_members: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def failed_rows(self):
+        return len({error.row for error in self.errors})
+
+    def write_error_report(self, fileobj):
+        """행별 오류 리포트(CSV) 작성"""
+        writer = csv.writer(fileobj)
+        writer.writerow(['행', '항목', '오류'])
+        for error in sorted(self.errors, key=lambda e: e.row):
+            writer.writerow([error.row, error.field, error.message])
+
+
+def _normalize_header(value):
+    value = str(value or '').strip()
+    return HEADER_ALIASES.get(value, value)
+
+
+def iter_csv_rows(fileobj):
+    """CSV 파일을 (행번호, dict) 로 순차 반환 (헤더가 1행)"""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(fileobj)
+    header = [_normalize_header(h) for h in next(reader, [])]
+    for row_number, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        yield row_number, dict(zip(header, values))
+
+
+def iter_xlsx_rows(path):
+    """엑셀(xlsx) 파일을 read-only 모드로 순차 반환 (openpyxl 필요)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportError('엑셀 파일을 읽으려면 openpyxl 패키지가 필요합니다.') from exc
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_normalize_header(h) for h in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if not any(v not in (None, '') for v in values):
+                continue
+            yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(path):
+    """확장자에 따라 CSV/엑셀 리더 선택"""
+    if str(path).lower().endswith(('.xlsx', '.xlsm')):
+        yield from iter_xlsx_rows(path)
+        return
+    with open(path, encoding='utf-8-sig', newline='') as fileobj:
+        yield from iter_csv_rows(fileobj)
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = _text(value)
+    for fmt in ('%Y-%m-%d', '%Y.%m.%d', '%Y/%m/%d', '%Y%m%d'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError
+
+
+class MemberImporter:
+    """
+    배송센터 단위 아동/CMS 회원 일괄 등록
+
+    사용 예:
+        importer = MemberImporter(center)
+        result = importer.run(iter_rows('members.xlsx'))
+    """
+
+    def __init__(self, center, batch_size=BATCH_SIZE, dry_run=False):
+        self.center = center
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.classroom_map = self._load_classrooms()
+
+    def _load_classrooms(self):
+        """(기관명, 반 이름) → 반 ID 맵 (쿼리 1회)"""
+        classrooms = Classroom.objects.filter(
+            institution__delivery_center=self.center,
+            is_active=True,
+        ).values_list('id', 'institution__name', 'name')
+        return {(inst_name, name): pk for pk, inst_name, name in classrooms}
+
+    def run(self, rows):
+        result = ImportResult()
+        seen_member_ids = set()
+        batch = []
+
+        with transaction.atomic():
+            for row_number, raw in rows:
+                result.total_rows += 1
+                batch.append((row_number, raw))
+                if len(batch) >= self.batch_size:
+                    self._process_batch(batch, seen_member_ids, result)
+                    batch = []
+            if batch:
+                self._process_batch(batch, seen_member_ids, result)
+
+            # bulk_create 는 시그널이 없으므로 배송센터 명단 버전을 직접 올린다 (커밋 시 반영)
+            if result.created_children:
+                roster.invalidate([self.center.pk])
+            if self.dry_run:
+                transaction.set_rollback(True)
+
+        return result
+
+    def _process_batch(self, batch, seen_member_ids, result):
+        valid = []
+        for row_number, raw in batch:
+            cleaned, errors = self._clean_row(row_number, raw)
+            if errors:
+                result.errors.extend(errors)
+            else:
+                valid.append((row_number, cleaned))
+
+        # 파일 내 중복 + DB 중복을 배치당 한 번에 확인
+        batch_ids = {c['nicepay_member_id'] for _, c in valid if c['nicepay_member_id']}
+        existing = set(
+            CMSMember.objects.filter(nicepay_member_id__in=batch_ids)
+            .values_list('nicepay_member_id', flat=True)
+        ) if batch_ids else set()
+
+        rows_to_create = []
+        batch_member_ids = set()
+        for row_number, cleaned in valid:
+            member_id = cleaned['nicepay_member_id']
+            if member_id:
+                if member_id in seen_member_ids or member_id in batch_member_ids:
+                    result.errors.append(RowError(row_number, 'nicepay_member_id',
+                                                  '파일 내 중복된 NICEPAY 회원ID입니다.'))
+                    continue
+                if member_id in existing:
+                    result.errors.append(RowError(row_number, 'nicepay_member_id',
+                                                  '이미 등록된 NICEPAY 회원ID입니다.'))
+                    continue
+                batch_member_ids.add(member_id)
+            rows_to_create.append((row_number, cleaned))
+
+        # 저장에 성공한 배치의 회원ID 만 이후 배치의 중복 판정에 쓴다
+        if rows_to_create and self._save_batch(rows_to_create, result):
+            seen_member_ids.update(batch_member_ids)
+
+    def _save_batch(self, rows, result):
+        """배치 저장 (savepoint) → 성공 여부"""
+        try:
+            with transaction.atomic():
+                children = Child.objects.bulk_create([
+                    Child(
+                        classroom_id=cleaned['classroom_id'],
+                        name=cleaned['name'],
+                        parent_name=cleaned['parent_name'],
+                        parent_phone=cleaned['parent_phone'],
+                        parent_email=cleaned['parent_email'],
+                        service_count=cleaned['service_count'],
+                        enrollment_date=cleaned['enrollment_date'],
+                        payment_day=cleaned['payment_day'],
+                        monthly_fee=cleaned['monthly_fee'],
+                    )
+                    for _, cleaned in rows
+                ], batch_size=self.batch_size)
+
+                members = CMSMember.objects.bulk_create([
+                    CMSMember(
+                        child=child,
+                        nicepay_member_id=cleaned['nicepay_member_id'],
+                        bank_code=cleaned['bank_code'],
+                        bank_name=cleaned['bank_name'],
+                        account_number=cleaned['account_number'],
+                        account_holder=cleaned['account_holder'],
+                        id_no=cleaned['id_no'],
+                        payment_day=cleaned['payment_day'],
+                        monthly_amount=cleaned['monthly_fee'],
+                    )
+                    for child, (_, cleaned) in zip(children, rows)
+                    if cleaned['nicepay_member_id']
+                ], batch_size=self.batch_size)
+                # bulk_create 는 시그널이 없으므로 생성 이벤트를 직접 기록
+                outbox.record_bulk(children, 'created')
+                outbox.record_bulk(members, 'created')
+        except IntegrityError as exc:
+            # 동시 등록 등으로 배치 저장 실패 시 해당 배치만 롤백
+            for row_number, _ in rows:
+                result.errors.append(RowError(row_number, '', f'저장 실패: {exc}'))
+            return False
+
+        result.created_children += len(children)
+        result.created_members += len(members)
+        return True
+
+    def _clean_row(self, row_number, raw):
+        errors = []
+        data = {key: _text(raw.get(key)) for key in HEADER_ALIASES.values()}
+
+        for key in REQUIRED_FIELDS:
+            if not data[key]:
+                errors.append(RowError(row_number, key, '필수 항목입니다.'))
+        if errors:
+            return None, errors
+
+        cleaned = {
+            'name': data['name'],
+            'parent_name': data['parent_name'],
+            'parent_email': data['parent_email'],
+            'nicepay_member_id': data['nicepay_member_id'],
+            'bank_code': data['bank_code'],
+            'bank_name': data['bank_name'],
+            'account_number': data['account_number'],
+            'account_holder': data['account_holder'],
+            'id_no': data['id_no'],
+        }
+
+        cleaned['classroom_id'] = self.classroom_map.get((data['institution'], data['classroom']))
+        if cleaned['classroom_id'] is None:
+            errors.append(RowError(row_number, 'classroom',
+                                   f"'{data['institution']} - {data['classroom']}' 반을 찾을 수 없습니다."))
+
+        phone = data['parent_phone']
+        if not PHONE_REGEX.match(phone):
+            errors.append(RowError(row_number, 'parent_phone', '연락처 형식이 올바르지 않습니다.'))
+        cleaned['parent_phone'] = phone
+
+        if cleaned['parent_email'] and not EMAIL_REGEX.match(cleaned['parent_email']):
+            errors.append(RowError(row_number, 'parent_email', '이메일 형식이 올바르지 않습니다.'))
+
+        try:
+            cleaned['enrollment_date'] = _parse_date(raw.get('enrollment_date'))
+        except ValueError:
+            errors.append(RowError(row_number, 'enrollment_date', '날짜 형식이 올바르지 않습니다.'))
+
+        try:
+            cleaned['payment_day'] = int(data['payment_day'] or 25)
+            if not 1 <= cleaned['payment_day'] <= 31:
+                raise ValueError
+        except ValueError:
+            errors.append(RowError(row_number, 'payment_day', '출금일은 1-31 사이여야 합니다.'))
+
+        try:
+            cleaned['service_count'] = int(data['service_count'] or 1)
+            if cleaned['service_count'] < 1:
+                raise ValueError
+        except ValueError:
+            errors.append(RowError(row_number, 'service_count', '서비스 개수가 올바르지 않습니다.'))
+
+        try:
+            fee = Decimal(data['monthly_fee'].replace(',', '') or '30000')
+            if fee < 0 or fee != fee.to_integral_value():
+                raise InvalidOperation
+            cleaned['monthly_fee'] = fee
+        except InvalidOperation:
+            errors.append(RowError(row_number, 'monthly_fee', '월 이용료가 올바르지 않습니다.'))
+
+        if cleaned['nicepay_member_id']:
+            for key in CMS_REQUIRED_FIELDS:
+                if not cleaned[key]:
+                    errors.append(RowError(row_number, key, 'CMS 회원 등록 시 필수 항목입니다.'))
+
+        # 엑셀이 숫자로 읽은 은행코드(004 → 4)는 3자리로 되돌린다
+        if cleaned['bank_code'].isdigit():
+            cleaned['bank_code'] = cleaned['bank_code'].zfill(3)
+        if cleaned['bank_code'] and not BANK_CODE_REGEX.match(cleaned['bank_code']):
+            errors.append(RowError(row_number, 'bank_code', '은행코드는 3자리 숫자여야 합니다.'))
+
+        return cleaned, errors
@@ -0,0 +1,38 @@
+"""
+월 정산 확정 커맨드
+
+    python manage.py finalize_settlements 2024-12 --create
+    python manage.py finalize_settlements 2024-12 --workers 4
+"""
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.settlements import CLAIM_BATCH_SIZE, create_month_settlements, run_parallel
+
+
+class Command(BaseCommand):
+    help = '배송센터별 월 정산을 정산예정 → 정산완료로 확정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', help='정산월 (YYYY-MM)')
+        parser.add_argument('--create', action='store_true',
+                            help='정산 행이 없는 배송센터의 정산예정 행을 먼저 생성')
+        parser.add_argument('--workers', type=int, default=4, help='프로세스 수')
+        parser.add_argument('--batch-size', type=int, default=CLAIM_BATCH_SIZE,
+                            help='워커가 한 번에 선점하는 정산 수')
+
+    def handle(self, *args, **options):
+        try:
+            parsed = datetime.strptime(options['month'], '%Y-%m')
+        except ValueError:
+            raise CommandError(f"YYYY-MM 형식이 아닙니다: {options['month']}")
+        settlement_month = date(parsed.year, parsed.month, 1)
+
+        if options['create']:
+            total = create_month_settlements(settlement_month)
+            self.stdout.write(f'{settlement_month:%Y-%m} 정산 {total}건')
+
+        completed = run_parallel(settlement_month, workers=options['workers'],
+                                 batch_size=options['batch_size'])
+        self.stdout.write(f'정산 확정 {completed}건')
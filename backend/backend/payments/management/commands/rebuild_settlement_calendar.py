@@ -0,0 +1,37 @@
+"""
+정산 달력 집계 재계산 커맨드 (초기 적재/보정용)
+
+    python manage.py rebuild_settlement_calendar 2024-12
+    python manage.py rebuild_settlement_calendar 2024-01 --to 2024-12
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.settlement_calendar import month_range, rebuild
+
+
+def _parse_month(value):
+    try:
+        parsed = datetime.strptime(value, '%Y-%m')
+    except ValueError:
+        raise CommandError(f'YYYY-MM 형식이 아닙니다: {value}')
+    return parsed.year, parsed.month
+
+
+class Command(BaseCommand):
+    help = '출금 거래에서 정산 달력 일별 집계를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', help='시작 월 (YYYY-MM)')
+        parser.add_argument('--to', help='종료 월 (YYYY-MM, 기본: 시작 월)')
+        parser.add_argument('--center', type=int, action='append', help='배송센터 ID (반복 지정 가능)')
+
+    def handle(self, *args, **options):
+        start, _ = month_range(*_parse_month(options['month']))
+        _, end = month_range(*_parse_month(options['to'] or options['month']))
+        if start > end:
+            raise CommandError('종료 월이 시작 월보다 앞설 수 없습니다.')
+
+        created = rebuild(start, end, center_ids=options['center'])
+        self.stdout.write(f'{start} ~ {end} 집계 {created}행 생성')
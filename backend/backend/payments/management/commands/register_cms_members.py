@@ -0,0 +1,32 @@
+"""
+NICEPAY CMS 회원 일괄 등록/상태 동기화 커맨드
+
+    python manage.py register_cms_members          # 승인대기 회원 등록 요청
+    python manage.py register_cms_members --sync   # 등록 결과 조회 후 상태 반영
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.registration import BATCH_SIZE, register_pending_members, sync_member_statuses
+
+
+class Command(BaseCommand):
+    help = '승인대기 CMS 회원을 NICEPAY 에 일괄 등록하거나 등록 결과를 동기화합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true', help='등록 결과 조회(polling)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.NICEPAY_MAX_WORKERS,
+                            help='NICEPAY 동시 요청 수')
+
+    def handle(self, *args, **options):
+        if options['sync']:
+            updated = sync_member_statuses(batch_size=options['batch_size'],
+                                           max_workers=options['workers'])
+            self.stdout.write(f'상태 변경 {updated}명')
+            return
+
+        summary = register_pending_members(batch_size=options['batch_size'],
+                                           max_workers=options['workers'])
+        self.stdout.write(f"등록 요청 {summary['submitted']}명 / 등록실패 {summary['failed']}명 / "
+                          f"재요청 대기 {summary['retry']}명")
@@ -0,0 +1,31 @@
+"""
+출금실패 건 재시도 커맨드 (매 영업일 17시 전 실행)
+
+    python manage.py retry_failed_payments
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.retry import BATCH_SIZE, schedule_retries, submit_due_retries
+
+
+class Command(BaseCommand):
+    help = '출금실패 건의 재출금 예정일을 지정하고, 예정일이 된 건을 NICEPAY 에 재신청합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.NICEPAY_MAX_WORKERS,
+                            help='NICEPAY 동시 요청 수')
+        parser.add_argument('--schedule-only', action='store_true',
+                            help='재출금 예정일 지정만 하고 NICEPAY 신청은 하지 않음')
+
+    def handle(self, *args, **options):
+        summary = schedule_retries(batch_size=options['batch_size'])
+        self.stdout.write(f"재시도 예약 {summary['scheduled']}건 / "
+                          f"재시도 불가 {summary['dead_lettered']}건")
+        if options['schedule_only']:
+            return
+
+        summary = submit_due_retries(batch_size=options['batch_size'],
+                                     max_workers=options['workers'])
+        self.stdout.write(f"재출금 신청 {summary['submitted']}건 / 실패 {summary['failed']}건")
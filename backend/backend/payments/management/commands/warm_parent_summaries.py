@@ -0,0 +1,35 @@
+"""
+학부모 페이지 요약 미리 만들기 커맨드
+
+출금일 전에 실행해 출금일 조회가 캐시에서만 처리되게 한다.
+공유 캐시(Redis)에 저장하므로 모든 웹 워커가 같은 요약을 읽는다.
+프로세스별 캐시로 설정돼 있으면 시스템 체크(core.E001)에서 실행을 막는다.
+
+    python manage.py warm_parent_summaries --payment-day 25
+    python manage.py warm_parent_summaries --center 3
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Child
+from payments.parent_portal import store_summaries
+
+
+class Command(BaseCommand):
+    help = '활성 아동의 학부모 페이지 요약을 미리 만들어 캐시에 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--center', type=int, help='배송센터 ID')
+        parser.add_argument('--payment-day', type=int, help='CMS 출금일이 이 날인 아동만')
+
+    def handle(self, *args, **options):
+        children = Child.objects.filter(is_active=True)
+        if options['center']:
+            children = children.filter(classroom__institution__delivery_center_id=options['center'])
+        if options['payment_day']:
+            children = children.filter(cms_member__payment_day=options['payment_day'])
+
+        started = time.perf_counter()
+        stored = store_summaries(children.order_by('pk').values_list('pk', flat=True))
+        self.stdout.write(f'요약 {stored}건 저장 ({time.perf_counter() - started:.1f}초)')
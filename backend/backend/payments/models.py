@@ -3,13 +3,16 @@
 3.2 자동이체 관리 (NICEPAY CMS)
 3.4 정산관리
 """
+from django.core.files.storage import storages
 from django.db import models
 from django.utils import timezone
-from core.models import Child, Center
+from core.models import CenterScopedQuerySet, Child, Center, OutboxModel
+from core.payloads import PayloadModel, payload_field, payload_property
+from payments.money import commission_and_net
 from decimal import Decimal
 
 
-class CMSMember(models.Model):
+class CMSMember(OutboxModel):
     """NICEPAY CMS 회원 정보 (3.2.1 회원상태/출금설정)"""
     
     child = models.OneToOneField(Child, on_delete=models.CASCADE, 
@@ -24,6 +27,8 @@ class CMSMember(models.Model):
     bank_name = models.CharField('은행명', max_length=50)
     account_number = models.CharField('계좌번호', max_length=50)
     account_holder = models.CharField('예금주명', max_length=50)
+    id_no = models.CharField('예금주 생년월일', max_length=10, blank=True,
+                             help_text='생년월일 6자리 또는 사업자번호 10자리')
     
     # 출금 설정
     payment_day = models.IntegerField('출금일', default=25, 
@@ -36,12 +41,23 @@ class CMSMember(models.Model):
         ('PAUSED', '일시정지'),
         ('CANCELLED', '해지'),
         ('PENDING', '승인대기'),
+        ('FAILED', '등록실패'),
     ]
     status = models.CharField('상태', max_length=20, choices=STATUS_CHOICES, default='PENDING')
     
+    # NICEPAY 등록 요청 정보
+    registration_requested_at = models.DateTimeField('등록요청일시', null=True, blank=True)
+    registration_result_code = models.CharField('등록 결과코드', max_length=10, blank=True)
+    registration_message = models.CharField('등록 결과메시지', max_length=200, blank=True)
+    
     # 관리 정보
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
+
+    CENTER_PATH = 'child__classroom__institution__delivery_center'
+    OUTBOX_TOPIC = 'cms_member'
+    OUTBOX_FIELDS = ('status',)
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'CMS 회원'
@@ -52,7 +68,53 @@ class CMSMember(models.Model):
         return f"{self.child.name} - {self.get_status_display()}"
 
 
-class PaymentTransaction(models.Model):
+def evidence_storage():
+    """증빙파일 저장소 (settings.STORAGES['evidence'] - 로컬 디스크 또는 S3 호환)"""
+    return storages['evidence']
+
+
+class CMSEvidenceFile(models.Model):
+    """CMS 출금동의 증빙파일 (4.1 자동이체 신청)"""
+    
+    AGREE_TYPE_CHOICES = [
+        ('1', '서면'),
+        ('2', '공인전자서명'),
+        ('4', '녹취'),
+    ]
+    
+    cms_member = models.OneToOneField(CMSMember, on_delete=models.CASCADE,
+                                      related_name='evidence_file', verbose_name='CMS 회원')
+    
+    # 파일 정보
+    agree_type = models.CharField('증빙구분', max_length=1, choices=AGREE_TYPE_CHOICES)
+    file = models.FileField('증빙파일', upload_to='cms/evidence/%Y/%m/', storage=evidence_storage)
+    file_ext = models.CharField('확장자', max_length=10)
+    file_size = models.IntegerField('파일 크기(byte)', default=0)
+    
+    # NICEPAY 전송 정보
+    STATUS_CHOICES = [
+        ('PENDING', '전송대기'),
+        ('SENT', '전송완료'),
+        ('FAILED', '전송실패'),
+    ]
+    status = models.CharField('상태', max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    result_code = models.CharField('결과코드', max_length=10, blank=True)
+    sent_at = models.DateTimeField('전송일시', null=True, blank=True)
+    
+    # 관리 정보
+    created_at = models.DateTimeField('생성일', auto_now_add=True)
+    updated_at = models.DateTimeField('수정일', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'CMS 증빙파일'
+        verbose_name_plural = 'CMS 증빙파일 목록'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.cms_member.nicepay_member_id} - {self.get_agree_type_display()}"
+
+
+class PaymentTransaction(OutboxModel, PayloadModel):
     """출금 거래 내역 (3.2.2 출금결과조회, 3.2.4 회원별 납부이력)"""
     
     cms_member = models.ForeignKey(CMSMember, on_delete=models.CASCADE, 
@@ -60,6 +122,8 @@ class PaymentTransaction(models.Model):
     
     # 거래 정보
     transaction_date = models.DateField('거래일자')
+    # 재출금으로 거래일자가 다음 달로 넘어가도 청구한 달은 유지 (비어 있으면 거래일자의 달)
+    billing_month = models.DateField('청구월', null=True, blank=True, help_text='YYYY-MM-01 형식')
     scheduled_amount = models.DecimalField('예정 금액', max_digits=10, decimal_places=0)
     actual_amount = models.DecimalField('실제 출금액', max_digits=10, decimal_places=0, 
                                        null=True, blank=True)
@@ -75,17 +139,28 @@ class PaymentTransaction(models.Model):
     status = models.CharField('상태', max_length=20, choices=STATUS_CHOICES, default='SCHEDULED')
     
     # 실패 정보
+    failure_code = models.CharField('실패 결과코드', max_length=10, blank=True)
     failure_reason = models.CharField('실패 사유', max_length=200, blank=True)
     retry_count = models.IntegerField('재시도 횟수', default=0)
+    next_retry_date = models.DateField('재출금 예정일', null=True, blank=True)
+    # 재출금 신청 중인 실행이 선점한 시각 (겹쳐 실행돼도 같은 건을 두 번 신청하지 않도록)
+    retry_claimed_at = models.DateTimeField('재출금 선점일시', null=True, blank=True)
     
     # NICEPAY 응답 정보
     nicepay_transaction_id = models.CharField('NICEPAY 거래ID', max_length=100, blank=True)
-    nicepay_response = models.JSONField('NICEPAY 응답', null=True, blank=True)
+    nicepay_response_payload = payload_field('NICEPAY 응답')
+    nicepay_response = payload_property('nicepay_response')
     
     # 처리 정보
     processed_at = models.DateTimeField('처리일시', null=True, blank=True)
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
+
+    CENTER_PATH = 'cms_member__child__classroom__institution__delivery_center'
+    OUTBOX_TOPIC = 'payment_transaction'
+    OUTBOX_FIELDS = ('status',)
+    OUTBOX_CHILD_PATH = 'cms_member__child_id'
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = '출금 거래'
@@ -94,13 +169,93 @@ class PaymentTransaction(models.Model):
         indexes = [
             models.Index(fields=['-transaction_date']),
             models.Index(fields=['status']),
+            models.Index(fields=['status', 'next_retry_date']),
         ]
     
     def __str__(self):
         return f"{self.cms_member.child.name} - {self.transaction_date} - {self.get_status_display()}"
+    
+    @property
+    def billed_month(self):
+        """청구월 (YYYY-MM-01)"""
+        return self.billing_month or self.transaction_date.replace(day=1)
+
+
+class PaymentDeadLetter(models.Model):
+    """재출금 불가 거래 (재시도 횟수 초과 또는 재시도 불가 오류)"""
+    
+    REASON_CHOICES = [
+        ('TERMINAL', '재시도 불가 오류'),
+        ('EXHAUSTED', '재시도 횟수 초과'),
+    ]
+    
+    transaction = models.OneToOneField(PaymentTransaction, on_delete=models.CASCADE,
+                                       related_name='dead_letter', verbose_name='출금 거래')
+    unpaid = models.ForeignKey('UnpaidManagement', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='dead_letters', verbose_name='미납 내역')
+    
+    # 실패 정보
+    reason = models.CharField('사유', max_length=20, choices=REASON_CHOICES)
+    failure_code = models.CharField('실패 결과코드', max_length=10, blank=True)
+    failure_reason = models.CharField('실패 사유', max_length=200, blank=True)
+    retry_count = models.IntegerField('재시도 횟수', default=0)
+    
+    # 관리 정보
+    is_resolved = models.BooleanField('처리완료', default=False)
+    created_at = models.DateTimeField('생성일', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = '재출금 불가 거래'
+        verbose_name_plural = '재출금 불가 거래 목록'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.transaction_id} - {self.get_reason_display()}"
+
+
+class PaymentMessageSequence(models.Model):
+    """출금신청 전문번호 일련번호 (출금요청일마다 1부터, 6자리 이내에서 고유해야 함)"""
+    
+    send_date = models.DateField('출금요청일', unique=True)
+    last_number = models.PositiveIntegerField('마지막 전문번호', default=0)
+    
+    class Meta:
+        verbose_name = '전문번호 일련번호'
+        verbose_name_plural = '전문번호 일련번호 목록'
+    
+    def __str__(self):
+        return f"{self.send_date} - {self.last_number:06d}"
+
+
+class SettlementCalendarDay(models.Model):
+    """정산 달력 일별 집계 (5.2 정산 달력) - 센터 × 출금일 × 거래상태"""
+    
+    center = models.ForeignKey(Center, on_delete=models.CASCADE,
+                               related_name='calendar_days', verbose_name='배송센터')
+    date = models.DateField('거래일자')
+    status = models.CharField('상태', max_length=20, choices=PaymentTransaction.STATUS_CHOICES)
+    
+    # 집계 값
+    transaction_count = models.IntegerField('거래 건수', default=0)
+    scheduled_amount = models.DecimalField('예정 금액', max_digits=14, decimal_places=0, default=0)
+    actual_amount = models.DecimalField('실제 출금액', max_digits=14, decimal_places=0, default=0)
+    
+    updated_at = models.DateTimeField('수정일', auto_now=True)
+    
+    class Meta:
+        verbose_name = '정산 달력 집계'
+        verbose_name_plural = '정산 달력 집계 목록'
+        unique_together = ['center', 'date', 'status']
+        ordering = ['date', 'center', 'status']
+        indexes = [
+            models.Index(fields=['date', 'center']),
+        ]
+    
+    def __str__(self):
+        return f"{self.center_id} - {self.date} - {self.status} ({self.transaction_count}건)"
 
 
-class UnpaidManagement(models.Model):
+class UnpaidManagement(OutboxModel):
     """미납 관리 (3.2.3 미납관리)"""
     
     child = models.ForeignKey(Child, on_delete=models.CASCADE, 
@@ -127,6 +282,11 @@ class UnpaidManagement(models.Model):
     notes = models.TextField('비고', blank=True)
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
+
+    CENTER_PATH = 'child__classroom__institution__delivery_center'
+    OUTBOX_TOPIC = 'unpaid'
+    OUTBOX_FIELDS = ('status', 'unpaid_amount', 'paid_amount')
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = '미납 내역'
@@ -171,12 +331,17 @@ class Settlement(models.Model):
         ('ADJUSTED', '조정됨'),
     ]
     status = models.CharField('상태', max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    # 낙관적 동시성 제어용 버전 (상태 전환/조정 시 1씩 증가)
+    version = models.PositiveIntegerField('버전', default=0)
     
     # 관리 정보
     notes = models.TextField('비고', blank=True)
     created_at = models.DateTimeField('생성일', auto_now_add=True)
     updated_at = models.DateTimeField('수정일', auto_now=True)
     completed_at = models.DateTimeField('정산완료일시', null=True, blank=True)
+
+    CENTER_PATH = 'center'
+    objects = CenterScopedQuerySet.as_manager()
     
     class Meta:
         verbose_name = '정산'
@@ -186,15 +351,17 @@ class Settlement(models.Model):
         indexes = [
             models.Index(fields=['-settlement_date']),
             models.Index(fields=['center', '-settlement_month']),
+            models.Index(fields=['status', 'settlement_month']),
         ]
     
     def __str__(self):
         return f"{self.center.name} - {self.settlement_month.strftime('%Y년 %m월')} 정산"
     
     def calculate_commission(self):
-        """수수료 계산"""
-        self.commission_amount = self.collected_amount * (self.commission_rate / 100)
-        self.net_amount = self.collected_amount - self.commission_amount
+        """수수료 계산 (1원 단위 반올림, payments.money 참고)"""
+        self.commission_amount, self.net_amount = commission_and_net(
+            self.collected_amount, self.commission_rate,
+        )
         return self.net_amount
     
     def save(self, *args, **kwargs):
@@ -0,0 +1,121 @@
+"""
+더식판 금액 계산 (원화)
+
+원화는 소수점이 없으므로 모든 금액을 1원 단위 Decimal 로 다루고, 반올림 규칙을 명시한다.
+- 수수료: 수금액 × 수수료율 을 1원 단위 반올림(ROUND_HALF_UP)
+- 순 정산액: 수금액 - 수수료 (수수료 + 순 정산액 = 수금액 이 항상 성립)
+- 일할 계산: 월 이용료를 일 단위 누적액의 차이로 나눠, 한 달을 어떻게 나눠도 합계가 월 이용료와 같다.
+
+수수료율은 소수 둘째 자리까지(DecimalField decimal_places=2)이므로
+bp(1/10000) 정수로 바꿔 정수 연산으로 계산한다. SQL/NumPy 일괄 계산도 같은 식을 쓴다.
+"""
+import calendar
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import ExpressionWrapper, F, IntegerField, Value
+from django.db.models.functions import Floor, Round
+
+
+WON = Decimal('1')
+BASIS_POINTS = 10000
+
+
+def to_won(amount):
+    """1원 단위 반올림"""
+    return Decimal(amount).quantize(WON, rounding=ROUND_HALF_UP)
+
+
+def rate_to_bp(commission_rate):
+    """수수료율(%) → bp 정수 (10.25% → 1025)"""
+    return int((Decimal(commission_rate) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def commission(collected_amount, commission_rate):
+    """수수료 (1원 단위 반올림)"""
+    collected = int(to_won(collected_amount))
+    return Decimal((collected * rate_to_bp(commission_rate) + BASIS_POINTS // 2) // BASIS_POINTS)
+
+
+def commission_and_net(collected_amount, commission_rate):
+    """(수수료, 순 정산액)"""
+    collected = to_won(collected_amount)
+    fee = commission(collected, commission_rate)
+    return fee, collected - fee
+
+
+# ==================== 일괄 계산 ====================
+
+def commission_expression(collected='collected_amount', rate='commission_rate'):
+    """
+    수수료 SQL 식: floor((수금액 × bp + 5000) / 10000)
+    정수 bp 로 먼저 바꿔 SQLite(REAL)에서도 반올림 경계가 흔들리지 않게 한다.
+    """
+    bp = Round(F(rate) * 100)
+    return ExpressionWrapper(
+        Floor((F(collected) * bp + Value(BASIS_POINTS // 2)) / Value(BASIS_POINTS)),
+        output_field=IntegerField(),
+    )
+
+
+def commission_changes():
+    """정산 UPDATE 에 넣을 수수료/순 정산액 식 (commission_and_net 과 같은 결과)"""
+    fee = commission_expression()
+    return {
+        'commission_amount': fee,
+        'net_amount': ExpressionWrapper(F('collected_amount') - fee, output_field=IntegerField()),
+    }
+
+
+def apply_commission(queryset, **changes):
+    """정산 목록의 수수료/순 정산액을 UPDATE 1회로 계산해 저장 (changes 는 함께 바꿀 필드)"""
+    return queryset.update(**commission_changes(), **changes)
+
+
+def preview_commission(rows):
+    """
+    저장 없이 수수료/순 정산액 미리보기 (NumPy 벡터 연산 1회)
+    rows: [(수금액, 수수료율), ...] → [(수수료, 순 정산액), ...]
+    """
+    import numpy as np
+
+    if not rows:
+        return []
+    collected = np.array([int(to_won(amount)) for amount, _ in rows], dtype=np.int64)
+    bp = np.array([rate_to_bp(rate) for _, rate in rows], dtype=np.int64)
+    fees = (collected * bp + BASIS_POINTS // 2) // BASIS_POINTS
+    return [(Decimal(int(fee)), Decimal(int(net))) for fee, net in zip(fees, collected - fees)]
+
+
+# ==================== 일할 계산 ====================
+
+def _cumulative_fee(monthly_fee, days, days_in_month):
+    """월초부터 days 일 이용분 누적액 (1원 단위 반올림)"""
+    return to_won(Decimal(monthly_fee) * days / days_in_month)
+
+
+def prorate(monthly_fee, year, month, start=None, end=None):
+    """
+    해당 월 [start, end) 기간 이용료
+    start/end 가 없으면 월초/다음 달 1일. 일별 누적액의 차이로 계산하므로
+    같은 달을 여러 구간으로 나눈 금액의 합은 항상 월 이용료와 같다.
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    month_start = date(year, month, 1)
+    month_end = month_start + timedelta(days=days_in_month)
+
+    start = min(max(start or month_start, month_start), month_end)
+    end = min(max(end or month_end, start), month_end)
+    first = (start - month_start).days
+    last = (end - month_start).days
+    return (_cumulative_fee(monthly_fee, last, days_in_month)
+            - _cumulative_fee(monthly_fee, first, days_in_month))
+
+
+def prorated_monthly_fee(child, year, month):
+    """
+    아동의 해당 월 이용료 (등록일 당일부터, 퇴원일 당일 제외)
+    월 중 등록/퇴원이 없으면 월 이용료 그대로
+    """
+    return prorate(child.monthly_fee, year, month,
+                   start=child.enrollment_date, end=child.withdrawal_date)
@@ -0,0 +1,175 @@
+"""
+더식판 NICEPAY CMS API 클라이언트
+docs/nicepay.md (NICEPAY CMS API Ver.2.0.5) 기준
+
+테스트 환경에서는 로컬 mock 서버(src/mock-server, 기본 포트 7080)를 사용한다.
+"""
+import io
+import uuid
+
+from django.conf import settings
+
+
+RESULT_OK = '0000'
+RESULT_HTTP_ERROR = '8888'  # http 통신 오류
+
+EVIDENCE_EXTENSIONS = {
+    '1': ['jpg', 'jpeg', 'gif', 'tif', 'pdf'],  # 서면
+    '2': ['der'],                               # 공인전자서명
+    '4': ['mp3', 'wav', 'wma'],                 # 녹취
+}
+EVIDENCE_MAX_SIZE = 300 * 1024  # 서면파일 최대 300KB
+
+CONTENT_TYPES = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'tif': 'image/tiff',
+    'pdf': 'application/pdf',
+    'der': 'application/x-x509-ca-cert',
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'wma': 'audio/x-ms-wma',
+}
+
+# NICEPAY 회원 상태 (memberInfo.status)
+MEMBER_STATUS_WAITING = 0    # 등록대기
+MEMBER_STATUS_ACTIVE = 1     # 정상등록
+MEMBER_STATUS_FAILED = 2     # 등록실패
+MEMBER_STATUS_CANCELLED = 3  # 해지
+
+
+class NicepayError(Exception):
+    """NICEPAY 통신 오류"""
+
+    def __init__(self, result_code, message):
+        super().__init__(f'[{result_code}] {message}')
+        self.result_code = result_code
+        self.message = message
+
+
+class MultipartStream:
+    """
+    multipart/form-data 본문을 순차적으로 읽어 전송
+    파일 전체를 메모리에 올리지 않고, Content-Length 는 미리 계산한다.
+    """
+
+    def __init__(self, fields, file_field, filename, fileobj, size, content_type):
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+
+        head = b''
+        for name, value in fields.items():
+            head += (
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'
+            ).encode()
+        head += (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b''.join(chunks)
+
+
+class NicepayClient:
+    """
+    NICEPAY CMS REST API 클라이언트
+
+    응답은 resultCd 를 포함한 dict 로 반환하고, 통신 실패 시 NicepayError 를 발생시킨다.
+    requests.Session 을 공유하므로 여러 스레드에서 동시에 사용할 수 있다.
+    """
+
+    def __init__(self, base_url=None, service_id=None, api_key=None, timeout=None):
+        self.base_url = (base_url or settings.NICEPAY_BASE_URL).rstrip('/')
+        self.service_id = service_id or settings.NICEPAY_SERVICE_ID
+        self.timeout = timeout or settings.NICEPAY_TIMEOUT
+        # requests 는 import 비용이 커서 클라이언트를 실제로 만들 때 불러온다
+        import requests
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Api-Key': api_key or settings.NICEPAY_API_KEY,
+            'Service-Type': 'B',
+            'Accept': 'application/json',
+        })
+
+    def _url(self, path):
+        return f'{self.base_url}/thebill/retailers/{self.service_id}/{path}'
+
+    def _request(self, method, path, **kwargs):
+        import requests
+
+        try:
+            response = self.session.request(method, self._url(path), timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            raise NicepayError(RESULT_HTTP_ERROR, str(exc)) from exc
+
+        if response.status_code == 401:
+            raise NicepayError('E401', 'Api-Key 오류')
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise NicepayError(RESULT_HTTP_ERROR, f'HTTP {response.status_code}') from exc
+
+    # ==================== 증빙파일 ====================
+
+    def upload_evidence_file(self, member_id, fileobj, size, agree_type, file_ext):
+        """증빙파일 전송 (multipart/form-data, 스트리밍)"""
+        body = MultipartStream(
+            fields={'agreetype': agree_type, 'fileext': file_ext},
+            file_field='filename',
+            filename=f'{self.service_id}.{member_id}.{agree_type}.{file_ext}',
+            fileobj=fileobj,
+            size=size,
+            content_type=CONTENT_TYPES.get(file_ext, 'application/octet-stream'),
+        )
+        return self._request('POST', f'members/{member_id}/agree', data=body,
+                             headers={'Content-Type': body.content_type})
+
+    def delete_evidence_file(self, member_id):
+        """증빙파일 삭제"""
+        return self._request('DELETE', f'members/{member_id}/agreement')
+
+    # ==================== 회원등록 ====================
+
+    def register_member(self, member_id, data):
+        """회원 등록"""
+        return self._request('POST', f'members/{member_id}', json=data)
+
+    def get_member(self, member_id):
+        """회원 조회"""
+        return self._request('GET', f'members/{member_id}')
+
+    def delete_member(self, member_id):
+        """회원 해지"""
+        return self._request('DELETE', f'members/{member_id}')
+
+    # ==================== 출금신청 ====================
+
+    def create_payment(self, send_date, message_no, data):
+        """출금 신청 (send_date: YYYYMMDD)"""
+        return self._request('POST', f'payments/{send_date}/{message_no}', json=data)
+
+    def get_payment(self, send_date, message_no):
+        """출금 결과 조회"""
+        return self._request('GET', f'payments/{send_date}/{message_no}')
@@ -0,0 +1,275 @@
+"""
+더식판 학부모 페이지 (9.1 / PRD 9.3) 아동별 요약 문서
+
+학부모 페이지는 아동의 월 이용료, 다음 출금, 최근 6개월 출금 내역, 미납 내역을 보여준다.
+출금일에는 같은 시각에 수천 명이 조회하므로 DB 를 거치지 않도록
+- 아동별 요약을 JSON 본문으로 미리 만들어 캐시하고, 거래/미납/CMS 회원/아동이 바뀌면 커밋 후 다시 만든다.
+- 신선 기간(fresh_until)이 지나면 요청 1건만 락을 잡고 다시 만들고, 나머지는 기존 본문을 그대로 받는다.
+- 캐시에 아예 없으면 락을 잡은 요청만 만들고, 나머지는 잠시 기다렸다가 그 결과를 받는다(요청 병합).
+- 학부모 인증은 아동 ID 를 서명한 토큰으로 하므로 인증에도 DB 조회가 없다.
+미리 채우기(warm_parent_summaries)와 요청 병합 락이 모든 워커에 적용되려면 공유 캐시(Redis, settings.CACHES)가 필요하다.
+"""
+import asyncio
+import calendar
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Child
+from payments.business_days import is_business_day, next_business_day
+from payments.models import PaymentTransaction, UnpaidManagement
+from payments.money import prorated_monthly_fee
+
+
+SUMMARY_TIMEOUT = 60 * 60 * 24
+# 이벤트로 갱신되지 않아도 다시 만드는 주기 (날짜가 바뀌면 '다음 출금'이 달라진다)
+SUMMARY_FRESH = 60 * 60
+LOCK_TIMEOUT = 10
+COALESCE_WAIT = 2.0
+COALESCE_POLL = 0.05
+HISTORY_MONTHS = 6
+BUILD_BATCH_SIZE = 500
+OPEN_UNPAID_STATUSES = ('UNPAID', 'PARTIAL')
+TOKEN_SALT = 'payments.parent_portal'
+
+
+def summary_key(child_id):
+    return f'parent:summary:{child_id}'
+
+
+def lock_key(child_id):
+    return f'parent:summary:{child_id}:lock'
+
+
+# ==================== 토큰 ====================
+
+def portal_token(child_id):
+    """학부모 페이지 접근 토큰 (휴대폰 인증 후 발급)"""
+    return signing.dumps(child_id, salt=TOKEN_SALT, compress=True)
+
+
+def child_id_from_token(token):
+    """토큰 → 아동 ID (위조/만료 시 None)"""
+    try:
+        return int(signing.loads(token, salt=TOKEN_SALT, max_age=settings.PARENT_PORTAL_TOKEN_MAX_AGE))
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+# ==================== 요약 문서 ====================
+
+def _months_ago(day, months):
+    month_index = day.year * 12 + day.month - 1 - months
+    return day.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def _projected_withdrawal(payment_day, today):
+    """출금일 기준 다음 출금 예정일 (말일 초과 시 말일, 비영업일이면 다음 영업일)"""
+    month_start = today.replace(day=1)
+    for offset in (0, 1):
+        start = _months_ago(month_start, -offset)
+        day = start.replace(day=min(payment_day, calendar.monthrange(start.year, start.month)[1]))
+        if not is_business_day(day):
+            day = next_business_day(day)
+        if day >= today:
+            return day
+    return day
+
+
+def _mask_account(account_number):
+    return f'****{account_number[-4:]}' if account_number else ''
+
+
+def _won(amount):
+    return int(amount) if amount is not None else None
+
+
+def _fresh_until(now):
+    """신선 기간 끝 (다음 자정을 넘지 않음)"""
+    local = timezone.localtime(now)
+    midnight = timezone.make_aware(datetime.combine(local.date() + timedelta(days=1), datetime.min.time()))
+    return min(now + timedelta(seconds=SUMMARY_FRESH), midnight).timestamp()
+
+
+def build_summaries(child_ids, today=None):
+    """
+    아동별 요약 문서 {child_id: dict} (배치당 조회 3회)
+    아동+반+기관+CMS 회원 / 최근 6개월 이후 거래 / 미결 미납 내역
+    """
+    today = today or timezone.localdate()
+    since = _months_ago(today, HISTORY_MONTHS - 1)
+    children = (
+        Child.objects
+        .filter(pk__in=child_ids)
+        .select_related('classroom__institution', 'cms_member')
+    )
+    transactions = {}
+    for row in (
+        PaymentTransaction.objects
+        .filter(cms_member__child_id__in=child_ids, transaction_date__gte=since)
+        .order_by('-transaction_date', '-pk')
+        .values('cms_member__child_id', 'transaction_date', 'status', 'scheduled_amount',
+                'actual_amount', 'next_retry_date')
+    ):
+        transactions.setdefault(row.pop('cms_member__child_id'), []).append(row)
+    unpaid = {}
+    for row in (
+        UnpaidManagement.objects
+        .filter(child_id__in=child_ids, status__in=OPEN_UNPAID_STATUSES)
+        .order_by('unpaid_month')
+        .values('child_id', 'unpaid_month', 'status', 'unpaid_amount', 'paid_amount')
+    ):
+        unpaid.setdefault(row.pop('child_id'), []).append(row)
+
+    return {
+        child.pk: _summary(child, transactions.get(child.pk, []), unpaid.get(child.pk, []), today)
+        for child in children
+    }
+
+
+def _summary(child, transactions, unpaid, today):
+    member = getattr(child, 'cms_member', None)
+    month_start = today.replace(day=1)
+
+    upcoming = next(
+        (
+            {'date': txn['transaction_date'].isoformat(), 'amount': _won(txn['scheduled_amount']),
+             'projected': False}
+            for txn in reversed(transactions)
+            if txn['status'] == 'SCHEDULED' and txn['transaction_date'] >= today
+        ),
+        None,
+    )
+    if upcoming is None and member is not None and member.status == 'ACTIVE':
+        upcoming = {'date': _projected_withdrawal(member.payment_day, today).isoformat(),
+                    'amount': _won(member.monthly_amount), 'projected': True}
+
+    # 화면 상단 상태: 미납(빨강) / 이번 달 출금 완료(초록) / 결제 대기(노랑)
+    if unpaid:
+        state = 'UNPAID'
+    elif any(txn['status'] == 'SUCCESS' and txn['transaction_date'] >= month_start for txn in transactions):
+        state = 'PAID'
+    else:
+        state = 'PENDING'
+
+    return {
+        'child': {
+            'id': child.pk,
+            'name': child.name,
+            'institution': child.classroom.institution.name,
+            'classroom': child.classroom.name,
+        },
+        'state': state,
+        'fee': {
+            'monthly_fee': _won(child.monthly_fee),
+            'this_month': _won(prorated_monthly_fee(child, today.year, today.month)),
+        },
+        'payment_method': {
+            'bank_name': member.bank_name,
+            'account_number': _mask_account(member.account_number),
+            'payment_day': member.payment_day,
+            'status': member.status,
+        } if member is not None else None,
+        'upcoming_withdrawal': upcoming,
+        'transactions': [
+            {
+                'date': txn['transaction_date'].isoformat(),
+                'status': txn['status'],
+                'scheduled_amount': _won(txn['scheduled_amount']),
+                'actual_amount': _won(txn['actual_amount']),
+                'next_retry_date': txn['next_retry_date'] and txn['next_retry_date'].isoformat(),
+            }
+            for txn in transactions
+        ],
+        'unpaid': [
+            {
+                'month': row['unpaid_month'].strftime('%Y-%m'),
+                'status': row['status'],
+                'unpaid_amount': _won(row['unpaid_amount']),
+                'remaining_amount': _won(row['unpaid_amount'] - row['paid_amount']),
+            }
+            for row in unpaid
+        ],
+    }
+
+
+def _entry(summary, now):
+    """캐시 항목 (신선 기간 끝, ETag, JSON 본문)"""
+    summary['generated_at'] = now.isoformat()
+    payload = json.dumps(summary, ensure_ascii=False, separators=(',', ':')).encode()
+    etag = hashlib.md5(payload, usedforsecurity=False).hexdigest()
+    return _fresh_until(now), etag, payload
+
+
+def store_summaries(child_ids):
+    """요약 문서를 만들어 캐시에 저장 (없는 아동은 캐시에서 제거)"""
+    child_ids = list(child_ids)
+    now = timezone.now()
+    stored = 0
+    for start in range(0, len(child_ids), BUILD_BATCH_SIZE):
+        batch = child_ids[start:start + BUILD_BATCH_SIZE]
+        summaries = build_summaries(batch)
+        cache.set_many(
+            {summary_key(child_id): _entry(summary, now) for child_id, summary in summaries.items()},
+            SUMMARY_TIMEOUT,
+        )
+        cache.delete_many([summary_key(child_id) for child_id in batch if child_id not in summaries])
+        stored += len(summaries)
+    return stored
+
+
+def refresh(child_ids):
+    """거래/미납 변경 후 요약 다시 만들기 (커밋 후 반영)"""
+    child_ids = {child_id for child_id in child_ids if child_id is not None}
+    if child_ids:
+        transaction.on_commit(lambda: store_summaries(child_ids))
+
+
+# ==================== 조회 ====================
+
+async def _rebuild(child_id):
+    """락을 잡은 요청이 요약을 만들어 저장"""
+    try:
+        await sync_to_async(store_summaries)([child_id])
+    finally:
+        await cache.adelete(lock_key(child_id))
+    return await cache.aget(summary_key(child_id))
+
+
+async def aget_summary(child_id):
+    """
+    캐시된 요약 (ETag, JSON 본문) / 아동이 없으면 None
+    - 신선: 그대로 반환
+    - 신선 기간 지남: 락을 잡은 요청 1건만 다시 만들고 나머지는 기존 본문 반환 (조기 갱신)
+    - 없음: 락을 잡은 요청만 만들고 나머지는 COALESCE_WAIT 동안 결과를 기다림 (요청 병합)
+    """
+    entry = await cache.aget(summary_key(child_id))
+    if entry is not None:
+        fresh_until, etag, payload = entry
+        if time.time() >= fresh_until and await cache.aadd(lock_key(child_id), 1, LOCK_TIMEOUT):
+            entry = await _rebuild(child_id) or entry
+        return entry[1:]
+
+    if await cache.aadd(lock_key(child_id), 1, LOCK_TIMEOUT):
+        entry = await _rebuild(child_id)
+        return entry and entry[1:]
+
+    deadline = time.monotonic() + COALESCE_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(COALESCE_POLL)
+        entry = await cache.aget(summary_key(child_id))
+        if entry is not None:
+            return entry[1:]
+
+    # 락을 잡은 요청이 실패했거나 너무 느리면 직접 만든다
+    await sync_to_async(store_summaries)([child_id])
+    entry = await cache.aget(summary_key(child_id))
+    return entry and entry[1:]
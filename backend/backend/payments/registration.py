@@ -0,0 +1,285 @@
+"""
+더식판 NICEPAY CMS 회원 일괄 등록
+4.1 자동이체 신청 → 4.2 나이스페이 API 연동 (polling 방식)
+
+흐름: 승인대기(PENDING) 회원 수집 → 증빙파일 전송 → 회원등록 요청
+      → 다음 영업일 13시 이후 회원 조회(polling) 또는 콜백으로 ACTIVE/FAILED/CANCELLED 반영
+
+등록 요청 결과
+- 정상/회원ID 중복: 요청 완료 (registration_requested_at 기록, 결과 조회 대상)
+- NICEPAY 가 거절(그 외 결과코드, 증빙파일 거절 포함): 등록실패(FAILED) - 정보 수정 후 PENDING 으로 되돌리면 다시 요청
+- 통신/파일 오류: PENDING 그대로 두고 결과코드만 기록 - 다음 실행에서 다시 요청
+
+NICEPAY 호출은 스레드 풀에서 동시 실행 수를 제한해 보내고,
+DB 반영은 배치 단위 bulk_update 로 메인 스레드에서 처리한다.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from core import outbox
+from payments import parent_portal
+from payments.models import CMSEvidenceFile, CMSMember
+from payments.nicepay import (
+    EVIDENCE_EXTENSIONS, EVIDENCE_MAX_SIZE, MEMBER_STATUS_ACTIVE, MEMBER_STATUS_CANCELLED,
+    MEMBER_STATUS_FAILED, RESULT_OK, NicepayClient, NicepayError,
+)
+
+
+BATCH_SIZE = 200
+RESULT_DUPLICATE_MEMBER = '2002'  # 회원아이디 중복 (이미 등록 요청된 회원)
+
+MEMBER_STATUS_MAP = {
+    MEMBER_STATUS_ACTIVE: 'ACTIVE',
+    MEMBER_STATUS_FAILED: 'FAILED',
+    MEMBER_STATUS_CANCELLED: 'CANCELLED',
+}
+
+
+class EvidenceFileError(ValueError):
+    """증빙파일 검증 오류"""
+
+
+@dataclass
+class SubmitResult:
+    """회원 1명의 NICEPAY 등록 요청 결과"""
+    member: CMSMember
+    result_code: str
+    message: str
+    evidence_code: str = ''
+    # 통신/파일 오류 (NICEPAY 가 거절한 것이 아니므로 다음 실행에서 다시 요청)
+    retryable: bool = False
+
+    @property
+    def accepted(self):
+        return self.result_code in (RESULT_OK, RESULT_DUPLICATE_MEMBER)
+
+
+def store_evidence_file(cms_member, fileobj, filename, agree_type='1'):
+    """
+    증빙파일 저장 (settings.STORAGES['evidence'])
+    업로드 파일을 청크 단위로 저장소에 기록하므로 파일 전체를 메모리에 올리지 않는다.
+    """
+    file_ext = os.path.splitext(filename)[1].lstrip('.').lower()
+    if file_ext not in EVIDENCE_EXTENSIONS.get(agree_type, []):
+        raise EvidenceFileError(f'증빙구분({agree_type})에 허용되지 않는 확장자입니다: {file_ext}')
+
+    size = getattr(fileobj, 'size', None)
+    if size is None:
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+    if agree_type == '1' and size > EVIDENCE_MAX_SIZE:
+        raise EvidenceFileError('서면 증빙파일은 300KB 를 초과할 수 없습니다.')
+
+    evidence = CMSEvidenceFile.objects.filter(cms_member=cms_member).first()
+    if evidence is None:
+        evidence = CMSEvidenceFile(cms_member=cms_member)
+    elif evidence.file:
+        evidence.file.delete(save=False)
+
+    evidence.agree_type = agree_type
+    evidence.file_ext = file_ext
+    evidence.file_size = size
+    evidence.status = 'PENDING'
+    evidence.result_code = ''
+    evidence.sent_at = None
+    evidence.file.save(f'{cms_member.nicepay_member_id}.{file_ext}', File(fileobj), save=False)
+    evidence.save()
+    return evidence
+
+
+def collect_pending_members():
+    """등록 요청 대상: 승인대기 상태이면서 아직 요청하지 않은 회원 (통신 오류로 실패한 회원 포함)"""
+    return (
+        CMSMember.objects
+        .filter(status='PENDING', registration_requested_at__isnull=True)
+        .select_related('child', 'evidence_file')
+        .order_by('pk')
+    )
+
+
+def _member_payload(member):
+    child = member.child
+    return {
+        'memberName': child.parent_name,
+        'serviceCd': 'BANK',
+        'bankCd': member.bank_code,
+        'accountNo': member.account_number,
+        'accountName': member.account_holder,
+        'idNo': member.id_no,
+        'hpNo': child.parent_phone.replace('-', ''),
+        'email': child.parent_email,
+        'serviceName': '더식판',
+        'userDefine': str(child.pk),
+    }
+
+
+def _submit_member(client, member):
+    """증빙파일 전송 후 회원등록 요청 (워커 스레드에서 실행, DB 접근 없음)"""
+    evidence = getattr(member, 'evidence_file', None)
+    evidence_code = ''
+    try:
+        if evidence is not None and evidence.status != 'SENT':
+            with evidence.file.open('rb') as fileobj:
+                response = client.upload_evidence_file(
+                    member.nicepay_member_id, fileobj, evidence.file_size,
+                    evidence.agree_type, evidence.file_ext,
+                )
+            evidence_code = response.get('resultCd', '')
+            if evidence_code != RESULT_OK:
+                return SubmitResult(member, evidence_code, response.get('resultMsg', ''),
+                                    evidence_code)
+
+        response = client.register_member(member.nicepay_member_id, _member_payload(member))
+    except (NicepayError, OSError) as exc:
+        code = getattr(exc, 'result_code', '9999')
+        return SubmitResult(member, code, str(exc)[:200], evidence_code, retryable=True)
+
+    return SubmitResult(member, response.get('resultCd', ''), response.get('resultMsg', ''),
+                        evidence_code)
+
+
+def _apply_submit_results(results):
+    """등록 요청 결과를 회원/증빙파일 테이블에 일괄 반영"""
+    now = timezone.now()
+    members = []
+    evidences = []
+    for result in results:
+        member = result.member
+        member.registration_requested_at = now if result.accepted else None
+        member.registration_result_code = result.result_code
+        member.registration_message = result.message[:200]
+        if not result.accepted and not result.retryable:
+            member.status = 'FAILED'
+        # bulk_update 는 auto_now 를 갱신하지 않으므로 수정일을 직접 지정
+        member.updated_at = now
+        members.append(member)
+
+        if result.evidence_code:
+            evidence = member.evidence_file
+            evidence.result_code = result.evidence_code
+            evidence.status = 'SENT' if result.evidence_code == RESULT_OK else 'FAILED'
+            evidence.sent_at = now if evidence.status == 'SENT' else None
+            evidences.append(evidence)
+
+    with transaction.atomic():
+        CMSMember.objects.bulk_update(
+            members,
+            ['registration_requested_at', 'registration_result_code', 'registration_message',
+             'status', 'updated_at'],
+        )
+        if evidences:
+            CMSEvidenceFile.objects.bulk_update(evidences, ['result_code', 'status', 'sent_at'])
+        outbox.record_bulk(members, fields=['status'])
+        parent_portal.refresh(member.child_id for member in members if member.status == 'FAILED')
+
+
+def _chunked(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def register_pending_members(client=None, batch_size=BATCH_SIZE, max_workers=None):
+    """
+    승인대기 회원을 NICEPAY 에 일괄 등록 요청
+    반환값: {'submitted': 요청 건수, 'failed': 등록실패 건수, 'retry': 다음 실행에서 다시 요청할 건수}
+    """
+    client = client or NicepayClient()
+    max_workers = max_workers or settings.NICEPAY_MAX_WORKERS
+    summary = {'submitted': 0, 'failed': 0, 'retry': 0}
+
+    # 결과 반영으로 대상 집합이 줄어들기 때문에 pk 기준으로 스냅샷을 먼저 뜬다
+    pending_ids = list(collect_pending_members().values_list('pk', flat=True))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for ids in _chunked(pending_ids, batch_size):
+            members = list(collect_pending_members().filter(pk__in=ids))
+            results = list(pool.map(lambda m: _submit_member(client, m), members))
+            _apply_submit_results(results)
+            for result in results:
+                if result.accepted:
+                    summary['submitted'] += 1
+                elif result.retryable:
+                    summary['retry'] += 1
+                else:
+                    summary['failed'] += 1
+    return summary
+
+
+def apply_member_statuses(statuses):
+    """
+    NICEPAY 회원 상태를 일괄 반영 (polling/콜백 공용)
+    statuses: {nicepay_member_id: (NICEPAY 상태코드, 결과메시지)}
+    반환값: 상태가 변경된 회원 수
+    """
+    members = list(
+        CMSMember.objects
+        .filter(nicepay_member_id__in=list(statuses))
+        .only('pk', 'child_id', 'nicepay_member_id', 'status', 'registration_message')
+    )
+    changed = []
+    for member in members:
+        nicepay_status, message = statuses[member.nicepay_member_id]
+        new_status = MEMBER_STATUS_MAP.get(nicepay_status)
+        if new_status is None or new_status == member.status:
+            continue
+        member.status = new_status
+        member.registration_message = (message or '')[:200]
+        changed.append(member)
+
+    if changed:
+        # bulk_update 는 auto_now 를 갱신하지 않으므로 수정일을 직접 지정
+        now = timezone.now()
+        for member in changed:
+            member.updated_at = now
+        with transaction.atomic():
+            CMSMember.objects.bulk_update(changed, ['status', 'registration_message', 'updated_at'])
+            outbox.record_bulk(changed, fields=['status'])
+        parent_portal.refresh(member.child_id for member in changed)
+    return len(changed)
+
+
+def fetch_member_status(client, nicepay_member_id):
+    """NICEPAY 회원 조회 → (회원ID, (상태코드, 결과메시지)) / 실패 시 (회원ID, None)"""
+    try:
+        response = client.get_member(nicepay_member_id)
+    except NicepayError:
+        return nicepay_member_id, None
+    info = response.get('memberInfo')
+    if response.get('resultCd') != RESULT_OK or not info:
+        return nicepay_member_id, None
+    return nicepay_member_id, (info.get('status'), info.get('bankResultMsg', ''))
+
+
+def sync_member_statuses(client=None, batch_size=BATCH_SIZE, max_workers=None):
+    """등록 요청한 회원의 처리 결과를 조회(polling)해 일괄 반영"""
+    client = client or NicepayClient()
+    max_workers = max_workers or settings.NICEPAY_MAX_WORKERS
+    member_ids = list(
+        CMSMember.objects
+        .filter(status='PENDING', registration_requested_at__isnull=False)
+        .order_by('pk')
+        .values_list('nicepay_member_id', flat=True)
+    )
+
+    updated = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch in _chunked(member_ids, batch_size):
+            statuses = dict(
+                item for item in pool.map(lambda mid: fetch_member_status(client, mid), batch)
+                if item[1] is not None
+            )
+            if statuses:
+                updated += apply_member_statuses(statuses)
+    return updated
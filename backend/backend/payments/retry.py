@@ -0,0 +1,326 @@
+"""
+더식판 출금 실패 재시도
+3.2.2 출금결과조회 / 3.2.3 미납관리
+
+1. schedule_retries: 출금실패(FAILED) 건을 결과코드로 분류
+   - 재시도 가능 + 재시도 횟수 남음 → 영업일 기준 백오프 + 지터로 재출금 예정일 지정
+   - 재시도 불가 또는 횟수 초과 → dead-letter 등록 + 미납 내역(UnpaidManagement) 생성
+     (같은 아동/청구월의 미납 내역이 있으면 금액을 더한다)
+2. submit_due_retries: 재출금 예정일이 돌아온 건을 출금 마감(D-1 17시) 전에 NICEPAY 에 신청
+   - 배치마다 select_for_update(skip_locked=True) 로 선점(retry_claimed_at)한 뒤 신청하므로
+     실행이 겹쳐도 같은 건을 두 번 신청하지 않는다
+   - 전문번호는 출금요청일별 일련번호(PaymentMessageSequence)에서 배치 단위로 예약
+   - 신청에 성공하면 거래일자를 출금요청일로 옮긴다 (청구월은 billing_month 로 유지)
+
+모든 상태 변경은 bulk_update / bulk_create 로 배치 단위 처리한다.
+시그널이 없으므로 변경 이벤트(core.outbox)는 같은 트랜잭션에서 직접 기록한다.
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core import outbox
+from payments import parent_portal
+from payments.business_days import add_business_days, earliest_withdrawal_date
+from payments.models import (
+    PaymentDeadLetter, PaymentMessageSequence, PaymentTransaction, UnpaidManagement,
+)
+from payments.nicepay import RESULT_OK, NicepayClient, NicepayError
+from payments.settlement_calendar import record_status_changes
+
+
+MAX_RETRY_COUNT = 3
+BATCH_SIZE = 500
+# 전문번호는 최대 6자리 (출금요청일 내 고유)
+MAX_MESSAGE_NO = 999999
+# 실행이 중단되어 선점된 채 남은 재출금 건을 다시 선점할 수 있는 시간
+CLAIM_STALE_AFTER = timedelta(hours=1)
+
+# 재시도 간격 (영업일) - retry_count 순서대로 적용
+BACKOFF_BUSINESS_DAYS = [2, 5, 10]
+# 같은 날 마감에 재시도가 몰리지 않도록 0~N 영업일 분산
+RETRY_JITTER_DAYS = 3
+
+# 출금신청 결과코드 (docs/nicepay.md 7.3)
+# 시간/일자 경과, 연번 중복, 통신/시스템 오류 → 다른 날 다시 신청하면 성공 가능
+RETRYABLE_CODES = frozenset([
+    '2013',  # 등록시간 경과
+    '2014',  # 등록일자 경과
+    '2018',  # 연번 중복
+    '2027',  # 영업일 아님
+    '6666',  # 기타오류
+    '8888',  # http 통신 오류
+    '9999',  # 시스템 오류
+])
+# 회원/금액/기관 설정 오류 → 사람이 확인해야 함
+TERMINAL_CODES = frozenset([
+    '1001',  # 기관 상태 오류
+    '1002',  # 기관 타입 오류
+    '1003',  # 서비스 타입 오류
+    '2001',  # 회원아이디 오류
+    '2002',  # 정상 등록 회원 아님
+    '2003',  # 회원 서비스 타입 불일치
+    '2004',  # 회원이름 오류
+    '2005',  # 서비스코드 오류
+    '2010',  # 금액 오류
+    '2015',  # 이체 최소한도 오류
+    '2016',  # 이체 최대한도 오류
+    '7777',  # 연동 파라미터 오류
+    'E401',  # Api-Key 오류
+])
+
+
+def is_retryable(failure_code):
+    """
+    실패 결과코드 분류
+    은행 출금실패 코드(잔액부족 등)처럼 목록에 없는 코드는 재시도 대상으로 본다.
+    """
+    if failure_code in RETRYABLE_CODES:
+        return True
+    return failure_code not in TERMINAL_CODES
+
+
+def next_retry_date(today, retry_count, rng=random):
+    """영업일 기준 백오프 + 지터 적용한 재출금 예정일"""
+    backoff = BACKOFF_BUSINESS_DAYS[min(retry_count, len(BACKOFF_BUSINESS_DAYS) - 1)]
+    return add_business_days(today, backoff + rng.randint(0, RETRY_JITTER_DAYS))
+
+
+def _failed_queryset():
+    return PaymentTransaction.objects.filter(
+        status='FAILED',
+        next_retry_date__isnull=True,
+        dead_letter__isnull=True,
+    )
+
+
+def schedule_retries(today=None, batch_size=BATCH_SIZE, rng=random):
+    """
+    재출금 예정일 지정 / dead-letter 이동
+    반환값: {'scheduled': 재시도 예약 건수, 'dead_lettered': dead-letter 건수}
+    """
+    today = today or timezone.localdate()
+    summary = {'scheduled': 0, 'dead_lettered': 0}
+
+    failed_ids = list(_failed_queryset().order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(failed_ids), batch_size):
+        batch = list(
+            _failed_queryset()
+            .filter(pk__in=failed_ids[start:start + batch_size])
+            .select_related('cms_member')
+            .only('pk', 'transaction_date', 'billing_month', 'scheduled_amount', 'failure_code',
+                  'failure_reason', 'retry_count', 'cms_member__child_id')
+        )
+
+        to_retry = []
+        to_dead_letter = []
+        for txn in batch:
+            if txn.retry_count >= MAX_RETRY_COUNT:
+                to_dead_letter.append((txn, 'EXHAUSTED'))
+            elif not is_retryable(txn.failure_code):
+                to_dead_letter.append((txn, 'TERMINAL'))
+            else:
+                txn.next_retry_date = next_retry_date(today, txn.retry_count, rng)
+                to_retry.append(txn)
+
+        with transaction.atomic():
+            if to_retry:
+                now = timezone.now()
+                for txn in to_retry:
+                    txn.updated_at = now
+                PaymentTransaction.objects.bulk_update(to_retry, ['next_retry_date', 'updated_at'])
+                parent_portal.refresh(txn.cms_member.child_id for txn in to_retry)
+            if to_dead_letter:
+                _dead_letter(to_dead_letter)
+
+        summary['scheduled'] += len(to_retry)
+        summary['dead_lettered'] += len(to_dead_letter)
+    return summary
+
+
+def _unpaid_status(unpaid):
+    """납부금액 기준 미납 상태 (면제 건은 그대로)"""
+    if unpaid.status == 'EXEMPTED':
+        return unpaid.status
+    if unpaid.paid_amount >= unpaid.unpaid_amount:
+        return 'PAID'
+    return 'PARTIAL' if unpaid.paid_amount > 0 else 'UNPAID'
+
+
+def _dead_letter(entries):
+    """
+    dead-letter 등록 + 미납 내역 일괄 반영
+    같은 아동/청구월의 미납 내역이 이미 있으면 미납금액을 더하고, 없으면 새로 만든다.
+    """
+    months = {}
+    for txn, _ in entries:
+        key = (txn.cms_member.child_id, txn.billed_month)
+        months[key] = months.get(key, 0) + txn.scheduled_amount
+
+    existing = list(
+        UnpaidManagement.objects
+        .select_for_update()
+        .filter(child_id__in={child_id for child_id, _ in months},
+                unpaid_month__in={month for _, month in months})
+    )
+    existing = {(row.child_id, row.unpaid_month): row for row in existing
+                if (row.child_id, row.unpaid_month) in months}
+
+    now = timezone.now()
+    for key, row in existing.items():
+        row.unpaid_amount += months[key]
+        row.status = _unpaid_status(row)
+        row.updated_at = now
+    UnpaidManagement.objects.bulk_update(existing.values(), ['unpaid_amount', 'status', 'updated_at'])
+    outbox.record_bulk(existing.values())
+
+    # 동시에 다른 실행이 같은 미납 내역을 만들면 IntegrityError 로 배치 전체가 롤백되고 다음 실행에서 다시 처리된다
+    created = UnpaidManagement.objects.bulk_create([
+        UnpaidManagement(child_id=child_id, unpaid_month=month, unpaid_amount=amount,
+                         notes='출금 재시도 실패로 자동 등록')
+        for (child_id, month), amount in months.items()
+        if (child_id, month) not in existing
+    ])
+    outbox.record_bulk(created, 'created')
+    parent_portal.refresh(child_id for child_id, _ in months)
+
+    unpaid_ids = {key: row.pk for key, row in existing.items()}
+    unpaid_ids.update({(row.child_id, row.unpaid_month): row.pk for row in created})
+
+    PaymentDeadLetter.objects.bulk_create([
+        PaymentDeadLetter(
+            transaction=txn,
+            unpaid_id=unpaid_ids.get((txn.cms_member.child_id, txn.billed_month)),
+            reason=reason,
+            failure_code=txn.failure_code,
+            failure_reason=txn.failure_reason,
+            retry_count=txn.retry_count,
+        )
+        for txn, reason in entries
+    ], ignore_conflicts=True)
+
+
+def reserve_message_numbers(send_date, count):
+    """
+    출금요청일의 전문번호 count 개 예약 → 첫 번호
+    일련번호 행을 잠그고 올리므로 동시에 실행해도 같은 번호가 두 번 나가지 않는다.
+    """
+    with transaction.atomic():
+        sequence, _ = (
+            PaymentMessageSequence.objects.select_for_update().get_or_create(send_date=send_date)
+        )
+        first = sequence.last_number + 1
+        if sequence.last_number + count > MAX_MESSAGE_NO:
+            raise ValueError(f'{send_date} 전문번호가 {MAX_MESSAGE_NO} 를 넘습니다.')
+        PaymentMessageSequence.objects.filter(pk=sequence.pk).update(
+            last_number=F('last_number') + count,
+        )
+    return first
+
+
+def _payment_payload(txn):
+    member = txn.cms_member
+    return {
+        'memberId': member.nicepay_member_id,
+        'memberName': member.child.parent_name,
+        'accountDesc': f'{txn.billed_month.month:02d}',
+        'reqAmt': str(int(txn.scheduled_amount)),
+        'cashRcpYn': 'Y',
+        'serviceCd': 'BANK',
+        'userDefine': str(txn.pk),
+        'workType': 'N',
+    }
+
+
+def _submit_payment(client, txn, send_date, message_no):
+    try:
+        response = client.create_payment(send_date.strftime('%Y%m%d'), message_no,
+                                         _payment_payload(txn))
+    except NicepayError as exc:
+        return txn, exc.result_code, exc.message
+    return txn, response.get('resultCd', ''), response.get('resultMsg', '')
+
+
+def claim_due_retries(send_date, limit=BATCH_SIZE):
+    """
+    재출금 예정일이 돌아온 건을 선점하고 pk 목록 반환
+    다른 실행이 잠갔거나 선점한 행은 건너뛴다 (선점 후 CLAIM_STALE_AFTER 가 지나면 다시 선점 가능).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            PaymentTransaction.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .filter(Q(retry_claimed_at__isnull=True) | Q(retry_claimed_at__lt=now - CLAIM_STALE_AFTER),
+                    status='FAILED', next_retry_date__lte=send_date, dead_letter__isnull=True)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if ids:
+            PaymentTransaction.objects.filter(pk__in=ids).update(retry_claimed_at=now)
+    return ids
+
+
+def submit_due_retries(client=None, now=None, batch_size=BATCH_SIZE, max_workers=None):
+    """
+    재출금 예정일이 가장 빠른 출금요청일 이전인 건을 NICEPAY 에 신청
+    배치 단위로 선점한 건만 신청하고, 결과를 반영하면서 선점을 푼다.
+    성공 시 출금예정(SCHEDULED) 으로 전환하고 거래일자를 출금요청일로 옮기며 재시도 횟수를 올린다.
+    실패 시 결과코드를 기록하고 다음 schedule_retries 에서 다시 분류된다.
+    """
+    client = client or NicepayClient()
+    max_workers = max_workers or settings.NICEPAY_MAX_WORKERS
+    now = timezone.localtime(now or timezone.now())
+    send_date = earliest_withdrawal_date(now.replace(tzinfo=None))
+    summary = {'submitted': 0, 'failed': 0}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            claimed = claim_due_retries(send_date, batch_size)
+            if not claimed:
+                return summary
+            batch = list(
+                PaymentTransaction.objects
+                .filter(pk__in=claimed)
+                .select_related('cms_member__child')
+                .order_by('pk')
+            )
+            first_no = reserve_message_numbers(send_date, len(batch))
+            message_nos = {txn.pk: f'{first_no + i:06d}' for i, txn in enumerate(batch)}
+            results = list(pool.map(
+                lambda txn: _submit_payment(client, txn, send_date, message_nos[txn.pk]), batch,
+            ))
+
+            old_states = {txn.pk: (txn.status, txn.transaction_date) for txn in batch}
+            updated_at = timezone.now()
+            for txn, result_code, message in results:
+                txn.retry_count += 1
+                txn.next_retry_date = None
+                txn.retry_claimed_at = None
+                txn.updated_at = updated_at
+                if result_code == RESULT_OK:
+                    txn.status = 'SCHEDULED'
+                    txn.billing_month = txn.billed_month
+                    txn.transaction_date = send_date
+                    txn.nicepay_transaction_id = f'{send_date:%Y%m%d}-{message_nos[txn.pk]}'
+                    summary['submitted'] += 1
+                else:
+                    txn.failure_code = result_code
+                    txn.failure_reason = message[:200]
+                    summary['failed'] += 1
+
+            with transaction.atomic():
+                PaymentTransaction.objects.bulk_update(
+                    [txn for txn, _, _ in results],
+                    ['status', 'transaction_date', 'billing_month', 'retry_count', 'next_retry_date',
+                     'retry_claimed_at', 'failure_code', 'failure_reason', 'nicepay_transaction_id',
+                     'updated_at'],
+                )
+                record_status_changes(batch, old_states)
+                outbox.record_bulk(batch, fields=['status'])
+                parent_portal.refresh(txn.cms_member.child_id for txn in batch)
@@ -0,0 +1,221 @@
+"""
+더식판 정산 달력 집계
+5.2 정산 달력 - 배송센터별 일자별 출금 예정/실제 금액
+
+PaymentTransaction 을 매번 GROUP BY 하지 않도록 SettlementCalendarDay 에
+(센터, 거래일자, 상태) 단위 건수/금액을 증분으로 유지한다.
+- 단건 저장/삭제: payments.signals 에서 반영
+- bulk_update 등 시그널이 없는 경로: record_status_changes() 를 직접 호출 (상태/거래일자 변경)
+- 보정/초기 적재: rebuild()
+집계를 반영할 때 출금 확정 상태(SUCCESS/FAILED)가 바뀐 (센터, 월) 의 분석 리포트 캐시도 커밋 후 지운다.
+"""
+import calendar
+import hashlib
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from analytics import engine
+from payments.models import PaymentTransaction, SettlementCalendarDay
+
+
+CENTER_PATH = 'cms_member__child__classroom__institution__delivery_center_id'
+
+# 예정 금액에서 제외하는 상태
+NON_EXPECTED_STATUSES = ('CANCELLED',)
+
+
+def month_range(year, month):
+    """해당 월의 첫날/마지막날"""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def transaction_delta(center_id, txn_date, status, scheduled_amount, actual_amount, sign=1):
+    """거래 1건이 집계에 더하는(sign=-1 이면 빼는) 값"""
+    return {
+        (center_id, txn_date, status): [
+            sign, sign * Decimal(scheduled_amount or 0), sign * Decimal(actual_amount or 0),
+        ]
+    }
+
+
+def merge_deltas(*deltas):
+    merged = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+    for delta in deltas:
+        for key, (count, scheduled, actual) in delta.items():
+            values = merged[key]
+            values[0] += count
+            values[1] += scheduled
+            values[2] += actual
+    return merged
+
+
+def apply_deltas(deltas):
+    """
+    (센터, 일자, 상태) 별 증감값을 집계 테이블에 반영
+    UPDATE ... SET col = col + delta 로 갱신하고, 행이 없으면 생성한다.
+    """
+    now = timezone.now()
+    settled_months = set()
+    for (center_id, txn_date, status), (count, scheduled, actual) in deltas.items():
+        if center_id is None or not (count or scheduled or actual):
+            continue
+        if status in engine.SETTLED_STATUSES:
+            settled_months.add((center_id, txn_date.year, txn_date.month))
+        lookup = {'center_id': center_id, 'date': txn_date, 'status': status}
+        changes = {
+            'transaction_count': F('transaction_count') + count,
+            'scheduled_amount': F('scheduled_amount') + scheduled,
+            'actual_amount': F('actual_amount') + actual,
+            'updated_at': now,
+        }
+        if SettlementCalendarDay.objects.filter(**lookup).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                SettlementCalendarDay.objects.create(
+                    transaction_count=count, scheduled_amount=scheduled,
+                    actual_amount=actual, **lookup,
+                )
+        except IntegrityError:
+            # 동시에 다른 요청이 먼저 행을 만든 경우
+            SettlementCalendarDay.objects.filter(**lookup).update(**changes)
+
+    if settled_months:
+        transaction.on_commit(lambda: engine.invalidate(settled_months))
+
+
+def record_status_changes(transactions, old_states):
+    """
+    bulk_update 로 상태/거래일자가 바뀐 거래를 집계에 반영
+    old_states: {거래 pk: (변경 전 상태, 변경 전 거래일자)}
+    """
+    changed = [
+        txn for txn in transactions
+        if old_states.get(txn.pk, (txn.status, txn.transaction_date)) != (txn.status, txn.transaction_date)
+    ]
+    if not changed:
+        return
+    centers = dict(
+        PaymentTransaction.objects
+        .filter(pk__in=[txn.pk for txn in changed])
+        .values_list('pk', CENTER_PATH)
+    )
+    deltas = []
+    for txn in changed:
+        center_id = centers.get(txn.pk)
+        old_status, old_date = old_states[txn.pk]
+        deltas.append(transaction_delta(center_id, old_date, old_status,
+                                        txn.scheduled_amount, txn.actual_amount, sign=-1))
+        deltas.append(transaction_delta(center_id, txn.transaction_date, txn.status,
+                                        txn.scheduled_amount, txn.actual_amount))
+    apply_deltas(merge_deltas(*deltas))
+
+
+def rebuild(start, end, center_ids=None):
+    """기간 내 집계를 PaymentTransaction 에서 다시 계산 (GROUP BY 1회)"""
+    transactions = PaymentTransaction.objects.filter(transaction_date__range=(start, end))
+    days = SettlementCalendarDay.objects.filter(date__range=(start, end))
+    if center_ids is not None:
+        transactions = transactions.filter(**{f'{CENTER_PATH}__in': center_ids})
+        days = days.filter(center_id__in=center_ids)
+
+    rows = (
+        transactions
+        .values(center=F(CENTER_PATH), txn_date=F('transaction_date'), txn_status=F('status'))
+        .annotate(
+            count=Count('id'),
+            scheduled=Coalesce(Sum('scheduled_amount'), Value(Decimal(0))),
+            actual=Coalesce(Sum('actual_amount'), Value(Decimal(0))),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        days.delete()
+        created = SettlementCalendarDay.objects.bulk_create([
+            SettlementCalendarDay(
+                center_id=row['center'], date=row['txn_date'], status=row['txn_status'],
+                transaction_count=row['count'], scheduled_amount=row['scheduled'],
+                actual_amount=row['actual'],
+            )
+            for row in rows
+        ], batch_size=1000)
+    return len(created)
+
+
+def month_queryset(center_ids, year, month):
+    start, end = month_range(year, month)
+    return SettlementCalendarDay.objects.filter(center_id__in=center_ids, date__range=(start, end))
+
+
+def _etag(center_ids, year, month, state):
+    key = f"{sorted(center_ids)}:{year}-{month}:{state['last_updated']}:{state['rows']}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def month_etag(center_ids, year, month):
+    """월별 집계의 ETag (집계 행의 마지막 수정시각/행 수 기준)"""
+    state = month_queryset(center_ids, year, month).aggregate(
+        last_updated=Max('updated_at'), rows=Count('id'),
+    )
+    return _etag(center_ids, year, month, state)
+
+
+async def amonth_etag(center_ids, year, month):
+    """month_etag 의 async 버전"""
+    state = await month_queryset(center_ids, year, month).aaggregate(
+        last_updated=Max('updated_at'), rows=Count('id'),
+    )
+    return _etag(center_ids, year, month, state)
+
+
+def _month_rows(center_ids, year, month):
+    return (
+        month_queryset(center_ids, year, month)
+        .order_by('date', 'center_id')
+        .values_list('date', 'center_id', 'status', 'transaction_count',
+                     'scheduled_amount', 'actual_amount')
+    )
+
+
+def _month_payload(year, month, rows):
+    days = {}
+    for txn_date, center_id, status, count, scheduled, actual in rows:
+        if not count:
+            continue
+        centers = days.setdefault(txn_date, {})
+        entry = centers.setdefault(center_id, {
+            'center_id': center_id, 'expected_amount': 0, 'actual_amount': 0, 'counts': {},
+        })
+        entry['counts'][status] = count
+        if status not in NON_EXPECTED_STATUSES:
+            entry['expected_amount'] += int(scheduled)
+        entry['actual_amount'] += int(actual)
+
+    return {
+        'month': f'{year:04d}-{month:02d}',
+        'days': [
+            {'date': txn_date.isoformat(), 'centers': list(centers.values())}
+            for txn_date, centers in days.items()
+        ],
+    }
+
+
+def month_view(center_ids, year, month):
+    """
+    월간 정산 달력 데이터 (범위 조회 1회)
+    {'month': 'YYYY-MM', 'days': [{'date', 'centers': [{'center_id', 'expected_amount',
+     'actual_amount', 'counts': {상태: 건수}}]}]}
+    """
+    return _month_payload(year, month, _month_rows(center_ids, year, month))
+
+
+async def amonth_view(center_ids, year, month):
+    """month_view 의 async 버전"""
+    rows = [row async for row in _month_rows(center_ids, year, month)]
+    return _month_payload(year, month, rows)
@@ -0,0 +1,202 @@
+"""
+더식판 월 정산 확정
+3.4 정산관리 - 정산예정(PENDING) → 정산중(PROCESSING) → 정산완료(COMPLETED) / 조정됨(ADJUSTED)
+
+- create_month_settlements: 배송센터별 정산 행 생성 (이미 있으면 건드리지 않음)
+- claim_settlements: select_for_update(skip_locked=True) 로 다른 워커가 잡지 않은 행만 선점
+- finalize_settlement: 정산 달력 집계(SettlementCalendarDay)로 금액 계산 후 완료 처리
+- adjust_settlement: 버전 비교(낙관적 잠금)로 조정 - 그 사이 다른 변경이 있으면 SettlementConflict
+- run_parallel: 프로세스 풀의 각 워커가 선점/확정을 반복해 센터를 나눠 처리
+"""
+import calendar
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Center, Child
+from payments.models import Settlement, SettlementCalendarDay
+from payments.settlement_calendar import NON_EXPECTED_STATUSES
+
+
+CLAIM_BATCH_SIZE = 10
+# 실제 수금액으로 집계하는 출금 거래 상태 (정산 상태의 COMPLETED 와 다름)
+COLLECTED_STATUS = 'SUCCESS'
+# 워커가 중단되어 정산중(PROCESSING)으로 남은 행을 다시 선점할 수 있는 시간
+STALE_AFTER = timedelta(minutes=30)
+
+
+class SettlementConflict(Exception):
+    """조정 대상 정산이 그 사이 변경됨 (버전 불일치)"""
+
+
+def _month_bounds(settlement_month):
+    start = settlement_month.replace(day=1)
+    end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    return start, end
+
+
+def create_month_settlements(settlement_month, settlement_date=None):
+    """
+    활성 배송센터의 월 정산 행 생성
+    동시에 여러 번 실행해도 center+월 unique 제약으로 한 행만 남고, 기존 행은 덮어쓰지 않는다.
+    """
+    start, _ = _month_bounds(settlement_month)
+    settlement_date = settlement_date or timezone.localdate()
+    center_ids = Center.objects.filter(center_type='DELIVERY', is_active=True).values_list('pk', flat=True)
+    Settlement.objects.bulk_create(
+        [
+            Settlement(center_id=center_id, settlement_month=start,
+                       settlement_date=settlement_date, expected_amount=0)
+            for center_id in center_ids
+        ],
+        ignore_conflicts=True,
+    )
+    return Settlement.objects.filter(settlement_month=start).count()
+
+
+def claim_settlements(settlement_month, limit=CLAIM_BATCH_SIZE):
+    """
+    정산예정 행을 정산중으로 선점하고 pk 목록 반환
+    다른 워커가 잠근 행은 건너뛰므로(skip_locked) 워커끼리 같은 센터를 처리하지 않는다.
+    """
+    start, _ = _month_bounds(settlement_month)
+    stale = timezone.now() - STALE_AFTER
+    with transaction.atomic():
+        ids = list(
+            Settlement.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status='PENDING') | Q(status='PROCESSING', updated_at__lt=stale),
+                    settlement_month=start)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if ids:
+            Settlement.objects.filter(pk__in=ids).update(
+                status='PROCESSING', version=F('version') + 1, updated_at=timezone.now(),
+            )
+    return ids
+
+
+def settlement_totals(center_id, settlement_month):
+    """센터 월 정산 금액/이용 아동수 (정산 달력 집계 기준)"""
+    start, end = _month_bounds(settlement_month)
+    zero = Value(Decimal(0))
+    totals = SettlementCalendarDay.objects.filter(center_id=center_id, date__range=(start, end)).aggregate(
+        expected=Coalesce(Sum('scheduled_amount', filter=~Q(status__in=NON_EXPECTED_STATUSES)), zero),
+        collected=Coalesce(Sum('actual_amount', filter=Q(status=COLLECTED_STATUS)), zero),
+    )
+    totals['children'] = (
+        Child.objects
+        .filter(classroom__institution__delivery_center_id=center_id, enrollment_date__lte=end)
+        .filter(Q(withdrawal_date__isnull=True) | Q(withdrawal_date__gte=start))
+        .count()
+    )
+    return totals
+
+
+def finalize_settlement(settlement_id):
+    """
+    선점한 정산 1건 확정 (PROCESSING → COMPLETED)
+    금액 계산은 잠금 밖에서 하고, 반영할 때만 행을 잠가 상태를 다시 확인한다.
+    """
+    settlement = Settlement.objects.only('pk', 'center_id', 'settlement_month').get(pk=settlement_id)
+    totals = settlement_totals(settlement.center_id, settlement.settlement_month)
+
+    with transaction.atomic():
+        settlement = Settlement.objects.select_for_update().filter(
+            pk=settlement_id, status='PROCESSING',
+        ).first()
+        if settlement is None:
+            return False
+        settlement.expected_amount = totals['expected']
+        settlement.collected_amount = totals['collected']
+        settlement.total_children = totals['children']
+        settlement.calculate_commission()
+        settlement.status = 'COMPLETED'
+        settlement.completed_at = timezone.now()
+        settlement.version += 1
+        settlement.save(update_fields=[
+            'expected_amount', 'collected_amount', 'total_children', 'commission_amount',
+            'net_amount', 'status', 'completed_at', 'version', 'updated_at',
+        ])
+    return True
+
+
+def adjust_settlement(settlement_id, expected_version, collected_amount=None,
+                      commission_rate=None, notes=None):
+    """
+    완료된 정산 조정 (COMPLETED/ADJUSTED → ADJUSTED)
+    조회 시점의 버전(expected_version)과 현재 버전이 같을 때만 반영한다.
+    """
+    settlement = Settlement.objects.get(pk=settlement_id)
+    if settlement.version != expected_version or settlement.status not in ('COMPLETED', 'ADJUSTED'):
+        raise SettlementConflict(f'정산 {settlement_id} 이(가) 변경되었거나 조정할 수 없는 상태입니다.')
+
+    if collected_amount is not None:
+        settlement.collected_amount = Decimal(collected_amount)
+    if commission_rate is not None:
+        settlement.commission_rate = Decimal(commission_rate)
+    settlement.calculate_commission()
+
+    changes = {
+        'collected_amount': settlement.collected_amount,
+        'commission_rate': settlement.commission_rate,
+        'commission_amount': settlement.commission_amount,
+        'net_amount': settlement.net_amount,
+        'status': 'ADJUSTED',
+        'version': F('version') + 1,
+        'updated_at': timezone.now(),
+    }
+    if notes is not None:
+        changes['notes'] = notes
+
+    updated = Settlement.objects.filter(
+        pk=settlement_id, version=expected_version, status__in=('COMPLETED', 'ADJUSTED'),
+    ).update(**changes)
+    if not updated:
+        raise SettlementConflict(f'정산 {settlement_id} 이(가) 다른 요청에 의해 먼저 변경되었습니다.')
+    settlement.refresh_from_db()
+    return settlement
+
+
+def process_month(settlement_month, batch_size=CLAIM_BATCH_SIZE):
+    """선점할 행이 없을 때까지 선점 → 확정 반복 (워커 1개 기준)"""
+    completed = 0
+    while True:
+        ids = claim_settlements(settlement_month, limit=batch_size)
+        if not ids:
+            return completed
+        for settlement_id in ids:
+            completed += finalize_settlement(settlement_id)
+
+
+def _worker(month_iso, batch_size):
+    """프로세스 풀 워커 - fork 된 프로세스는 자체 DB 연결을 새로 연다"""
+    try:
+        return process_month(date.fromisoformat(month_iso), batch_size)
+    finally:
+        connections.close_all()
+
+
+def run_parallel(settlement_month, workers=4, batch_size=CLAIM_BATCH_SIZE):
+    """
+    프로세스 풀로 월 정산 확정
+    skip_locked 를 지원하지 않는 DB(SQLite 등)에서는 단일 프로세스로 처리한다.
+    워커는 django.setup() 이 끝난 부모를 fork 해서 쓰므로 시작 방식을 fork 로 고정한다
+    (spawn/forkserver 기본값인 macOS/Python 3.14+ 에서도 앱 레지스트리가 준비된 상태로 시작).
+    """
+    if workers <= 1 or not connections['default'].features.has_select_for_update_skip_locked:
+        return process_month(settlement_month, batch_size)
+
+    # 부모 프로세스의 DB 연결을 자식이 공유하지 않도록 fork 전에 닫는다
+    connections.close_all()
+    month_iso = settlement_month.replace(day=1).isoformat()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        futures = [pool.submit(_worker, month_iso, batch_size) for _ in range(workers)]
+        return sum(future.result() for future in futures)
@@ -0,0 +1,100 @@
+"""
+더식판 Payment Signals
+- 출금 거래 저장/삭제 시 정산 달력 집계(SettlementCalendarDay) 증분 반영
+- 거래/미납/CMS 회원/아동 변경 시 학부모 페이지 요약 다시 만들기
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.models import Child
+from payments import parent_portal, settlement_calendar
+from payments.models import CMSMember, PaymentTransaction, UnpaidManagement
+
+
+CALENDAR_FIELDS = ('transaction_date', 'status', 'scheduled_amount', 'actual_amount')
+
+
+def _calendar_state(pk):
+    return (
+        PaymentTransaction.objects
+        .filter(pk=pk)
+        .values(*CALENDAR_FIELDS, center_id=F(settlement_calendar.CENTER_PATH))
+        .first()
+    )
+
+
+@receiver(pre_save, sender=PaymentTransaction)
+def remember_calendar_state(sender, instance, raw, **kwargs):
+    """변경 전 집계 기준값 보관"""
+    if raw:
+        return
+    instance._calendar_state = _calendar_state(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=PaymentTransaction)
+def update_calendar_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_calendar_state', None)
+    if old and all(old[f] == getattr(instance, f) for f in CALENDAR_FIELDS):
+        return
+
+    new = _calendar_state(instance.pk)
+    deltas = [settlement_calendar.transaction_delta(
+        new['center_id'], new['transaction_date'], new['status'],
+        new['scheduled_amount'], new['actual_amount'],
+    )]
+    if old:
+        deltas.append(settlement_calendar.transaction_delta(
+            old['center_id'], old['transaction_date'], old['status'],
+            old['scheduled_amount'], old['actual_amount'], sign=-1,
+        ))
+    settlement_calendar.apply_deltas(settlement_calendar.merge_deltas(*deltas))
+
+
+@receiver(pre_delete, sender=PaymentTransaction)
+def remember_calendar_state_on_delete(sender, instance, **kwargs):
+    instance._calendar_state = _calendar_state(instance.pk)
+
+
+@receiver(post_delete, sender=PaymentTransaction)
+def update_calendar_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_calendar_state', None)
+    if not old:
+        return
+    settlement_calendar.apply_deltas(settlement_calendar.transaction_delta(
+        old['center_id'], old['transaction_date'], old['status'],
+        old['scheduled_amount'], old['actual_amount'], sign=-1,
+    ))
+
+
+# ==================== 학부모 페이지 요약 ====================
+
+def _transaction_child_id(txn):
+    if PaymentTransaction.cms_member.is_cached(txn):
+        return txn.cms_member.child_id
+    return CMSMember.objects.filter(pk=txn.cms_member_id).values_list('child_id', flat=True).first()
+
+
+@receiver(post_save, sender=PaymentTransaction)
+@receiver(post_delete, sender=PaymentTransaction)
+def refresh_parent_summary_on_transaction(sender, instance, raw=False, **kwargs):
+    if not raw:
+        parent_portal.refresh([_transaction_child_id(instance)])
+
+
+@receiver(post_save, sender=UnpaidManagement)
+@receiver(post_delete, sender=UnpaidManagement)
+@receiver(post_save, sender=CMSMember)
+@receiver(post_delete, sender=CMSMember)
+def refresh_parent_summary(sender, instance, raw=False, **kwargs):
+    if not raw:
+        parent_portal.refresh([instance.child_id])
+
+
+@receiver(post_save, sender=Child)
+@receiver(post_delete, sender=Child)
+def refresh_parent_summary_on_child(sender, instance, raw=False, **kwargs):
+    if not raw:
+        parent_portal.refresh([instance.pk])
@@ -1,3 +1,687 @@
-from django.test import TestCase
+import asyncio
+import calendar
+import io
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from hypothesis import given
+from hypothesis import strategies as st
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from core.models import Center, Child, Classroom, Institution
+from payments import money, parent_portal, registration, retry, settlement_calendar, settlements
+from payments.importers import MemberImporter, iter_csv_rows
+from payments.models import (
+    CMSMember, PaymentTransaction, Settlement, SettlementCalendarDay, UnpaidManagement,
+)
+from payments.nicepay import MEMBER_STATUS_ACTIVE, RESULT_HTTP_ERROR, NicepayError
+
+
+IMPORT_HEADER = ('기관명,반 이름,아동 이름,보호자 이름,보호자 연락처,등록일,출금일,월 이용료,'
+                 'NICEPAY 회원ID,은행코드,은행명,계좌번호,예금주명')
+
+
+def make_classroom(name='테스트 배송센터'):
+    """배송센터 → 교육기관 → 반"""
+    center = Center.objects.create(name=name, center_type='DELIVERY', address='-', phone='-',
+                                   business_number=f'{name}-사업자')
+    institution = Institution.objects.create(
+        name='해바라기 어린이집', institution_type='OTHER', delivery_center=center, address='-',
+        phone='-', contact_person='-', contact_phone='-', service_start_date=date(2024, 1, 1),
+    )
+    return Classroom.objects.create(institution=institution, name='새싹반')
+
+
+def import_row(member_id='', phone='010-1234-5678', bank_code='004', name='김하늘'):
+    return (f'해바라기 어린이집,새싹반,{name},김보호,{phone},2025-03-02,25,30000,'
+            f'{member_id},{bank_code},국민은행,123-456,김보호')
+
+
+def import_csv(*rows):
+    return iter_csv_rows(io.StringIO('\n'.join([IMPORT_HEADER, *rows])))
+
+
+amounts = st.integers(min_value=0, max_value=10 ** 10)
+rates = st.decimals(min_value=0, max_value=100, places=2)
+fees = st.integers(min_value=0, max_value=10 ** 7)
+months = st.tuples(st.integers(min_value=2020, max_value=2030), st.integers(min_value=1, max_value=12))
+
+
+class CommissionTests(SimpleTestCase):
+
+    def test_half_won_rounds_up(self):
+        self.assertEqual(money.commission(5, Decimal('10.00')), Decimal(1))       # 0.5 → 1
+        self.assertEqual(money.commission(14, Decimal('10.00')), Decimal(1))      # 1.4 → 1
+        self.assertEqual(money.commission(33333, Decimal('3.30')), Decimal(1100))  # 1099.989 → 1100
+
+    @given(amounts, rates)
+    def test_commission_and_net_reconcile(self, collected, rate):
+        fee, net = money.commission_and_net(collected, rate)
+        self.assertEqual(fee + net, collected)
+        self.assertEqual(fee, fee.to_integral_value())
+        self.assertLessEqual(abs(fee - Decimal(collected) * rate / 100), Decimal('0.5'))
+
+    @given(st.lists(st.tuples(amounts, rates), max_size=50))
+    def test_vectorized_preview_matches_scalar(self, rows):
+        self.assertEqual(
+            money.preview_commission(rows),
+            [money.commission_and_net(collected, rate) for collected, rate in rows],
+        )
+
+
+class BulkCommissionTests(TestCase):
+
+    def test_sql_matches_scalar_across_rounding_boundaries(self):
+        center = make_classroom().institution.delivery_center
+        cases = [
+            (5, '10.00'), (14, '10.00'), (15, '10.00'), (25455, '10.00'),  # x.5 / x.4 경계
+            (33333, '3.30'), (5000, '0.01'), (4999, '0.01'), (15001, '3.33'),
+            (0, '12.50'), (123456789, '0.00'), (9999999999, '99.99'), (9999999999, '100.00'),
+        ]
+        for month, (collected, rate) in enumerate(cases, start=1):
+            Settlement.objects.create(center=center, settlement_month=date(2024, month, 1),
+                                      settlement_date=date(2025, 7, 10), expected_amount=0,
+                                      collected_amount=collected, commission_rate=Decimal(rate),
+                                      net_amount=1)
+
+        self.assertEqual(money.apply_commission(Settlement.objects.all(), version=F('version') + 1), len(cases))
+        rows = Settlement.objects.order_by('settlement_month').values_list(
+            'collected_amount', 'commission_rate', 'commission_amount', 'net_amount', 'version',
+        )
+        self.assertEqual(
+            [(fee, net, version) for _, _, fee, net, version in rows],
+            [(*money.commission_and_net(collected, rate), 1) for collected, rate, *_ in rows],
+        )
+
+
+class ProrationTests(SimpleTestCase):
+
+    @given(fees, months)
+    def test_full_month_is_monthly_fee(self, fee, year_month):
+        self.assertEqual(money.prorate(fee, *year_month), fee)
+
+    @given(fees, months, st.lists(st.integers(min_value=1, max_value=31), max_size=6))
+    def test_any_split_of_month_sums_to_monthly_fee(self, fee, year_month, cut_days):
+        year, month = year_month
+        days_in_month = calendar.monthrange(year, month)[1]
+        month_start = date(year, month, 1)
+        cuts = sorted({month_start + timedelta(days=min(d, days_in_month) - 1) for d in cut_days})
+        bounds = [month_start] + cuts + [month_start + timedelta(days=days_in_month)]
+
+        parts = [money.prorate(fee, year, month, start, end) for start, end in zip(bounds, bounds[1:])]
+        self.assertEqual(sum(parts), fee)
+        self.assertTrue(all(part >= 0 for part in parts))
+
+    @given(fees, months, st.integers(min_value=0, max_value=40))
+    def test_enrollment_and_withdrawal_on_same_day_reconcile(self, fee, year_month, offset):
+        """같은 날 퇴원한 아동과 등록한 아동의 이용료 합 = 월 이용료"""
+        year, month = year_month
+        day = date(year, month, 1) + timedelta(days=offset)
+        leaving = money.prorate(fee, year, month, end=day)
+        joining = money.prorate(fee, year, month, start=day)
+        self.assertEqual(leaving + joining, fee)
+
+    def test_outside_month_is_zero(self):
+        self.assertEqual(money.prorate(30000, 2025, 6, start=date(2025, 7, 3)), 0)
+        self.assertEqual(money.prorate(30000, 2025, 6, end=date(2025, 5, 20)), 0)
+        self.assertEqual(money.prorate(30000, 2025, 6, start=date(2025, 6, 16)), 15000)
+
+
+class ParentPortalTests(SimpleTestCase):
+
+    def test_token_round_trip(self):
+        token = parent_portal.portal_token(42)
+        self.assertEqual(parent_portal.child_id_from_token(token), 42)
+        self.assertIsNone(parent_portal.child_id_from_token(token[:-1] + 'x'))
+        self.assertIsNone(parent_portal.child_id_from_token(''))
+
+    def test_projected_withdrawal_moves_to_business_day(self):
+        # 2025-05-25 는 일요일 → 26일(월)
+        self.assertEqual(parent_portal._projected_withdrawal(25, date(2025, 5, 20)), date(2025, 5, 26))
+        # 출금일이 지났으면 다음 달, 말일보다 크면 말일
+        self.assertEqual(parent_portal._projected_withdrawal(31, date(2025, 1, 31)), date(2025, 1, 31))
+        self.assertEqual(parent_portal._projected_withdrawal(10, date(2025, 2, 11)), date(2025, 3, 10))
+
+
+class ParentSummaryCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.child = Child.objects.create(classroom=make_classroom(), name='아동', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=date(2025, 3, 2))
+        cls.member = CMSMember.objects.create(
+            child=cls.child, nicepay_member_id='M0', bank_code='004', bank_name='국민은행',
+            account_number='1234567890', account_holder='-', monthly_amount=30000, status='ACTIVE',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _summary(self):
+        _, _, payload = cache.get(parent_portal.summary_key(self.child.pk))
+        return json.loads(payload)
+
+    async def test_stale_entry_is_served_while_one_request_refreshes(self):
+        await sync_to_async(parent_portal.store_summaries)([self.child.pk])
+        key = parent_portal.summary_key(self.child.pk)
+        _, etag, payload = await cache.aget(key)
+        await cache.aset(key, (time.time() - 1, etag, payload))
+
+        with mock.patch.object(parent_portal, 'store_summaries', wraps=parent_portal.store_summaries) as store:
+            results = await asyncio.gather(*(parent_portal.aget_summary(self.child.pk) for _ in range(3)))
+
+        self.assertEqual(store.call_count, 1)
+        self.assertEqual(results[1:], [(etag, payload), (etag, payload)])
+        fresh_until, new_etag, _ = await cache.aget(key)
+        self.assertGreater(fresh_until, time.time())
+        self.assertEqual(results[0][0], new_etag)
+
+    async def test_concurrent_cold_misses_build_once(self):
+        with mock.patch.object(parent_portal, 'store_summaries', wraps=parent_portal.store_summaries) as store:
+            first, second = await asyncio.gather(parent_portal.aget_summary(self.child.pk),
+                                                 parent_portal.aget_summary(self.child.pk))
+
+        self.assertEqual(store.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(json.loads(first[1])['child']['id'], self.child.pk)
+
+    def test_transaction_and_unpaid_changes_refresh_after_commit(self):
+        parent_portal.store_summaries([self.child.pk])
+        before = cache.get(parent_portal.summary_key(self.child.pk))
+        today = timezone.localdate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PaymentTransaction.objects.create(cms_member=self.member, transaction_date=today,
+                                              scheduled_amount=30000, status='FAILED')
+            self.assertEqual(cache.get(parent_portal.summary_key(self.child.pk)), before)
+        self.assertEqual([txn['status'] for txn in self._summary()['transactions']], ['FAILED'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UnpaidManagement.objects.create(child=self.child, unpaid_month=today.replace(day=1),
+                                            unpaid_amount=30000)
+            self.assertEqual(self._summary()['state'], 'PENDING')
+        summary = self._summary()
+        self.assertEqual(summary['state'], 'UNPAID')
+        self.assertEqual(summary['unpaid'][0]['remaining_amount'], 30000)
+
+
+class MemberImporterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.center = make_classroom().institution.delivery_center
+
+    def test_invalid_rows_are_reported_per_field(self):
+        result = MemberImporter(self.center).run(import_csv(
+            import_row('M1', bank_code='KB'),
+            import_row('M2', phone='02-123'),
+            import_row('M3', bank_code='4'),
+        ))
+        self.assertEqual([(e.row, e.field) for e in result.errors],
+                         [(2, 'bank_code'), (3, 'parent_phone')])
+        self.assertEqual(CMSMember.objects.get().bank_code, '004')
+
+    def test_duplicate_member_ids_in_file_and_db(self):
+        MemberImporter(self.center).run(import_csv(import_row('M1')))
+        result = MemberImporter(self.center, batch_size=2).run(import_csv(
+            import_row('M1'), import_row('M2'), import_row('M2'), import_row('M2'),
+        ))
+        self.assertEqual([(e.row, e.message) for e in result.errors], [
+            (2, '이미 등록된 NICEPAY 회원ID입니다.'),
+            (4, '파일 내 중복된 NICEPAY 회원ID입니다.'),
+            (5, '파일 내 중복된 NICEPAY 회원ID입니다.'),
+        ])
+        self.assertEqual(result.created_members, 1)
+
+    def test_rolled_back_batch_does_not_mark_ids_as_seen(self):
+        bulk_create = CMSMember.objects.bulk_create
+        calls = []
+
+        def fail_first(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise IntegrityError('동시 등록')
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(CMSMember.objects, 'bulk_create', side_effect=fail_first):
+            result = MemberImporter(self.center, batch_size=1).run(import_csv(
+                import_row('M1', name='첫째'), import_row('M1', name='둘째'),
+            ))
+        self.assertEqual([(e.row, e.field) for e in result.errors], [(2, '')])
+        self.assertEqual(CMSMember.objects.get().child.name, '둘째')
+
+    def test_dry_run_saves_nothing(self):
+        result = MemberImporter(self.center, dry_run=True).run(import_csv(import_row('M1')))
+        self.assertEqual((result.created_children, result.created_members), (1, 1))
+        self.assertFalse(Child.objects.exists())
+        self.assertFalse(CMSMember.objects.exists())
+
+    def test_10k_rows_use_queries_per_batch_not_per_row(self):
+        rows = [import_row(f'M{i:05d}', name=f'아동{i}') for i in range(10000)]
+        with CaptureQueriesContext(connection) as queries:
+            result = MemberImporter(self.center).run(import_csv(*rows))
+        self.assertEqual((result.created_children, result.created_members), (10000, 10000))
+        self.assertEqual(result.errors, [])
+        # 배치(1000행)마다 중복 조회 1회 + bulk_create (DB 파라미터 한도에 따라 여러 INSERT)
+        self.assertLess(len(queries), 1000)
+
+
+class FakeRegistrationClient:
+    """회원ID 별로 정해 둔 응답을 돌려주는 NICEPAY mock (예외 인스턴스면 raise)"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def register_member(self, member_id, data):
+        self.requested.append(member_id)
+        response = self.responses[member_id]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def get_member(self, member_id):
+        return {'resultCd': '0000', 'memberInfo': {'status': MEMBER_STATUS_ACTIVE, 'bankResultMsg': '정상'}}
+
+
+class MemberRegistrationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        classroom = make_classroom()
+        for member_id in ('OK', 'DUP', 'REJECT', 'TIMEOUT'):
+            child = Child.objects.create(classroom=classroom, name=member_id, parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=date(2025, 3, 2))
+            CMSMember.objects.create(child=child, nicepay_member_id=member_id, bank_code='004',
+                                     bank_name='국민은행', account_number='123', account_holder='-',
+                                     monthly_amount=30000)
+
+    def _register(self):
+        client = FakeRegistrationClient({
+            'OK': {'resultCd': '0000', 'resultMsg': '정상'},
+            'DUP': {'resultCd': registration.RESULT_DUPLICATE_MEMBER, 'resultMsg': '회원아이디 중복'},
+            'REJECT': {'resultCd': '3101', 'resultMsg': '계좌번호 오류'},
+            'TIMEOUT': NicepayError(RESULT_HTTP_ERROR, 'timeout'),
+        })
+        return client, registration.register_pending_members(client, max_workers=2)
+
+    def _members(self):
+        return {m.nicepay_member_id: m for m in CMSMember.objects.all()}
+
+    def test_results_by_outcome(self):
+        _, summary = self._register()
+        self.assertEqual(summary, {'submitted': 2, 'failed': 1, 'retry': 1})
+
+        members = self._members()
+        for member_id in ('OK', 'DUP'):
+            self.assertEqual(members[member_id].status, 'PENDING')
+            self.assertIsNotNone(members[member_id].registration_requested_at)
+        self.assertEqual(members['REJECT'].status, 'FAILED')
+        self.assertEqual(members['REJECT'].registration_message, '계좌번호 오류')
+        self.assertEqual(members['TIMEOUT'].status, 'PENDING')
+        self.assertEqual(members['TIMEOUT'].registration_result_code, RESULT_HTTP_ERROR)
+
+    def test_only_transport_failures_are_requested_again(self):
+        self._register()
+        client, summary = self._register()
+        self.assertEqual(client.requested, ['TIMEOUT'])
+        self.assertEqual(summary['retry'], 1)
+
+    def test_sync_activates_requested_members(self):
+        client, _ = self._register()
+        self.assertEqual(registration.sync_member_statuses(client, max_workers=2), 2)
+        statuses = {member_id: m.status for member_id, m in self._members().items()}
+        self.assertEqual(statuses, {'OK': 'ACTIVE', 'DUP': 'ACTIVE', 'REJECT': 'FAILED', 'TIMEOUT': 'PENDING'})
+
+
+class FakePaymentClient:
+    """출금신청 mock - 전문번호를 기록하고 회원ID 별로 정해 둔 결과코드를 돌려준다"""
+
+    def __init__(self, codes=None):
+        self.codes = codes or {}
+        self.requests = []
+
+    def create_payment(self, send_date, message_no, data):
+        self.requests.append((send_date, message_no, data))
+        return {'resultCd': self.codes.get(data['memberId'], '0000'), 'resultMsg': ''}
+
+
+class PaymentRetryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        classroom = make_classroom()
+        cls.members = []
+        for i in range(3):
+            child = Child.objects.create(classroom=classroom, name=f'아동{i}', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=date(2025, 3, 2))
+            cls.members.append(CMSMember.objects.create(
+                child=child, nicepay_member_id=f'M{i}', bank_code='004', bank_name='국민은행',
+                account_number='123', account_holder='-', monthly_amount=30000, status='ACTIVE',
+            ))
+
+    def _failed(self, member, code='2013', retry_count=0, **kwargs):
+        return PaymentTransaction.objects.create(
+            cms_member=member, transaction_date=date(2025, 6, 25), scheduled_amount=30000,
+            status='FAILED', failure_code=code, retry_count=retry_count, **kwargs,
+        )
+
+    def test_backoff_schedule_uses_business_days_and_caps(self):
+        no_jitter = mock.Mock(randint=lambda low, high: low)
+        friday = date(2025, 6, 27)
+        self.assertEqual(retry.next_retry_date(friday, 0, no_jitter), date(2025, 7, 1))
+        self.assertEqual(retry.next_retry_date(friday, 1, no_jitter), date(2025, 7, 4))
+        self.assertEqual(retry.next_retry_date(friday, 9, no_jitter), date(2025, 7, 11))
+
+        rng = random.Random(0)
+        spread = {retry.next_retry_date(friday, 0, rng) for _ in range(200)}
+        self.assertEqual(len(spread), retry.RETRY_JITTER_DAYS + 1)
+
+    def test_terminal_and_exhausted_failures_are_dead_lettered(self):
+        scheduled = self._failed(self.members[0], code='2013')
+        terminal = self._failed(self.members[1], code='2010')
+        exhausted = self._failed(self.members[2], code='2013', retry_count=retry.MAX_RETRY_COUNT)
+        # 같은 청구월 미납 내역이 이미 있으면 금액을 더한다
+        UnpaidManagement.objects.create(child=self.members[2].child, unpaid_month=date(2025, 6, 1),
+                                        unpaid_amount=10000, paid_amount=10000, status='PAID')
+
+        summary = retry.schedule_retries(today=date(2025, 6, 27), rng=random.Random(0))
+        self.assertEqual(summary, {'scheduled': 1, 'dead_lettered': 2})
+
+        scheduled.refresh_from_db()
+        self.assertIsNotNone(scheduled.next_retry_date)
+        terminal.refresh_from_db()
+        self.assertEqual(terminal.dead_letter.reason, 'TERMINAL')
+        self.assertEqual(exhausted.dead_letter.reason, 'EXHAUSTED')
+
+        unpaid = {u.child_id: u for u in UnpaidManagement.objects.all()}
+        self.assertEqual((unpaid[self.members[1].child_id].unpaid_amount,
+                          unpaid[self.members[1].child_id].status), (30000, 'UNPAID'))
+        self.assertEqual((unpaid[self.members[2].child_id].unpaid_amount,
+                          unpaid[self.members[2].child_id].status), (40000, 'PARTIAL'))
+        self.assertEqual(exhausted.dead_letter.unpaid_id, unpaid[self.members[2].child_id].pk)
+
+    def test_resubmission_moves_transaction_to_send_date(self):
+        txns = [self._failed(member, next_retry_date=date(2025, 6, 30)) for member in self.members]
+        client = FakePaymentClient({'M2': '2010'})
+        now = timezone.make_aware(datetime(2025, 6, 30, 10, 0))
+
+        summary = retry.submit_due_retries(client, now=now, max_workers=2)
+        self.assertEqual(summary, {'submitted': 2, 'failed': 1})
+
+        txns[0].refresh_from_db()
+        self.assertEqual((txns[0].status, txns[0].transaction_date, txns[0].billing_month, txns[0].retry_count),
+                         ('SCHEDULED', date(2025, 7, 1), date(2025, 6, 1), 1))
+        self.assertEqual(client.requests[0][2]['accountDesc'], '06')
+        txns[2].refresh_from_db()
+        self.assertEqual((txns[2].status, txns[2].transaction_date), ('FAILED', date(2025, 6, 25)))
+
+        days = {(day.date, day.status): day.transaction_count for day in SettlementCalendarDay.objects.all()}
+        self.assertEqual(days.get((date(2025, 6, 25), 'FAILED')), 1)
+        self.assertEqual(days.get((date(2025, 7, 1), 'SCHEDULED')), 2)
+
+    def test_overlapping_run_skips_claimed_rows(self):
+        txns = [self._failed(member, next_retry_date=date(2025, 6, 30)) for member in self.members]
+        now = timezone.make_aware(datetime(2025, 6, 30, 10, 0))
+        # 먼저 시작한 실행이 앞의 두 건을 선점해 신청 중인 상태
+        claimed = retry.claim_due_retries(date(2025, 7, 1), limit=2)
+        self.assertEqual(claimed, [txns[0].pk, txns[1].pk])
+
+        client = FakePaymentClient()
+        self.assertEqual(retry.submit_due_retries(client, now=now, max_workers=1),
+                         {'submitted': 1, 'failed': 0})
+        self.assertEqual([data['memberId'] for _, _, data in client.requests], ['M2'])
+        txns[2].refresh_from_db()
+        self.assertIsNone(txns[2].retry_claimed_at)
+
+        # 선점한 실행이 중단된 채 CLAIM_STALE_AFTER 가 지나면 다시 신청한다
+        PaymentTransaction.objects.filter(pk__in=claimed).update(
+            retry_claimed_at=timezone.now() - retry.CLAIM_STALE_AFTER - timedelta(minutes=1),
+        )
+        self.assertEqual(retry.submit_due_retries(client, now=now, max_workers=1)['submitted'], 2)
+        self.assertEqual(retry.claim_due_retries(date(2025, 7, 1)), [])
+
+    def test_message_numbers_are_unique_per_send_date(self):
+        for member in self.members:
+            self._failed(member, next_retry_date=date(2025, 6, 30))
+        client = FakePaymentClient({member.nicepay_member_id: '2018' for member in self.members})
+        now = timezone.make_aware(datetime(2025, 6, 30, 10, 0))
+
+        retry.submit_due_retries(client, now=now, max_workers=2)
+        PaymentTransaction.objects.update(next_retry_date=date(2025, 6, 30))
+        retry.submit_due_retries(client, now=now, max_workers=2)
+
+        numbers = sorted(message_no for _, message_no, _ in client.requests)
+        self.assertEqual(numbers, [f'{n:06d}' for n in range(1, 7)])
+        self.assertEqual(retry.reserve_message_numbers(date(2025, 7, 2), 2), 1)
+
+
+class SettlementFinalizeTests(TestCase):
+
+    def test_amounts_come_from_calendar_rows(self):
+        center = make_classroom().institution.delivery_center
+        for day, status, scheduled, actual in [
+            (date(2025, 6, 25), 'SUCCESS', 90000, 90000),
+            (date(2025, 6, 25), 'FAILED', 30000, 0),
+            (date(2025, 6, 26), 'SUCCESS', 30000, 25455),
+            (date(2025, 6, 26), 'CANCELLED', 30000, 0),
+            (date(2025, 6, 30), 'SCHEDULED', 30000, 0),
+            (date(2025, 7, 1), 'SUCCESS', 30000, 30000),
+        ]:
+            SettlementCalendarDay.objects.create(center=center, date=day, status=status,
+                                                 transaction_count=1, scheduled_amount=scheduled,
+                                                 actual_amount=actual)
+
+        settlements.create_month_settlements(date(2025, 6, 1), settlement_date=date(2025, 7, 10))
+        [settlement_id] = settlements.claim_settlements(date(2025, 6, 1))
+        self.assertTrue(settlements.finalize_settlement(settlement_id))
+
+        settlement = Settlement.objects.get(pk=settlement_id)
+        self.assertEqual(settlement.status, 'COMPLETED')
+        self.assertEqual(settlement.expected_amount, 180000)
+        self.assertEqual(settlement.collected_amount, 115455)
+        self.assertEqual(settlement.commission_amount, 11546)
+        self.assertEqual(settlement.net_amount, 103909)
+
+    def test_adjust_with_stale_version_conflicts_and_leaves_row(self):
+        make_classroom()
+        settlements.create_month_settlements(date(2025, 6, 1), settlement_date=date(2025, 7, 10))
+        [settlement_id] = settlements.claim_settlements(date(2025, 6, 1))
+        settlements.finalize_settlement(settlement_id)
+        read_version = Settlement.objects.get(pk=settlement_id).version
+
+        # 같은 버전을 읽은 두 요청 중 먼저 반영된 쪽만 성공
+        adjusted = settlements.adjust_settlement(settlement_id, read_version, collected_amount=50000)
+        self.assertEqual((adjusted.status, adjusted.version), ('ADJUSTED', read_version + 1))
+        with self.assertRaises(settlements.SettlementConflict):
+            settlements.adjust_settlement(settlement_id, read_version, collected_amount=90000,
+                                          notes='늦은 요청')
+
+        settlement = Settlement.objects.get(pk=settlement_id)
+        self.assertEqual((settlement.collected_amount, settlement.net_amount, settlement.notes),
+                         (adjusted.collected_amount, adjusted.net_amount, adjusted.notes))
+        self.assertEqual(settlement.version, read_version + 1)
+
+        # 조회 후 반영 전에 다른 요청이 끼어든 경우 - 조건부 UPDATE 가 0건
+        def concurrent_adjust(instance):
+            Settlement.objects.filter(pk=settlement_id).update(notes='먼저 반영', version=F('version') + 1)
+
+        with mock.patch.object(Settlement, 'calculate_commission', autospec=True, side_effect=concurrent_adjust):
+            with self.assertRaises(settlements.SettlementConflict):
+                settlements.adjust_settlement(settlement_id, read_version + 1, collected_amount=90000)
+        settlement = Settlement.objects.get(pk=settlement_id)
+        self.assertEqual((settlement.collected_amount, settlement.notes, settlement.version),
+                         (adjusted.collected_amount, '먼저 반영', read_version + 2))
+
+
+class SettlementCalendarTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        classroom = make_classroom()
+        cls.center = classroom.institution.delivery_center
+        cls.members = []
+        for i in range(3):
+            child = Child.objects.create(classroom=classroom, name=f'아동{i}', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=date(2025, 3, 2))
+            cls.members.append(CMSMember.objects.create(
+                child=child, nicepay_member_id=f'M{i}', bank_code='004', bank_name='국민은행',
+                account_number='123', account_holder='-', monthly_amount=30000, status='ACTIVE',
+            ))
+
+    def _days(self):
+        return {
+            (day.date, day.status): (day.transaction_count, day.scheduled_amount, day.actual_amount)
+            for day in SettlementCalendarDay.objects.all()
+            if day.transaction_count
+        }
+
+    def _transaction(self, member, transaction_date=date(2025, 6, 25), **kwargs):
+        return PaymentTransaction.objects.create(
+            cms_member=member, transaction_date=transaction_date, scheduled_amount=30000, **kwargs,
+        )
+
+    def test_status_transition_moves_counts_and_amounts(self):
+        txn = self._transaction(self.members[0])
+        self._transaction(self.members[1])
+        self.assertEqual(self._days(), {(date(2025, 6, 25), 'SCHEDULED'): (2, 60000, 0)})
+
+        txn.status = 'SUCCESS'
+        txn.actual_amount = 30000
+        txn.save()
+        self.assertEqual(self._days(), {
+            (date(2025, 6, 25), 'SCHEDULED'): (1, 30000, 0),
+            (date(2025, 6, 25), 'SUCCESS'): (1, 30000, 30000),
+        })
+
+        txn.transaction_date = date(2025, 6, 26)
+        txn.save()
+        txn.delete()
+        self.assertEqual(self._days(), {(date(2025, 6, 25), 'SCHEDULED'): (1, 30000, 0)})
+
+        view = settlement_calendar.month_view([self.center.pk], 2025, 6)
+        self.assertEqual(view, {'month': '2025-06', 'days': [{'date': '2025-06-25', 'centers': [{
+            'center_id': self.center.pk, 'expected_amount': 30000, 'actual_amount': 0,
+            'counts': {'SCHEDULED': 1},
+        }]}]})
+
+    def test_rebuild_matches_incremental_table(self):
+        first = self._transaction(self.members[0])
+        self._transaction(self.members[1], status='FAILED')
+        self._transaction(self.members[2], status='CANCELLED', transaction_date=date(2025, 6, 2))
+        first.status = 'SUCCESS'
+        first.actual_amount = 29000
+        first.save()
+        incremental = self._days()
+
+        settlement_calendar.rebuild(date(2025, 6, 1), date(2025, 6, 30))
+        self.assertEqual(self._days(), incremental)
+        self.assertEqual(len(incremental), 3)
+
+    async def test_matching_etag_returns_304(self):
+        user = await User.objects.acreate(username='hq', user_type='HQ')
+        auth = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        url = '/api/v1/payments/settlements/calendar/2025/6/'
+
+        response = await self.async_client.get(url, headers=auth)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = await self.async_client.get(url, headers={**auth, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        await SettlementCalendarDay.objects.acreate(center=self.center, date=date(2025, 6, 25),
+                                                    status='SCHEDULED', transaction_count=1,
+                                                    scheduled_amount=30000, actual_amount=0)
+        response = await self.async_client.get(url, headers={**auth, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class FakeMemberClient:
+    """회원 조회 mock - 모든 회원을 정상등록으로 응답"""
+
+    def get_member(self, member_id):
+        return {'resultCd': '0000', 'memberInfo': {'status': MEMBER_STATUS_ACTIVE, 'bankResultMsg': '정상'}}
+
+
+class AsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.centers, cls.children = [], []
+        for name in ('가 배송센터', '나 배송센터'):
+            classroom = make_classroom(name)
+            cls.centers.append(classroom.institution.delivery_center)
+            child = Child.objects.create(classroom=classroom, name='아동', parent_name='-',
+                                         parent_phone='010-1234-5678', enrollment_date=date(2025, 3, 2))
+            cls.children.append(child)
+            CMSMember.objects.create(
+                child=child, nicepay_member_id=f'M-{name}', bank_code='004', bank_name='국민은행',
+                account_number='123', account_holder='-', monthly_amount=30000, status='PENDING',
+                registration_requested_at=timezone.now(),
+            )
+            SettlementCalendarDay.objects.create(center=cls.centers[-1], date=date(2025, 6, 25),
+                                                 status='SCHEDULED', transaction_count=1,
+                                                 scheduled_amount=30000, actual_amount=0)
+        cls.user = User.objects.create(username='center-a', user_type='CENTER', center=cls.centers[0])
+
+    def _auth(self, user=None):
+        return {'Authorization': f'Bearer {AccessToken.for_user(user or self.user)}'}
+
+    async def test_missing_or_invalid_token_is_401(self):
+        for url in ['/api/v1/payments/settlements/calendar/2025/6/',
+                    '/api/v1/payments/nicepay/members/status/']:
+            for headers in [{}, {'Authorization': 'Bearer invalid'}]:
+                with self.subTest(url=url, headers=headers):
+                    response = await self.async_client.get(url, headers=headers)
+                    self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get('/api/v1/payments/parents/summary/',
+                                               headers={'X-Parent-Token': 'invalid'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_calendar_is_scoped_to_accessible_centers(self):
+        url = '/api/v1/payments/settlements/calendar/2025/6/'
+        response = await self.async_client.get(url, headers=self._auth())
+        self.assertEqual(response.status_code, 200)
+        center_ids = {center['center_id'] for day in response.json()['days'] for center in day['centers']}
+        self.assertEqual(center_ids, {self.centers[0].pk})
+
+        response = await self.async_client.get(f'{url}?center={self.centers[1].pk}', headers=self._auth())
+        self.assertEqual(response.status_code, 403)
+
+    async def test_member_statuses_are_scoped_to_accessible_centers(self):
+        url = '/api/v1/payments/nicepay/members/status/'
+        with mock.patch('payments.views.NicepayClient', FakeMemberClient):
+            response = await self.async_client.get(url, headers=self._auth())
+            self.assertEqual(response.json()['members'], [{
+                'memberId': 'M-가 배송센터', 'status': 'PENDING',
+                'nicepayStatus': MEMBER_STATUS_ACTIVE, 'message': '정상',
+            }])
+
+            response = await self.async_client.get(f'{url}?center={self.centers[1].pk}', headers=self._auth())
+            self.assertEqual(response.json()['members'], [])
+
+    async def test_parent_summary_matching_etag_returns_304(self):
+        headers = {'X-Parent-Token': parent_portal.portal_token(self.children[0].pk)}
+        url = '/api/v1/payments/parents/summary/'
+
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = await self.async_client.get(url, headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
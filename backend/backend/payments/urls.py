@@ -0,0 +1,13 @@
+from django.urls import path
+
+from payments import views
+
+app_name = 'payments'
+
+urlpatterns = [
+    path('nicepay/members/callback/', views.member_status_callback, name='member-status-callback'),
+    path('nicepay/members/status/', views.nicepay_member_statuses, name='member-statuses'),
+    path('parents/summary/', views.parent_summary, name='parent-summary'),
+    path('settlements/calendar/<int:year>/<int:month>/', views.settlement_calendar_month,
+         name='settlement-calendar'),
+]
@@ -1,3 +1,157 @@
-from django.shortcuts import render
+"""
+더식판 Payment Views
+"""
+import asyncio
+import hmac
+import json
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from accounts.authentication import accessible_center_ids, async_jwt_required
+from payments import parent_portal, settlement_calendar
+from payments.models import CMSMember
+from payments.nicepay import NicepayClient
+from payments.registration import apply_member_statuses, fetch_member_status
+
+
+MEMBER_CENTER_PATH = 'child__classroom__institution__delivery_center_id'
+STATUS_LOOKUP_LIMIT = 200
+
+# async 뷰의 NICEPAY 조회용 스레드 풀 (프로세스 공용)
+# 이벤트 루프 기본 executor 는 스레드가 적어(CPU 수 + 4) 여러 요청이 동시에 몰리면 줄을 선다.
+_gateway_pool = ThreadPoolExecutor(max_workers=settings.NICEPAY_MAX_WORKERS * 4,
+                                   thread_name_prefix='nicepay')
+
+
+@csrf_exempt
+@require_POST
+def member_status_callback(request):
+    """
+    NICEPAY 회원등록 결과 콜백 (polling 대신 일괄 통보 수신)
+    요청 본문: {"members": [{"memberId": "...", "status": 1, "bankResultMsg": "..."}]}
+    """
+    api_key = request.headers.get('Api-Key', '')
+    if not hmac.compare_digest(api_key, settings.NICEPAY_API_KEY):
+        return JsonResponse({'resultCd': 'E401', 'resultMsg': 'Api-Key 오류'}, status=401)
+
+    try:
+        payload = json.loads(request.body)
+        statuses = {
+            item['memberId']: (int(item['status']), item.get('bankResultMsg', ''))
+            for item in payload['members']
+        }
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'resultCd': '7777', 'resultMsg': '연동 파라미터 오류'}, status=400)
+
+    updated = apply_member_statuses(statuses)
+    return JsonResponse({'resultCd': '0000', 'resultMsg': '정상', 'updated': updated})
+
+
+def _center_filter(request, center_ids):
+    """?center= 파라미터 적용 → (센터 ID 목록, 오류 응답)"""
+    if 'center' not in request.GET:
+        return center_ids, None
+    try:
+        center_id = int(request.GET['center'])
+    except ValueError:
+        return None, JsonResponse({'detail': '잘못된 센터입니다.'}, status=400)
+    if center_id not in center_ids:
+        return None, JsonResponse({'detail': '권한이 없습니다.'}, status=403)
+    return [center_id], None
+
+
+@require_GET
+@async_jwt_required
+async def settlement_calendar_month(request, year, month):
+    """
+    5.2 정산 달력 - 월간 센터별 일자별 출금 예정/실제 금액
+    집계가 바뀌지 않았으면 If-None-Match 로 304 응답 (본문 재계산/재전송 없음)
+    """
+    if not 1 <= month <= 12:
+        return JsonResponse({'detail': '잘못된 월입니다.'}, status=400)
+
+    center_ids, error = _center_filter(request, await accessible_center_ids(request.user))
+    if error:
+        return error
+
+    etag = f'"{await settlement_calendar.amonth_etag(center_ids, year, month)}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(await settlement_calendar.amonth_view(center_ids, year, month))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@require_GET
+@async_jwt_required
+async def nicepay_member_statuses(request):
+    """
+    등록 결과 대기 중인 CMS 회원의 NICEPAY 회원 상태 조회
+    회원별 조회 요청을 동시에 보내(최대 NICEPAY_MAX_WORKERS) 가장 느린 응답 시간만큼만 기다린다.
+    센터 범위는 for_user() 서브쿼리로 목록 조회에 함께 건다 (접근할 수 없는 ?center= 는 빈 목록).
+    """
+    members = CMSMember.objects.for_user(request.user).filter(
+        status='PENDING', registration_requested_at__isnull=False,
+    )
+    if 'center' in request.GET:
+        try:
+            members = members.filter(**{MEMBER_CENTER_PATH: int(request.GET['center'])})
+        except ValueError:
+            return JsonResponse({'detail': '잘못된 센터입니다.'}, status=400)
+
+    members = [
+        row async for row in
+        members.order_by('pk').values_list('nicepay_member_id', 'status')[:STATUS_LOOKUP_LIMIT]
+    ]
+
+    client = NicepayClient()
+    semaphore = asyncio.Semaphore(settings.NICEPAY_MAX_WORKERS)
+    loop = asyncio.get_running_loop()
+
+    async def fetch(member_id):
+        async with semaphore:
+            return await loop.run_in_executor(_gateway_pool, fetch_member_status, client, member_id)
+
+    results = dict(await asyncio.gather(*(fetch(member_id) for member_id, _ in members)))
+    return JsonResponse({
+        'members': [
+            {
+                'memberId': member_id,
+                'status': status_,
+                'nicepayStatus': results[member_id][0] if results[member_id] else None,
+                'message': results[member_id][1] if results[member_id] else '',
+            }
+            for member_id, status_ in members
+        ],
+    })
+
+
+@require_GET
+async def parent_summary(request):
+    """
+    9.1 학부모 페이지 - 아동 요약 (월 이용료, 다음 출금, 최근 6개월 내역, 미납)
+    X-Parent-Token 헤더의 서명 토큰으로 아동을 확인하고, 캐시된 본문을 그대로 내려준다.
+    """
+    child_id = parent_portal.child_id_from_token(request.headers.get('X-Parent-Token', ''))
+    if child_id is None:
+        return JsonResponse({'detail': '인증 정보가 없거나 유효하지 않습니다.'}, status=401)
+
+    summary = await parent_portal.aget_summary(child_id)
+    if summary is None:
+        return JsonResponse({'detail': '아동 정보를 찾을 수 없습니다.'}, status=404)
+
+    etag, payload = summary
+    etag = f'"{etag}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(payload, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
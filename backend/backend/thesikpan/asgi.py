@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'thesikpan.settings')
 
 application = get_asgi_application()
+
+# 첫 요청 전에 URLconf 를 불러온다 (core/startup.py 참고)
+from core.startup import warm_up  # noqa: E402
+
+warm_up()
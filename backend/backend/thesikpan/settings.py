@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
     'accounts',
     'restaurants',
     'payments',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -89,6 +92,27 @@ DATABASES = {
     }
 }
 
+# 테스트 DB 는 마이그레이션 없이 모델에서 바로 만든다 (앱 마이그레이션 파일을 저장소에 두지 않음)
+TESTING = sys.argv[1:2] == ['test']
+if TESTING:
+    MIGRATION_MODULES = {app.rsplit('.', 1)[-1]: None for app in INSTALLED_APPS}
+
+
+# Cache
+# 배송센터 명단 버전(core.roster), 학부모 페이지 요약과 요청 병합 락(payments.parent_portal),
+# 분석 리포트(analytics.engine) 는 웹 워커/celery/관리 명령이 같은 캐시를 봐야 하므로 Redis 가 필수다.
+# 프로세스별 캐시(LocMemCache 등)는 core.checks 에서 오류로 막는다 (테스트만 예외).
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'thesikpan',
+    }
+}
+if TESTING:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,6 +150,31 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# 증빙파일은 별도 저장소 사용 (EVIDENCE_S3_BUCKET 지정 시 S3 호환 저장소, django-storages 필요)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'evidence': {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': os.environ['EVIDENCE_S3_BUCKET'],
+            'endpoint_url': os.environ.get('EVIDENCE_S3_ENDPOINT_URL'),
+            'location': 'evidence',
+            'default_acl': 'private',
+        },
+    } if os.environ.get('EVIDENCE_S3_BUCKET') else {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': MEDIA_ROOT / 'evidence'},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -151,3 +200,31 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
+
+# NICEPAY CMS Settings (기본값은 로컬 mock 서버)
+NICEPAY_BASE_URL = os.environ.get('NICEPAY_BASE_URL', 'http://localhost:7080')
+NICEPAY_SERVICE_ID = os.environ.get('NICEPAY_SERVICE_ID', '30000000')
+NICEPAY_API_KEY = os.environ.get('NICEPAY_API_KEY', 'test-key-123')
+NICEPAY_TIMEOUT = 10
+NICEPAY_MAX_WORKERS = 8
+
+# 학부모 페이지 접근 토큰 유효기간 (초)
+PARENT_PORTAL_TOKEN_MAX_AGE = 60 * 60 * 24 * 30
+
+# JSON 본문 저장소 (core.payloads) - 보관기간(일), 이 기간이 지나면 본문만 삭제
+PAYLOAD_RETENTION_DAYS = {
+    'payments.PaymentTransaction.nicepay_response': 365 * 5,  # 전자금융거래 기록 5년
+    'core.ChatSupport.chat_log': 365 * 3,                     # 소비자 상담 기록 3년
+    'core.SMSHistory.recipients': 365,
+    'core.LabelPrint.label_data': 365,
+}
+# 이 기간 동안 바뀌지 않은 본문은 압축
+PAYLOAD_COMPRESS_AFTER_DAYS = 30
+
+# 변경 이벤트 스트림 (core.outbox) - 전송 방식 'local'(DB 테이블을 큐로 사용) 또는 'redis'
+OUTBOX_TRANSPORT = os.environ.get('OUTBOX_TRANSPORT', 'local')
+OUTBOX_REDIS_URL = os.environ.get('OUTBOX_REDIS_URL', REDIS_URL)
+OUTBOX_STREAM_PREFIX = 'thesikpan:outbox'
+OUTBOX_STREAM_MAXLEN = 100000
+# 발행 후 이 기간(일)이 지나고 모든 소비자가 처리한 이벤트는 삭제
+OUTBOX_RETENTION_DAYS = 7
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'thesikpan.settings')
 
 application = get_wsgi_application()
+
+# 첫 요청 전에 URLconf 를 불러온다 (core/startup.py 참고)
+from core.startup import warm_up  # noqa: E402
+
+warm_up()